@@ -0,0 +1,263 @@
+"""partition messages, chat_messages and notifications by month; add archive tables
+
+Revision ID: c4e6a8b0d2f1
+Revises: a1b2c3d4e5fa, calendar_001
+Create Date: 2026-10-17 00:00:00.000000
+
+Retention (app/utils/retention.py, Celery task archive_old_rows):
+- *_archive tables (all dialects): cold storage for rows older than the horizon
+- PostgreSQL: messages, chat_messages and notifications become RANGE (created_at)
+  partitioned tables with monthly partitions
+
+The existing table is not copied. It is renamed to {table}_legacy and attached as
+the partition for everything before next month, so rows written until then still
+fit it. The table-sized work runs first on the live table, outside the migration
+transaction and without blocking reads or writes:
+- CREATE UNIQUE INDEX CONCURRENTLY on (id, created_at), needed for the
+  partitioned primary key
+- a CHECK constraint for the partition bound, added NOT VALID and then
+  validated (VALIDATE CONSTRAINT takes only a SHARE UPDATE EXCLUSIVE lock)
+The rename and ATTACH then run in a short transaction: the validated CHECK proves
+the bound, so ATTACH does not rescan the table, and existing indexes and foreign
+keys of the legacy table are reused by the matching ones on the parent.
+Partitions for later months are created here and by the retention task
+(PARTITION_MONTHS_AHEAD). A DEFAULT partition catches the rest.
+
+chat_messages.parent_message_id loses its self-referencing foreign key on
+PostgreSQL: a partitioned table can only be referenced by a key that includes
+the partition column. The retention task never archives a message whose
+replies are still live.
+"""
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c4e6a8b0d2f1'
+down_revision = ('a1b2c3d4e5fa', 'calendar_001')
+branch_labels = None
+depends_on = None
+
+PARTITIONED_TABLES = ('messages', 'chat_messages', 'notifications')
+PARTITION_MONTHS_AHEAD = 3
+
+# Indexes of the models; on the parent they match (and reuse) the legacy table's indexes
+PARENT_INDEXES = {
+    'messages': [
+        ('ix_messages_id', 'id'),
+        ('ix_messages_sender_id', 'sender_id'),
+        ('ix_messages_recipient_id', 'recipient_id'),
+        ('ix_messages_created_at', 'created_at'),
+        ('idx_message_conversation', 'sender_id, recipient_id, created_at'),
+    ],
+    'chat_messages': [
+        ('ix_chat_messages_id', 'id'),
+        ('ix_chat_messages_room_id', 'room_id'),
+        ('ix_chat_messages_sender_id', 'sender_id'),
+        ('ix_chat_messages_parent_message_id', 'parent_message_id'),
+        ('ix_chat_messages_created_at', 'created_at'),
+    ],
+    'notifications': [
+        ('ix_notifications_id', 'id'),
+        ('ix_notifications_user_id', 'user_id'),
+        ('ix_notifications_notification_type', 'notification_type'),
+        ('ix_notifications_is_read', 'is_read'),
+        ('ix_notifications_created_at', 'created_at'),
+        ('idx_notification_user_unread', 'user_id, is_read, created_at'),
+    ],
+}
+
+PARENT_FOREIGN_KEYS = {
+    'messages': [
+        ('fk_messages_sender_id_users', 'sender_id', 'users(id)', ''),
+        ('fk_messages_recipient_id_users', 'recipient_id', 'users(id)', ''),
+    ],
+    'chat_messages': [
+        ('fk_chat_messages_room_id_chat_rooms', 'room_id', 'chat_rooms(id)', ' ON DELETE CASCADE'),
+        ('fk_chat_messages_sender_id_users', 'sender_id', 'users(id)', ''),
+    ],
+    'notifications': [
+        ('fk_notifications_user_id_users', 'user_id', 'users(id)', ' ON DELETE CASCADE'),
+    ],
+}
+
+
+def _month_start(day: date, months: int = 0) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _index_names(bind, table: str) -> list[str]:
+    return list(bind.execute(
+        sa.text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+        {'table': table},
+    ).scalars())
+
+
+# ==================== ARCHIVE TABLES ====================
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    ]
+
+def _create_archive_tables(bind) -> None:
+    if bind.dialect.name == 'postgresql':
+        # LIKE copies the exact column types (including notification_type_enum) without defaults
+        for table in PARTITIONED_TABLES:
+            op.execute(f'CREATE TABLE {table}_archive (LIKE {table})')
+            op.execute(f'ALTER TABLE {table}_archive ADD PRIMARY KEY (id)')
+            op.create_index(f'ix_{table}_archive_created_at', f'{table}_archive', ['created_at'])
+        return
+
+    op.create_table(
+        'messages_archive',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('sender_id', sa.Integer(), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        *_timestamps(),
+    )
+    op.create_table(
+        'chat_messages_archive',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('sender_id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_edited', sa.Boolean(), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('attachment_url', sa.String(length=512), nullable=True),
+        sa.Column('attachment_type', sa.String(length=50), nullable=True),
+        sa.Column('parent_message_id', sa.Integer(), nullable=True),
+        *_timestamps(),
+    )
+    op.create_table(
+        'notifications_archive',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('notification_type', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('link', sa.String(length=512), nullable=True),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('read_at', sa.Integer(), nullable=True),
+        *_timestamps(),
+    )
+    for table in PARTITIONED_TABLES:
+        op.create_index(f'ix_{table}_archive_created_at', f'{table}_archive', ['created_at'])
+
+
+# ==================== POSTGRESQL PARTITIONING ====================
+
+
+def _prepare_partition_bound(table: str, boundary: date) -> None:
+    # Scans of the live table; each statement commits on its own, writes are not blocked
+    with op.get_context().autocommit_block():
+        op.execute(f'CREATE UNIQUE INDEX CONCURRENTLY {table}_id_created_at ON {table} (id, created_at)')
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_partition_bound "
+            f"CHECK (created_at IS NOT NULL AND created_at < '{boundary.isoformat()}') NOT VALID"
+        )
+        op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_partition_bound')
+
+
+def _partition(bind, table: str, boundary: date) -> None:
+    legacy = f'{table}_legacy'
+
+    # Legacy table keeps its data, sequence and indexes under new names
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    for name in _index_names(bind, legacy):
+        op.execute(f'ALTER INDEX {name} RENAME TO {name[:56]}_legacy')
+    sequence = bind.execute(sa.text('SELECT pg_get_serial_sequence(:table, :column)'), {
+        'table': legacy, 'column': 'id',
+    }).scalar()
+
+    if table == 'chat_messages':
+        for (constraint,) in bind.execute(sa.text(
+            "SELECT conname FROM pg_constraint WHERE contype = 'f' "
+            "AND conrelid = CAST(:table AS regclass) AND confrelid = CAST(:table AS regclass)"
+        ), {'table': legacy}):
+            op.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT {constraint}')
+
+    # Empty parent with the same columns; PK must include the partition key
+    op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)')
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+    for name, columns in PARENT_INDEXES[table]:
+        op.execute(f'CREATE INDEX {name} ON {table} ({columns})')
+    for name, column, target, action in PARENT_FOREIGN_KEYS[table]:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {target}{action}')
+
+    # Attach the legacy table as the partition for everything before the boundary;
+    # {table}_partition_bound proves the bound and {table}_id_created_at backs the primary key
+    op.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    )
+
+    for offset in range(PARTITION_MONTHS_AHEAD + 1):
+        start = _month_start(boundary, offset)
+        op.execute(
+            f"CREATE TABLE {table}_p{start:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_month_start(start, 1).isoformat()}')"
+        )
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def _unpartition(bind, table: str) -> None:
+    legacy = f'{table}_legacy'
+    partitioned = f'{table}_partitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+    op.execute(f'ALTER TABLE {partitioned} DETACH PARTITION {legacy}')
+    op.execute(f'ALTER TABLE {legacy} RENAME TO {table}')
+    op.execute(f'ALTER TABLE {table} DROP CONSTRAINT {table}_partition_bound')
+
+    # Rows written since the upgrade go back into the plain table
+    op.execute(f'INSERT INTO {table} SELECT * FROM {partitioned}')
+    sequence = bind.execute(sa.text('SELECT pg_get_serial_sequence(:table, :column)'), {
+        'table': partitioned, 'column': 'id',
+    }).scalar()
+    if sequence:
+        op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.id')
+    op.execute(f'DROP TABLE {partitioned} CASCADE')
+
+    for name in _index_names(bind, table):
+        if name.endswith('_legacy'):
+            op.execute(f'ALTER INDEX {name} RENAME TO {name[:-len("_legacy")]}')
+    op.execute(f'DROP INDEX {table}_id_created_at')
+    if table == 'chat_messages':
+        op.execute(
+            'ALTER TABLE chat_messages ADD CONSTRAINT chat_messages_parent_message_id_fkey '
+            'FOREIGN KEY (parent_message_id) REFERENCES chat_messages(id)'
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _create_archive_tables(bind)
+
+    if bind.dialect.name != 'postgresql':
+        return
+    boundary = _month_start(datetime.now(timezone.utc).date(), 1)
+    for table in PARTITIONED_TABLES:
+        _prepare_partition_bound(table, boundary)
+    for table in PARTITIONED_TABLES:
+        _partition(bind, table, boundary)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for table in PARTITIONED_TABLES:
+            _unpartition(bind, table)
+
+    for table in PARTITIONED_TABLES:
+        op.drop_index(f'ix_{table}_archive_created_at', table_name=f'{table}_archive')
+        op.drop_table(f'{table}_archive')
@@ -5,17 +5,20 @@ API для работы с достижениями пользователей
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.dependencies import get_current_user, get_db, rate_limit_dependency
 from app.models.achievement import Achievement
 from app.models.user import User
 from app.schemas.achievement import AchievementCreate, AchievementRead, AchievementUpdate
+from app.utils.pagination import Keyset
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+ACHIEVEMENTS_KEYSET = Keyset(None, Achievement.id, descending=False, scope="achievements")
+
 
 @router.get("/my", response_model=list[AchievementRead])
 async def get_my_achievements(
@@ -29,18 +32,23 @@ async def get_my_achievements(
 
 @router.get("/", response_model=list[AchievementRead])
 async def get_achievements(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
-    """Получить список всех достижений"""
+    """Получить список всех достижений (курсор следующей страницы - в заголовке X-Next-Cursor)"""
     from app.utils.pagination import validate_pagination
     skip, limit = validate_pagination(skip, limit)
 
-    return db.query(Achievement).options(
-        joinedload(Achievement.user)
-    ).offset(skip).limit(limit).all()
+    query = ACHIEVEMENTS_KEYSET.apply(db.query(Achievement).options(joinedload(Achievement.user)), limit, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    page = ACHIEVEMENTS_KEYSET.page(query.all(), limit)
+    response.headers.update(page.headers)
+    return page.items
 
 
 @router.get("/{achievement_id}", response_model=AchievementRead)
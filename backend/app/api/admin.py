@@ -2,13 +2,14 @@
 Admin API endpoints for user management and platform administration.
 """
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, func, or_
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_admin, get_db
+from app.dependencies import get_current_admin, get_db, get_read_db
 from app.models.user import User, UserRole
 from app.schemas.admin import (
     AdminUserListResponse,
@@ -20,6 +21,9 @@ from app.schemas.admin import (
     UpdateUserStatusRequest,
 )
 from app.services.analytics import AnalyticsService
+from app.utils.cache import invalidate_tags
+from app.utils.counts import total_counter
+from app.utils.pagination import Keyset
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -34,8 +38,14 @@ async def list_users(
     search: str | None = Query(default=None, min_length=1, max_length=100, description="Search by name or email"),
     sort_by: str = Query(default="created_at", pattern="^(created_at|email|role|full_name)$"),
     sort_order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    cursor: str | None = Query(
+        default=None, description="next_cursor of the previous page (keyset mode, page is ignored)"
+    ),
+    include_total: bool = Query(
+        default=True, description="Return total; false skips counting and only reports has_more"
+    ),
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     query = db.query(User)
 
@@ -55,25 +65,44 @@ async def list_users(
         )
         query = query.filter(search_filter)
 
-    total = query.count()
-    sort_column = getattr(User, sort_by, User.created_at)
-    order = desc(sort_column) if sort_order == "desc" else sort_column.asc()
-    users = query.order_by(order).offset((page - 1) * page_size).limit(page_size).all()
+    total = total_counter.count(db, query) if include_total else None
+    keyset = _user_list_keyset(sort_by, sort_order)
+    query = keyset.apply(query, page_size, cursor)
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    result = keyset.page(query.all(), page_size)
 
     return AdminUserListResponse(
-        items=[AdminUserResponse.model_validate(u) for u in users],
-        total=total,
+        items=[AdminUserResponse.model_validate(u) for u in result.items],
+        total=total.value if total is not None else None,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
+        total_pages=(total.value + page_size - 1) // page_size if total is not None else None,
+        next_cursor=result.next_cursor,
+        has_more=result.next_cursor is not None,
+        total_exact=total.exact if total is not None else True,
     )
 
 
+def _user_list_keyset(sort_by: str, sort_order: str) -> Keyset:
+    """User list order (sort_by, id); NULL full_name sorts as an empty string"""
+    scope = f"admin_users:{sort_by}:{sort_order}"
+    if sort_by == "full_name":
+        return Keyset(
+            func.coalesce(User.full_name, ""),
+            User.id,
+            descending=sort_order == "desc",
+            scope=scope,
+            sort_value=lambda user: user.full_name or "",
+        )
+    return Keyset(getattr(User, sort_by), User.id, descending=sort_order == "desc", scope=scope)
+
+
 @router.get("/users/{user_id}", response_model=AdminUserResponse)
 async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -98,6 +127,7 @@ async def update_user_role(
     user.role = body.role
     db.commit()
     db.refresh(user)
+    asyncio.create_task(invalidate_tags(f"user:{user_id}"))
     logger.info(f"Admin {current_user.id} changed user {user_id} role to {body.role.value}")
     return AdminUserResponse.model_validate(user)
 
@@ -119,6 +149,7 @@ async def update_user_status(
     user.is_active = body.is_active
     db.commit()
     db.refresh(user)
+    asyncio.create_task(invalidate_tags(f"user:{user_id}"))
     logger.info(f"Admin {current_user.id} changed user {user_id} active status to {body.is_active}")
     return AdminUserResponse.model_validate(user)
 
@@ -126,7 +157,7 @@ async def update_user_status(
 @router.get("/stats/platform", response_model=PlatformStatsResponse)
 async def get_platform_stats(
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     analytics = AnalyticsService(db)
     stats = analytics.get_platform_stats()
@@ -169,7 +200,7 @@ async def get_platform_stats(
 async def get_user_stats(
     user_id: int,
     current_user: User = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get detailed statistics for a specific user (admin only)"""
     from app.models.course import Course, CourseEnrollment
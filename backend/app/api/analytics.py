@@ -8,7 +8,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user, get_read_db
 from app.models.user import User
 from app.services.analytics import AnalyticsService
 from app.utils.cache import cached
@@ -21,7 +21,7 @@ router = APIRouter()
 @cached(ttl=300, key_prefix="platform_analytics")
 async def get_platform_analytics(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Общая статистика платформы (только для админов)
@@ -50,7 +50,7 @@ async def get_platform_analytics(
 async def get_user_growth(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     График роста пользователей
@@ -82,7 +82,7 @@ async def get_user_growth(
 async def get_session_analytics(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Аналитика по сессиям
@@ -114,7 +114,7 @@ async def get_session_analytics(
 async def get_course_analytics(
     course_id: int | None = Query(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Анализ производительности курсов
@@ -142,7 +142,7 @@ async def get_course_analytics(
 async def get_revenue_analytics(
     days: int = Query(30, ge=1, le=365),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Аналитика по доходам
@@ -174,7 +174,7 @@ async def get_revenue_analytics(
 async def get_user_engagement(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Анализ вовлеченности пользователя
@@ -209,7 +209,7 @@ async def get_user_engagement(
 @router.get("/analytics/me/engagement")
 async def get_my_engagement(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Получить статистику вовлеченности текущего пользователя
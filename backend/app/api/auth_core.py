@@ -3,21 +3,30 @@ Authentication API
 Обработка регистрации, входа, выхода и обновления токенов
 """
 
+import asyncio
 import logging
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.dependencies import get_db, rate_limit_dependency
+from app.dependencies import get_async_db, rate_limit_dependency
 from app.models.user import User
 from app.schemas.user import TokenResponse, UserCreate, UserLogin, UserResponse
 from app.tasks.celery_tasks import send_welcome_email_task
 from app.utils.auth_tokens import create_access_token, create_refresh_token
+from app.utils.client_ip import get_client_ip
 from app.utils.sanitization import is_safe_string, sanitize_email, sanitize_string, sanitize_username
-from app.utils.security import brute_force_protection, get_password_hash, password_validator, verify_password
+from app.utils.security import (
+    brute_force_protection,
+    hash_password_async,
+    needs_rehash,
+    password_validator,
+    verify_password_async,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +37,7 @@ security = HTTPBearer()
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Регистрация нового пользователя"""
@@ -54,10 +63,8 @@ async def register(
         )
 
     # Проверка существования пользователя
-    existing_user = (
-        db.query(User)
-        .filter((User.email == sanitized_email) | (User.username == sanitized_username))
-        .first()
+    existing_user = await db.scalar(
+        select(User.id).where(or_(User.email == sanitized_email, User.username == sanitized_username)).limit(1)
     )
 
     if existing_user:
@@ -67,7 +74,7 @@ async def register(
         )
 
     # Создание нового пользователя
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     new_user = User(
         email=sanitized_email,
         username=sanitized_username,
@@ -79,8 +86,8 @@ async def register(
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # Отправка приветственного email
     try:
@@ -96,8 +103,9 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     credentials: UserLogin,
+    request: Request,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Вход пользователя и возврат JWT токенов"""
@@ -112,29 +120,33 @@ async def login(
             detail="Недопустимые символы в email",
         )
 
-    # Проверка на brute-force
-    if brute_force_protection.is_locked(sanitized_email):
-        remaining = brute_force_protection.get_lockout_time_remaining(sanitized_email)
+    # Проверка на brute-force: блокировка аккаунта, замедление входа с IP
+    client_ip = get_client_ip(request)
+    remaining, delay = await brute_force_protection.check(sanitized_email, client_ip)
+    if remaining:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Слишком много неудачных попыток. Попробуйте через {remaining} секунд",
+            headers={"Retry-After": str(remaining)},
         )
+    if delay:
+        await asyncio.sleep(delay)
 
     # Поиск пользователя по email
-    user = db.query(User).filter(User.email == sanitized_email).first()
+    user = await db.scalar(select(User).where(User.email == sanitized_email))
 
     if not user:
-        brute_force_protection.record_failed_attempt(sanitized_email)
+        await brute_force_protection.record_failed_attempt(sanitized_email, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
         )
 
     # Проверка пароля
-    password_valid = verify_password(credentials.password, user.hashed_password)
+    password_valid = await verify_password_async(credentials.password, user.hashed_password)
 
     if not password_valid:
-        brute_force_protection.record_failed_attempt(sanitized_email)
+        await brute_force_protection.record_failed_attempt(sanitized_email, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
@@ -147,7 +159,16 @@ async def login(
         )
 
     # Успешный вход - сброс попыток
-    brute_force_protection.reset_attempts(sanitized_email)
+    await brute_force_protection.reset_attempts(sanitized_email)
+
+    # Хеш со старой стоимостью bcrypt пересчитывается, пока пароль известен
+    if needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(credentials.password)
+            await db.commit()
+        except Exception as e:
+            # Вход не зависит от пересчёта; без rollback атрибуты user остаются загруженными
+            logger.warning(f"Password rehash failed for user {user.id}: {e}")
 
     # Создание токенов
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -186,7 +207,7 @@ async def login(
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Обновление токена доступа с помощью refresh токена из httpOnly cookie"""
@@ -220,7 +241,7 @@ async def refresh_token(
             detail="Неверный токен: некорректный идентификатор пользователя",
         ) from None
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
 
     if not user or not user.is_active:
         raise HTTPException(
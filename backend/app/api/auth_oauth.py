@@ -3,6 +3,7 @@ OAuth handlers для MentorHub
 Обработка OAuth аутентификации через Google и GitHub
 """
 
+import asyncio
 import logging
 
 import httpx
@@ -14,6 +15,7 @@ from app.config import settings
 from app.dependencies import get_db
 from app.models.user import User, UserRole
 from app.utils.auth_tokens import create_access_token, create_refresh_token
+from app.utils.cache import invalidate_tags
 
 logger = logging.getLogger(__name__)
 
@@ -241,6 +243,7 @@ async def oauth_callback(
         user.full_name = full_name or user.full_name
         db.commit()
         db.refresh(user)
+        asyncio.create_task(invalidate_tags(f"user:{user.id}"))
     else:
         # Создаём нового пользователя
         # Генерируем уникальный username
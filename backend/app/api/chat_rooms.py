@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, func
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from app.dependencies import get_current_user, get_db
@@ -24,10 +24,13 @@ from app.schemas.chat_room import (
     ChatRoomWithMembersResponse,
 )
 from app.services.chat_room_service import ChatRoomService, format_room_response
+from app.utils.pagination import Keyset
 from app.utils.sanitization import sanitize_and_validate
 
 router = APIRouter()
 
+CHAT_MESSAGES_KEYSET = Keyset(ChatMessage.created_at, ChatMessage.id, scope="chat_messages")
+
 
 def _get_chat_room_service(db: Session = Depends(get_db)) -> ChatRoomService:
     """Получить сервис чат-комнат"""
@@ -198,10 +201,16 @@ async def get_chat_messages(
     room_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Получить сообщения чата"""
+    """
+    Получить сообщения чата
+
+    Страницы идут от новых к старым; next_cursor предыдущего ответа
+    продолжает список без skip.
+    """
     # Проверяем, что пользователь является участником
     room = db.query(ChatRoom).filter(
         ChatRoom.id == room_id,
@@ -217,10 +226,12 @@ async def get_chat_messages(
     ).filter(
         ChatMessage.room_id == room_id,
         ChatMessage.is_deleted.is_(False)
-    ).order_by(desc(ChatMessage.created_at))
-
-    total = query.count()
-    messages = query.offset(skip).limit(limit).all()
+    )
+    query = CHAT_MESSAGES_KEYSET.apply(query, limit, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    page = CHAT_MESSAGES_KEYSET.page(query.all(), limit)
+    messages = page.items
 
     # Переворачиваем для хронологического порядка
     messages.reverse()
@@ -258,7 +269,8 @@ async def get_chat_messages(
 
     return {
         "messages": result,
-        "has_more": skip + limit < total
+        "has_more": page.next_cursor is not None,
+        "next_cursor": page.next_cursor
     }
 
 
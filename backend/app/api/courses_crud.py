@@ -7,27 +7,33 @@ import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.dependencies import get_current_user, get_db, rate_limit_dependency
+from app.constants import HTTP_CACHE_MAX_AGE
+from app.dependencies import get_async_db, get_current_user, get_db, rate_limit_dependency
 from app.models.course import Course
+from app.models.mentor import Mentor
 from app.models.user import User, UserRole
 from app.schemas.course import CourseCreate, CourseResponse, CourseUpdate, CourseWithLessonsResponse
-from app.services.cache import cached
 from app.services.course_service import CourseService
-from app.utils.cache import invalidate_cache
+from app.utils.cache import cached, invalidate_tags
+from app.utils.pagination import Keyset
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+COURSES_KEYSET = Keyset(None, Course.id, descending=False, scope="courses_list")
 
-async def _safe_invalidate_cache(key: str):
+
+async def _safe_invalidate_cache(*tags: str):
     """Fire-and-forget cache invalidation with error logging."""
     try:
-        await invalidate_cache(key)
+        await invalidate_tags(*tags)
     except Exception:
-        logger.exception("Failed to invalidate cache: %s", key)
+        logger.exception("Failed to invalidate cache tags: %s", tags)
 
 
 def _get_course_service(db: Session) -> CourseService:
@@ -36,42 +42,66 @@ def _get_course_service(db: Session) -> CourseService:
 
 
 @router.get("/", response_model=list[CourseResponse])
-@cached(ttl=1800, key_prefix="courses_list")
+@cached(
+    ttl=1800,
+    key_prefix="courses_list",
+    stale_ttl=600,
+    tags=("courses_list",),
+    response_model=list[CourseResponse],
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def get_courses(
     skip: int = 0,
     limit: int = 100,
     category: str | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
-    """Получить список курсов с фильтрацией"""
+    """
+    Получить список курсов с фильтрацией
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor;
+    с параметром cursor skip не используется.
+    """
     from app.utils.pagination import validate_pagination
     skip, limit = validate_pagination(skip, limit)
 
-    query = db.query(Course).options(joinedload(Course.instructor))
+    # Связи, которые входят в ответ, загружаются заранее: в async-сессии ленивой загрузки нет
+    query = select(Course).options(selectinload(Course.instructor).selectinload(Mentor.user))
 
     if category:
-        query = query.filter(Course.category == category)
+        query = query.where(Course.category == category)
 
-    return query.offset(skip).limit(limit).all()
+    query = COURSES_KEYSET.apply(query, limit, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    result = await db.scalars(query)
+    return COURSES_KEYSET.page(result.all(), limit)
 
 
 @router.get("/{course_id}", response_model=CourseWithLessonsResponse)
-@cached(ttl=1800, key_prefix="course_detail")
+@cached(
+    ttl=1800,
+    key_prefix="course_detail",
+    stale_ttl=600,
+    tags=("course:{course_id}",),
+    response_model=CourseWithLessonsResponse,
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def get_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Получить информацию о курсе по ID с уроками"""
-    course = (
-        db.query(Course)
+    course = await db.scalar(
+        select(Course)
         .options(
-            joinedload(Course.instructor),
-            joinedload(Course.lessons)
+            selectinload(Course.instructor).selectinload(Mentor.user),
+            selectinload(Course.lessons),
         )
-        .filter(Course.id == course_id)
-        .first()
+        .where(Course.id == course_id)
     )
 
     if not course:
@@ -92,7 +122,7 @@ async def create_course(
     new_course = service.create_course(current_user, course)
 
     # Инвалидируем кеш списка курсов
-    asyncio.create_task(_safe_invalidate_cache("courses_list:"))
+    asyncio.create_task(_safe_invalidate_cache("courses_list"))
 
     return new_course
 
@@ -110,8 +140,7 @@ async def update_course(
     updated_course = service.update_course(course_id, current_user, course)
 
     # Инвалидируем кеш
-    asyncio.create_task(_safe_invalidate_cache(f"course_detail:{course_id}"))
-    asyncio.create_task(_safe_invalidate_cache("courses_list:"))
+    asyncio.create_task(_safe_invalidate_cache(f"course:{course_id}", "courses_list"))
 
     return updated_course
 
@@ -143,8 +172,7 @@ async def delete_course(
         db.commit()
 
         # Инвалидируем кеш
-        asyncio.create_task(_safe_invalidate_cache(f"course_detail:{course_id}"))
-        asyncio.create_task(_safe_invalidate_cache("courses_list:"))
+        asyncio.create_task(_safe_invalidate_cache(f"course:{course_id}", "courses_list"))
 
         return None
     except Exception:
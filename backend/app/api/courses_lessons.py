@@ -15,7 +15,7 @@ from app.models.mentor import Mentor
 from app.models.progress import Progress
 from app.models.user import User
 from app.schemas.course import LessonCreate, LessonResponse, LessonUpdate
-from app.utils.cache import invalidate_cache
+from app.utils.cache import invalidate_tags
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -72,7 +72,7 @@ async def create_lesson(
         raise HTTPException(status_code=500, detail="Ошибка при создании урока") from e
 
     # Инвалидируем кеш курса
-    asyncio.create_task(invalidate_cache(f"course_detail:{course_id}"))
+    asyncio.create_task(invalidate_tags(f"course:{course_id}"))
 
     return db_lesson
 
@@ -109,7 +109,7 @@ async def update_lesson(
         raise HTTPException(status_code=500, detail="Ошибка при обновлении урока") from e
 
     # Инвалидируем кеш курса
-    asyncio.create_task(invalidate_cache(f"course_detail:{db_lesson.course_id}"))
+    asyncio.create_task(invalidate_tags(f"course:{db_lesson.course_id}"))
 
     return db_lesson
 
@@ -143,7 +143,7 @@ async def delete_lesson(
         raise HTTPException(status_code=500, detail="Ошибка при удалении урока") from e
 
     # Инвалидируем кеш курса
-    asyncio.create_task(invalidate_cache(f"course_detail:{course_id}"))
+    asyncio.create_task(invalidate_tags(f"course:{course_id}"))
 
     return None
 
@@ -241,7 +241,7 @@ async def complete_lesson(
         raise HTTPException(status_code=500, detail="Ошибка при завершении урока") from e
 
     # Инвалидируем кеш курса
-    asyncio.create_task(invalidate_cache(f"course_detail:{lesson.course_id}"))
+    asyncio.create_task(invalidate_tags(f"course:{lesson.course_id}"))
 
     return {
         "lesson_id": lesson.id,
@@ -3,6 +3,7 @@ Email verification endpoints
 Подтверждение email и password reset
 """
 
+import asyncio
 import logging
 import secrets
 from datetime import datetime, timezone
@@ -13,9 +14,9 @@ from sqlalchemy.orm import Session
 
 from app.dependencies import get_db
 from app.models.user import User
-from app.services.cache import cache_service
+from app.utils.cache import get_cache, invalidate_tags
 from app.utils.email import email_service
-from app.utils.security import get_password_hash
+from app.utils.security import hash_password_async
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -70,7 +71,7 @@ async def send_verification_email(
         "email": user.email,
         "expires_at": datetime.now(timezone.utc).isoformat()
     }
-    cache_service.set(f"verification:{token}", token_data, ttl=VERIFICATION_TOKEN_TTL)
+    await get_cache().set(f"verification:{token}", token_data, ttl=VERIFICATION_TOKEN_TTL)
 
     # Отправляем email
     success = email_service.send_verification_email(
@@ -93,7 +94,7 @@ async def verify_email(
     db: Session = Depends(get_db)
 ):
     """Подтверждение email по токену"""
-    token_data = cache_service.get(f"verification:{request.token}")
+    token_data = await get_cache().get(f"verification:{request.token}")
 
     if not token_data:
         raise HTTPException(
@@ -101,7 +102,7 @@ async def verify_email(
             detail="Неверный или истекший токен"
         )
 
-    # cache_service.get уже возвращает десериализованный dict
+    # get_cache().get уже возвращает десериализованный dict
     if not isinstance(token_data, dict):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -119,9 +120,10 @@ async def verify_email(
     # Подтверждаем email
     user.is_verified = True
     db.commit()
+    asyncio.create_task(invalidate_tags(f"user:{user.id}"))
 
     # Удаляем использованный токен из Redis
-    cache_service.delete(f"verification:{request.token}")
+    await get_cache().delete(f"verification:{request.token}")
 
     logger.info(f"✅ Email verified for user {user.email}")
 
@@ -151,7 +153,7 @@ async def forgot_password(
         "email": user.email,
         "expires_at": datetime.now(timezone.utc).isoformat()
     }
-    cache_service.set(f"reset:{token}", token_data, ttl=RESET_TOKEN_TTL)
+    await get_cache().set(f"reset:{token}", token_data, ttl=RESET_TOKEN_TTL)
 
     # Отправляем email
     success = email_service.send_password_reset_email(
@@ -174,7 +176,7 @@ async def reset_password(
     db: Session = Depends(get_db)
 ):
     """Сброс пароля по токену"""
-    token_data = cache_service.get(f"reset:{request.token}")
+    token_data = await get_cache().get(f"reset:{request.token}")
 
     if not token_data:
         raise HTTPException(
@@ -182,7 +184,7 @@ async def reset_password(
             detail="Неверный или истекший токен"
         )
 
-    # cache_service.get уже возвращает десериализованный dict
+    # get_cache().get уже возвращает десериализованный dict
     if not isinstance(token_data, dict):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -198,11 +200,11 @@ async def reset_password(
         )
 
     # Обновляем пароль
-    user.hashed_password = get_password_hash(request.new_password)
+    user.hashed_password = await hash_password_async(request.new_password)
     db.commit()
 
     # Удаляем использованный токен из Redis
-    cache_service.delete(f"reset:{request.token}")
+    await get_cache().delete(f"reset:{request.token}")
 
     logger.info(f"✅ Password reset for user {user.email}")
 
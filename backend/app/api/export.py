@@ -12,7 +12,7 @@ from app.api.export_csv import export_as_csv
 from app.api.export_data import collect_user_data, get_user_data_counts
 from app.api.export_excel import export_as_excel
 from app.api.export_pdf import export_as_pdf
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user, get_read_db
 from app.models.user import User
 from app.utils.cache import cached
 
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/export", tags=["Data Export"])
 @router.get("/data", summary="Export all user data")
 async def export_user_data(
     format: str = "json",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -63,9 +63,9 @@ async def export_user_data(
 
 
 @router.get("/data/summary", summary="Get user data summary statistics")
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, tags=("user:{current_user.id}",))  # Cache for 5 minutes
 async def get_data_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
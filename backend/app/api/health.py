@@ -22,20 +22,12 @@ except ImportError:
 
 from app.config import settings
 from app.dependencies import get_db
+from app.lifespan import get_redis_client
+from app.utils.cache_warmup import get_warmup_status, is_cache_warm
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/health", tags=["Health"])
 
-# Async Redis client import
-redis_client = None
-try:
-    if REDIS_AVAILABLE and settings.REDIS_URL and settings.REDIS_URL.strip():
-        redis_client = aioredis.from_url(settings.REDIS_URL)
-        logger.debug("Async Redis client initialized for health checks")
-except Exception as e:
-    logger.debug(f"Redis client not available for health checks: {e}")
-    redis_client = None
-
 
 def get_system_metrics() -> dict[str, Any]:
     """Получает системные метрики"""
@@ -123,7 +115,8 @@ async def detailed_health_check(
         }
         health_status["status"] = "unhealthy"
 
-    # Проверка Redis с детальной информацией
+    # Проверка Redis с детальной информацией (общий пул воркера)
+    redis_client = get_redis_client() if REDIS_AVAILABLE else None
     if redis_client:
         try:
             start_time = time.time()
@@ -183,6 +176,13 @@ async def readiness_check(
         # Проверка что все необходимые сервисы доступны
         db.execute(text("SELECT 1"))
 
+        # Горячие ключи кеша ещё прогреваются после старта воркера
+        if not is_cache_warm():
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"status": "warming_up", "cache_warmup": get_warmup_status(), "timestamp": time.time()}
+            )
+
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"status": "ready", "timestamp": time.time()}
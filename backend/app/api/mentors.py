@@ -10,14 +10,14 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.api.mentors_search import router as mentors_search_router
+from app.constants import HTTP_CACHE_MAX_AGE
 from app.dependencies import get_current_user, get_db, rate_limit_dependency
 from app.models.mentor import Mentor
 from app.models.review import Review
 from app.models.user import User
 from app.schemas.common import PaginatedResponse
 from app.schemas.mentor import MentorCreate, MentorResponse, MentorUpdate
-from app.services.cache import cached
-from app.utils.cache import invalidate_cache
+from app.utils.cache import cached, invalidate_tags
 from app.utils.sanitization import sanitize_and_validate
 
 logger = logging.getLogger(__name__)
@@ -29,7 +29,13 @@ router.include_router(mentors_search_router)
 
 
 @router.get("/", response_model=list[MentorResponse])
-@cached(ttl=900, key_prefix="mentors_list")
+@cached(
+    ttl=900,
+    key_prefix="mentors_list",
+    tags=("mentors_list",),
+    response_model=list[MentorResponse],
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def get_mentors(
     skip: int = 0, limit: int = 100, db: Session = Depends(get_db), rate_limit: bool = Depends(rate_limit_dependency)
 ):
@@ -42,7 +48,13 @@ async def get_mentors(
 
 
 @router.get("/{mentor_id}", response_model=MentorResponse)
-@cached(ttl=900, key_prefix="mentor_detail")
+@cached(
+    ttl=900,
+    key_prefix="mentor_detail",
+    tags=("mentor:{mentor_id}",),
+    response_model=MentorResponse,
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def get_mentor(mentor_id: int, db: Session = Depends(get_db), rate_limit: bool = Depends(rate_limit_dependency)):
     """Получить информацию о менторе по ID"""
     if mentor_id <= 0:
@@ -98,12 +110,16 @@ async def create_mentor(
     try:
         db.commit()
         db.refresh(db_mentor)
-        return db_mentor
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating mentor profile: {e}")
         raise HTTPException(status_code=500, detail="Ошибка при создании профиля ментора") from e
 
+    # Новый ментор появляется в списках и поиске
+    asyncio.create_task(invalidate_tags("mentors_list"))
+
+    return db_mentor
+
 
 @router.put("/{mentor_id}", response_model=MentorResponse)
 async def update_mentor(
@@ -151,8 +167,7 @@ async def update_mentor(
         raise HTTPException(status_code=500, detail="Ошибка при обновлении профиля ментора") from e
 
     # Инвалидируем кеш обновленного ментора
-    asyncio.create_task(invalidate_cache(f"mentor_detail:{db_mentor.id}"))
-    asyncio.create_task(invalidate_cache("mentors_list:"))
+    asyncio.create_task(invalidate_tags(f"mentor:{db_mentor.id}", "mentors_list"))
 
     return db_mentor
 
@@ -182,8 +197,7 @@ async def delete_mentor(
         raise HTTPException(status_code=500, detail="Ошибка при удалении профиля ментора") from e
 
     # Инвалидируем кеш удаленного ментора
-    asyncio.create_task(invalidate_cache(f"mentor_detail:{mentor_id}"))
-    asyncio.create_task(invalidate_cache("mentors_list:"))
+    asyncio.create_task(invalidate_tags(f"mentor:{mentor_id}", "mentors_list"))
     return None
 
 
@@ -5,21 +5,31 @@ Mentor Search and Filtering API
 
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.dependencies import get_db, rate_limit_dependency
+from app.constants import HTTP_CACHE_MAX_AGE
+from app.dependencies import get_async_read_db, rate_limit_dependency
 from app.models.mentor import Mentor
 from app.models.user import User
 from app.schemas.common import PaginatedResponse
 from app.schemas.mentor import MentorResponse
-from app.services.cache import cached
+from app.utils.cache import cached
+from app.utils.counts import total_counter
 
 router = APIRouter()
 
 
 @router.get("/search", response_model=PaginatedResponse[MentorResponse])
-@cached(ttl=600, key_prefix="mentors_search")
+@cached(
+    ttl=600,
+    key_prefix="mentors_search",
+    stale_ttl=120,
+    tags=("mentors_list",),
+    response_model=PaginatedResponse[MentorResponse],
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def search_mentors(
     # Search parameters
     query: str | None = Query(None, description="Поиск по имени или специализации"),
@@ -43,8 +53,9 @@ async def search_mentors(
     # Pagination
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(True, description="false - без подсчёта total, только has_more"),
 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
     """
@@ -60,10 +71,8 @@ async def search_mentors(
     - sort_order: Порядок сортировки (asc, desc)
     """
 
-    # Base query with joinedload to avoid N+1
-    query_obj = db.query(Mentor).options(
-        joinedload(Mentor.user),
-    )
+    # Base query; Mentor.user is joined-loaded only for the page, not for the count
+    query_obj = select(Mentor)
 
     # Build filters
     filters = []
@@ -102,7 +111,7 @@ async def search_mentors(
 
     # Apply filters
     if filters:
-        query_obj = query_obj.filter(and_(*filters))
+        query_obj = query_obj.where(and_(*filters))
 
     # Sorting
     sort_field_map = {
@@ -122,50 +131,70 @@ async def search_mentors(
     else:
         query_obj = query_obj.order_by(sort_field.desc())  # type: ignore[attr-defined]
 
-    # Count total
-    total = query_obj.count()
+    # Count total: exact for small results, cached or estimated for large ones
+    total = await total_counter.count_async(db, query_obj) if include_total else None
 
-    # Pagination
+    # Pagination (joinedload to avoid N+1; async session cannot lazy-load).
+    # One extra row tells whether there is a next page without the total
     offset = (page - 1) * page_size
-    mentors = query_obj.offset(offset).limit(page_size).all()
-
-    return PaginatedResponse.create(mentors, total, page, page_size)
+    result = await db.scalars(query_obj.options(joinedload(Mentor.user)).offset(offset).limit(page_size + 1))
+    mentors = result.all()
+
+    return PaginatedResponse.create(
+        mentors[:page_size],
+        total.value if total is not None else None,
+        page,
+        page_size,
+        has_more=len(mentors) > page_size,
+        total_exact=total.exact if total is not None else True,
+    )
 
 
 @router.get("/specializations", response_model=list[str])
-@cached(ttl=3600, key_prefix="mentor_specializations")
+@cached(
+    ttl=3600,
+    key_prefix="mentor_specializations",
+    stale_ttl=1800,
+    tags=("mentors_list",),
+    response_model=list[str],
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def get_specializations(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
     """
     Получить список всех уникальных специализаций менторов
     """
-    specializations = (
-        db.query(Mentor.specialization)
-        .filter(Mentor.specialization.isnot(None))
-        .distinct()
-        .all()
+    specializations = await db.scalars(
+        select(Mentor.specialization).where(Mentor.specialization.isnot(None)).distinct()
     )
 
-    return [spec[0] for spec in specializations if spec[0]]
+    return [spec for spec in specializations if spec]
 
 
 @router.get("/top-rated", response_model=list[MentorResponse])
-@cached(ttl=1800, key_prefix="mentors_top_rated")
+@cached(
+    ttl=1800,
+    key_prefix="mentors_top_rated",
+    stale_ttl=600,
+    tags=("mentors_list",),
+    response_model=list[MentorResponse],
+    http_max_age=HTTP_CACHE_MAX_AGE,
+)
 async def get_top_rated_mentors(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
     """
     Получить топ менторов по рейтингу
     """
-    return (
-        db.query(Mentor)
+    result = await db.scalars(
+        select(Mentor)
         .options(joinedload(Mentor.user))
-        .filter(Mentor.rating > 0)
+        .where(Mentor.rating > 0)
         .order_by(Mentor.rating.desc())
         .limit(limit)
-        .all()
     )
+    return result.all()
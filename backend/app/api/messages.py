@@ -7,10 +7,10 @@ import logging
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_current_user, get_db, rate_limit_dependency
+from app.dependencies import get_async_db, get_current_user_async, rate_limit_dependency
 from app.models.message import Message as DBMessage
 from app.models.user import User, UserRole
 from app.schemas.message import ConversationResponse, MessageCreate, MessageListResponse, MessageResponse, MessageUpdate
@@ -22,8 +22,8 @@ router = APIRouter()
 
 @router.get("/conversations", response_model=list[ConversationResponse])
 async def get_conversations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Получить список всех диалогов текущего пользователя с последними сообщениями"""
@@ -35,13 +35,13 @@ async def get_conversations(
 
     # Подзапрос: последнее сообщение в каждом диалоге
     last_msg_subq = (
-        db.query(
+        select(
             other_user.label("other_user_id"),
             DBMessage.content.label("last_message"),
             DBMessage.created_at.label("last_message_time"),
             DBMessage.sender_id.label("last_sender_id"),
         )
-        .filter(
+        .where(
             or_(
                 DBMessage.sender_id == current_user.id,
                 DBMessage.recipient_id == current_user.id,
@@ -53,11 +53,11 @@ async def get_conversations(
 
     # Подзапрос: количество непрочитанных сообщений от каждого собеседника
     unread_subq = (
-        db.query(
+        select(
             DBMessage.sender_id.label("other_user_id"),
             func.count().label("unread_count"),
         )
-        .filter(
+        .where(
             DBMessage.recipient_id == current_user.id,
             DBMessage.is_read.is_(False),
         )
@@ -66,8 +66,8 @@ async def get_conversations(
     )
 
     # Основной запрос: объединяем последнее сообщение + непрочитанные + данные пользователя
-    rows = (
-        db.query(
+    rows = await db.execute(
+        select(
             last_msg_subq.c.other_user_id,
             last_msg_subq.c.last_message,
             last_msg_subq.c.last_message_time,
@@ -79,7 +79,6 @@ async def get_conversations(
         .join(User, User.id == last_msg_subq.c.other_user_id)
         .outerjoin(unread_subq, unread_subq.c.other_user_id == last_msg_subq.c.other_user_id)
         .order_by(last_msg_subq.c.last_message_time.desc())
-        .all()
     )
 
     return [
@@ -101,18 +100,18 @@ async def get_message_history(
     other_user_id: int,
     limit: int = Query(default=50, ge=1, le=100),
     before: datetime | None = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Получить историю переписки с конкретным пользователем"""
     # Проверяем существование собеседника
-    other_user = db.query(User).filter(User.id == other_user_id).first()
+    other_user = await db.get(User, other_user_id)
     if not other_user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
     # Строим запрос
-    query = db.query(DBMessage).filter(
+    query = select(DBMessage).where(
         or_(
             and_(DBMessage.sender_id == current_user.id, DBMessage.recipient_id == other_user_id),
             and_(DBMessage.sender_id == other_user_id, DBMessage.recipient_id == current_user.id)
@@ -121,28 +120,29 @@ async def get_message_history(
 
     # Пагинация по времени
     if before:
-        query = query.filter(DBMessage.created_at < before)
+        query = query.where(DBMessage.created_at < before)
 
     # Получаем сообщения (последние сначала)
-    messages = query.order_by(DBMessage.created_at.desc()).limit(limit).all()
+    result = await db.scalars(query.order_by(DBMessage.created_at.desc()).limit(limit))
+    messages = list(result)
 
     # Переворачиваем чтобы были в хронологическом порядке
     messages.reverse()
 
-    # Помечаем сообщения как прочитанные
-    unread_messages = db.query(DBMessage).filter(
-        DBMessage.sender_id == other_user_id,
-        DBMessage.recipient_id == current_user.id,
-        DBMessage.is_read.is_(False)
-    ).all()
-
-    for msg in unread_messages:
-        msg.is_read = True
-
+    # Помечаем сообщения как прочитанные одним UPDATE (загруженные сообщения обновляются в сессии)
     try:
-        db.commit()
+        await db.execute(
+            update(DBMessage)
+            .where(
+                DBMessage.sender_id == other_user_id,
+                DBMessage.recipient_id == current_user.id,
+                DBMessage.is_read.is_(False),
+            )
+            .values(is_read=True)
+        )
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error marking messages as read: {e}")
         # Не прерываем запрос, просто логируем ошибку
 
@@ -161,8 +161,8 @@ async def get_message_history(
 async def get_messages(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Получить список сообщений (admin only)"""
@@ -172,29 +172,32 @@ async def get_messages(
     from app.utils.pagination import validate_pagination
     skip, limit = validate_pagination(skip, limit)
 
-    return db.query(DBMessage).offset(skip).limit(limit).all()
+    result = await db.scalars(select(DBMessage).offset(skip).limit(limit))
+    return result.all()
 
 
 @router.get("/{message_id}", response_model=MessageResponse)
 async def get_message(
     message_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Получить информацию о сообщении по ID"""
     # Пользователь может видеть только свои сообщения
-    message = db.query(DBMessage).filter(
-        DBMessage.id == message_id,
-        or_(
-            DBMessage.sender_id == current_user.id,
-            DBMessage.recipient_id == current_user.id
+    message = await db.scalar(
+        select(DBMessage).where(
+            DBMessage.id == message_id,
+            or_(
+                DBMessage.sender_id == current_user.id,
+                DBMessage.recipient_id == current_user.id
+            )
         )
-    ).first()
+    )
 
     # Администратор может видеть любые сообщения
     if not message and current_user.role == UserRole.ADMIN:
-        message = db.query(DBMessage).filter(DBMessage.id == message_id).first()
+        message = await db.get(DBMessage, message_id)
 
     if not message:
         raise HTTPException(status_code=404, detail="Сообщение не найдено")
@@ -204,8 +207,8 @@ async def get_message(
 @router.post("/", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_message(
     message: MessageCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Создать сообщение"""
@@ -220,7 +223,7 @@ async def create_message(
         raise HTTPException(status_code=400, detail=str(e)) from e
 
     # Проверяем, что получатель существует
-    recipient = db.query(User).filter(User.id == message.recipient_id).first()
+    recipient = await db.get(User, message.recipient_id)
     if not recipient:
         raise HTTPException(status_code=404, detail="Получатель не найден")
 
@@ -228,12 +231,12 @@ async def create_message(
     try:
         db_message = DBMessage(sender_id=current_user.id, recipient_id=message.recipient_id, content=sanitized_content)
         db.add(db_message)
-        db.commit()
-        db.refresh(db_message)
+        await db.commit()
+        await db.refresh(db_message)
         return db_message
     except Exception:
         logger.exception("Failed to create message from user %s to %s", current_user.id, message.recipient_id)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Ошибка при отправке сообщения") from None
 
 
@@ -241,12 +244,12 @@ async def create_message(
 async def update_message(
     message_id: int,
     message: MessageUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
     """Обновить сообщение"""
-    db_message = db.query(DBMessage).filter(DBMessage.id == message_id).first()
+    db_message = await db.get(DBMessage, message_id)
     if not db_message:
         raise HTTPException(status_code=404, detail="Сообщение не найдено")
 
@@ -270,24 +273,24 @@ async def update_message(
         setattr(db_message, key, value)
 
     try:
-        db.commit()
-        db.refresh(db_message)
+        await db.commit()
+        await db.refresh(db_message)
         return db_message
     except Exception:
         logger.exception("Failed to update message %s by user %s", message_id, current_user.id)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Ошибка при обновлении сообщения") from None
 
 
 @router.delete("/{message_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_message(
     message_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Удалить сообщение"""
-    db_message = db.query(DBMessage).filter(DBMessage.id == message_id).first()
+    db_message = await db.get(DBMessage, message_id)
     if not db_message:
         raise HTTPException(status_code=404, detail="Сообщение не найдено")
 
@@ -296,10 +299,10 @@ async def delete_message(
         raise HTTPException(status_code=403, detail="Доступ запрещен")
 
     try:
-        db.delete(db_message)
-        db.commit()
+        await db.delete(db_message)
+        await db.commit()
         return None
     except Exception:
         logger.exception("Failed to delete message %s by user %s", message_id, current_user.id)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Ошибка при удалении сообщения") from None
@@ -4,13 +4,20 @@ API endpoints для мониторинга и метрик
 
 import logging
 from typing import Any
+from urllib.parse import parse_qs, urlsplit
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.routing import APIRoute
+from starlette.routing import Match
 
+from app.database import async_engine, engine
 from app.dependencies import get_current_user
 from app.models.user import User, UserRole
 from app.utils.cache import get_cache_stats, reset_cache_stats
+from app.utils.db_concurrency import db_concurrency_limiter
 from app.utils.monitoring import performance_monitor
+from app.utils.read_replicas import pool_status, replica_router
+from app.utils.slow_query_log import slow_query_log
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -103,6 +110,57 @@ async def get_cache_statistics(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Не удалось получить статистику кеша") from e
 
 
+@router.get("/db/replicas", response_model=dict[str, Any])
+async def get_replica_statistics(current_user: User = Depends(get_current_user)):
+    """
+    Состояние БД: пулы primary, адаптивный лимит сессий, отставание и доступность реплик
+    Доступно только администраторам
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Only administrators can access database stats"
+        )
+
+    primary = {
+        "pool": pool_status(engine),
+        "async_pool": pool_status(async_engine),
+        "concurrency": db_concurrency_limiter.get_stats() if db_concurrency_limiter else None,
+    }
+    return {"primary": primary, **replica_router.get_stats()}
+
+
+@router.get("/db/slow-queries", response_model=dict[str, Any])
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Медленные SQL-запросы этого воркера: форма параметров, маршрут, request id, план
+    Доступно только администраторам
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Only administrators can access database stats"
+        )
+
+    return {**slow_query_log.get_stats(), "queries": slow_query_log.get_entries(limit)}
+
+
+@router.post("/db/slow-queries/reset", response_model=dict[str, str])
+async def reset_slow_queries(current_user: User = Depends(get_current_user)):
+    """
+    Очистка журнала медленных запросов
+    Доступно только администраторам
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Only administrators can reset database stats"
+        )
+
+    slow_query_log.clear()
+    return {"message": "Журнал медленных запросов очищен"}
+
+
 @router.post("/cache/reset-stats", response_model=dict[str, str])
 async def reset_cache_statistics(current_user: User = Depends(get_current_user)):
     """
@@ -120,6 +178,50 @@ async def reset_cache_statistics(current_user: User = Depends(get_current_user))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Не удалось сбросить статистику кеша") from e
 
 
+@router.get("/cache/key", response_model=dict[str, Any])
+async def get_cache_key_for_request(
+    request: Request,
+    path: str = Query(..., description="Путь GET-запроса с query string, например /api/v1/mentors/search?page=2"),
+    user_id: int | None = Query(None, description="ID пользователя для эндпоинтов с ключом по пользователю"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Ключ кеша, в который попадает GET-запрос
+    Доступно только администраторам
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only administrators can inspect cache keys")
+
+    url = urlsplit(path)
+    scope = {"type": "http", "path": url.path, "root_path": "", "method": "GET"}
+    for route in request.app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            break
+    else:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Маршрут не найден")
+
+    key_builder = getattr(route.endpoint, "cache_key_builder", None)
+    if key_builder is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Эндпоинт не кешируется")
+
+    try:
+        key_data = key_builder.key_data_from_request(
+            child_scope.get("path_params", {}), parse_qs(url.query, keep_blank_values=True), user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+    return {
+        "route": route.path,
+        "endpoint": f"{route.endpoint.__module__}.{route.endpoint.__name__}",
+        "key_data": key_data,
+        "key": key_builder.key_for(key_data),
+    }
+
+
 @router.get("/health/detailed", response_model=dict[str, Any])
 async def detailed_health_check():
     """
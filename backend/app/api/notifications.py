@@ -9,16 +9,19 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import desc
 from sqlalchemy.orm import Session, joinedload
 
 from app.dependencies import get_current_user, get_db
 from app.models.notification import Notification, NotificationType
 from app.models.user import User
+from app.utils.counts import total_counter
+from app.utils.pagination import Keyset
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+NOTIFICATIONS_KEYSET = Keyset(Notification.created_at, Notification.id, scope="notifications")
+
 
 # Import WebSocket manager for real-time notifications
 try:
@@ -56,8 +59,11 @@ class NotificationResponse(BaseModel):
 class NotificationListResponse(BaseModel):
     """Список уведомлений"""
     notifications: list[NotificationResponse]
-    total: int
+    total: int | None
     unread_count: int
+    next_cursor: str | None = None
+    has_more: bool = False
+    total_exact: bool = True
 
 
 @router.get("/notifications", response_model=NotificationListResponse)
@@ -66,6 +72,8 @@ async def get_notifications(
     limit: int = Query(50, ge=1, le=100),
     unread_only: bool = Query(False),
     type: NotificationType | None = Query(None),
+    cursor: str | None = Query(None),
+    include_total: bool = Query(True),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -77,6 +85,8 @@ async def get_notifications(
     - limit: Максимум уведомлений
     - unread_only: Только непрочитанные
     - type: Фильтр по типу
+    - cursor: next_cursor предыдущей страницы (skip не используется)
+    - include_total: false - без подсчёта total, только has_more
     """
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
 
@@ -87,17 +97,19 @@ async def get_notifications(
     if type:
         query = query.filter(Notification.notification_type == type)
 
-    # Подсчет непрочитанных
+    # Подсчет непрочитанных: счётчик в интерфейсе всегда точный, без кеша total_counter
     unread_count = db.query(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read.is_(False)
     ).count()
 
     # Сортировка и пагинация с joinedload для оптимизации
-    total = query.count()
-    notifications = query.options(
-        joinedload(Notification.user)
-    ).order_by(desc(Notification.created_at)).offset(skip).limit(limit).all()
+    total = total_counter.count(db, query) if include_total else None
+    query = NOTIFICATIONS_KEYSET.apply(query.options(joinedload(Notification.user)), limit, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    page = NOTIFICATIONS_KEYSET.page(query.all(), limit)
+    notifications = page.items
 
     # Преобразование
     notification_responses = []
@@ -117,8 +129,11 @@ async def get_notifications(
 
     return NotificationListResponse(
         notifications=notification_responses,
-        total=total,
-        unread_count=unread_count
+        total=total.value if total is not None else None,
+        unread_count=unread_count,
+        next_cursor=page.next_cursor,
+        has_more=page.next_cursor is not None,
+        total_exact=total.exact if total is not None else True
     )
 
 
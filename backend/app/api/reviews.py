@@ -2,18 +2,32 @@
 Роуты для отзывов о курсах
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
+from app.constants import HTTP_CACHE_MAX_AGE
 from app.dependencies import get_current_user, get_current_user_optional, get_db, rate_limit_dependency
 from app.models import CourseEnrollment, Review, User
 from app.schemas.common import PaginatedResponse
 from app.schemas.review import ReviewAggregate, ReviewCreate, ReviewCreateGeneric, ReviewRead
+from app.utils.http_cache import cache_control, is_not_modified, not_modified_response, version_etag
+from app.utils.pagination import Keyset
 from app.utils.sanitization import sanitize_and_validate
 
 router = APIRouter()
 
+REVIEWS_KEYSET = Keyset(Review.created_at, Review.id, scope="course_reviews")
+
+
+def _course_reviews_version(db: Session, course_id: int):
+    """Версия отзывов курса: количество, последний id и последнее изменение"""
+    return (
+        db.query(func.count(Review.id), func.max(Review.id), func.max(Review.updated_at))
+        .filter(Review.course_id == course_id)
+        .one()
+    )
+
 
 @router.post("/courses/{course_id}/reviews", response_model=ReviewRead, status_code=status.HTTP_201_CREATED)
 def create_review(
@@ -64,38 +78,70 @@ def create_review(
 @router.get("/courses/{course_id}/reviews", response_model=PaginatedResponse[ReviewRead])
 def list_reviews(
     course_id: int,
+    request: Request,
+    response: Response,
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = None,
+    include_total: bool = True,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user_optional),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
-    # Пагинация
-    total = db.query(Review).filter(Review.course_id == course_id).count()
-    items = (
-        db.query(Review)
-        .options(joinedload(Review.reviewer))
-        .filter(Review.course_id == course_id)
-        .order_by(Review.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+    # ETag по версии отзывов курса: на If-None-Match отвечаем 304, не загружая страницу.
+    # total берётся из того же агрегата по индексу course_id, отдельный COUNT не нужен
+    total, last_id, last_updated = _course_reviews_version(db, course_id)
+    etag = version_etag(
+        "course_reviews", course_id, page, page_size, cursor, include_total, total, last_id, last_updated
+    )
+    cache_control_value = cache_control(HTTP_CACHE_MAX_AGE)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, cache_control_value)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control_value
+
+    # Пагинация: по курсору (keyset) или по номеру страницы
+    query = db.query(Review).options(joinedload(Review.reviewer)).filter(Review.course_id == course_id)
+    query = REVIEWS_KEYSET.apply(query, page_size, cursor)
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    result = REVIEWS_KEYSET.page(query.all(), page_size)
+
+    return PaginatedResponse.create(
+        result.items,
+        total if include_total else None,
+        page,
+        page_size,
+        next_cursor=result.next_cursor,
+        has_more=result.next_cursor is not None,
     )
-
-    return PaginatedResponse.create(items, total, page, page_size)
 
 
 @router.get("/courses/{course_id}/reviews/aggregate", response_model=ReviewAggregate)
 def aggregate_reviews(
     course_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
     r = (
-        db.query(func.avg(Review.rating).label("avg"), func.count(Review.id).label("total"))
+        db.query(
+            func.avg(Review.rating).label("avg"),
+            func.count(Review.id).label("total"),
+            func.max(Review.id).label("last_id"),
+            func.max(Review.updated_at).label("last_updated"),
+        )
         .filter(Review.course_id == course_id)
         .first()
     )
+    etag = version_etag("course_reviews_aggregate", course_id, r.total, r.last_id, r.last_updated)
+    cache_control_value = cache_control(HTTP_CACHE_MAX_AGE)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, cache_control_value)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control_value
+
     avg = float(r.avg) if r and r.avg is not None else 0.0
     total = int(r.total) if r and r.total else 0
 
@@ -5,7 +5,7 @@ API для работы с сессиями менторства
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import or_
 from sqlalchemy.orm import Session, joinedload, selectinload
 
@@ -14,31 +14,46 @@ from app.models.mentor import Mentor
 from app.models.session import Session as DBSession
 from app.models.user import User, UserRole
 from app.schemas.session import SessionCreate, SessionResponse, SessionUpdate
+from app.utils.pagination import Keyset
 from app.utils.sanitization import sanitize_and_validate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+SESSIONS_KEYSET = Keyset(None, DBSession.id, descending=False, scope="sessions")
+
 
 @router.get("/", response_model=list[SessionResponse])
 async def get_sessions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     rate_limit: bool = Depends(rate_limit_dependency),
 ):
-    """Получить список сессий (только для администраторов)"""
+    """
+    Получить список сессий (только для администраторов)
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Доступ запрещен. Требуются права администратора.")
 
     from app.utils.pagination import validate_pagination
     skip, limit = validate_pagination(skip, limit)
 
-    return db.query(DBSession).options(
+    query = db.query(DBSession).options(
         joinedload(DBSession.mentor),
         selectinload(DBSession.student)
-    ).offset(skip).limit(limit).all()
+    )
+    query = SESSIONS_KEYSET.apply(query, limit, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    page = SESSIONS_KEYSET.page(query.all(), limit)
+    response.headers.update(page.headers)
+    return page.items
 
 
 @router.get("/my", response_model=list[SessionResponse])
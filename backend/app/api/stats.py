@@ -11,7 +11,6 @@ from sqlalchemy.orm import Session
 
 from app.dependencies import get_current_user, get_db
 from app.models.user import User
-from app.services.cache import cache_service
 from app.utils.cache import cached
 
 logger = logging.getLogger(__name__)
@@ -25,12 +24,6 @@ async def get_platform_stats(db: Session = Depends(get_db)):
     Get overall platform statistics
     Public endpoint with caching
     """
-    # Try to get from cache
-    cache_key = "platform_stats"
-    cached = cache_service.get(cache_key)
-    if cached:
-        return cached
-
     # Calculate stats
     from app.models.user import User, UserRole
 
@@ -54,14 +47,11 @@ async def get_platform_stats(db: Session = Depends(get_db)):
     except Exception as e:
         logger.debug(f"Could not load session stats: {e}")
 
-    # Cache for 5 minutes
-    cache_service.set(cache_key, stats, ttl=300)
-
     return stats
 
 
 @router.get("/stats/user")
-@cached(ttl=300, key_prefix="user_stats")
+@cached(ttl=300, key_prefix="user_stats", tags=("user:{current_user.id}",))
 async def get_user_stats(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Get current user's statistics
@@ -101,7 +91,7 @@ async def get_user_stats(current_user: User = Depends(get_current_user), db: Ses
 
 
 @router.get("/dashboard")
-@cached(ttl=120, key_prefix="user_dashboard")
+@cached(ttl=120, key_prefix="user_dashboard", tags=("user:{current_user.id}",))
 async def get_dashboard_for_user(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Get dashboard statistics for current user with upcoming sessions and recent activities
@@ -14,9 +14,9 @@ from app.config import settings
 from app.dependencies import get_current_user, get_db
 from app.models.subscription import Subscription, SubscriptionStatus, SubscriptionTier
 from app.models.user import User
-from app.services.cache import cached
 from app.services.stripe_service import stripe_service
 from app.services.subscription_service import SubscriptionService, get_subscription_service
+from app.utils.cache import cached
 
 router = APIRouter()
 
@@ -85,7 +85,7 @@ def _get_service(db: Session = Depends(get_db)) -> SubscriptionService:
 
 
 @router.get("/plans", response_model=list[SubscriptionPlan])
-@cached(ttl=3600, key_prefix="subscription_plans")
+@cached(ttl=3600, key_prefix="subscription_plans", response_model=list[SubscriptionPlan])
 async def get_subscription_plans(
     service: SubscriptionService = Depends(_get_service)
 ):
@@ -3,15 +3,17 @@
 Обработка операций с профилем пользователя
 """
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_user, get_db, rate_limit_dependency
+from app.dependencies import get_async_db, get_current_user, get_current_user_async, get_db, rate_limit_dependency
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
-from app.services.cache import cached
+from app.utils.cache import cached, invalidate_tags
 from app.utils.sanitization import sanitize_and_validate
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: User = Depends(get_current_user), rate_limit: bool = Depends(rate_limit_dependency)
+    current_user: User = Depends(get_current_user_async), rate_limit: bool = Depends(rate_limit_dependency)
 ):
     """Получить профиль текущего пользователя"""
     return current_user
@@ -61,7 +63,6 @@ async def update_current_user_profile(
     try:
         db.commit()
         db.refresh(current_user)
-        return current_user
     except Exception as e:
         db.rollback()
         logger.error(f"Error updating user profile: {e}")
@@ -70,14 +71,19 @@ async def update_current_user_profile(
             detail="Ошибка при обновлении профиля",
         ) from e
 
+    # Профиль закеширован в GET /users/{user_id} и пользовательской статистике
+    asyncio.create_task(invalidate_tags(f"user:{current_user.id}"))
+
+    return current_user
+
 
 @router.get("/{user_id}", response_model=UserResponse)
-@cached(ttl=600, key_prefix="user_detail")
+@cached(ttl=600, key_prefix="user_detail", tags=("user:{user_id}",), response_model=UserResponse)
 async def get_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     rate_limit: bool = Depends(rate_limit_dependency),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ):
     """Получить пользователя по ID (требует авторизации)"""
     if user_id <= 0:
@@ -93,11 +99,8 @@ async def get_user(
             detail="Доступ запрещён",
         )
 
-    user = db.query(User).options(
-        joinedload(User.mentor_profile),
-        joinedload(User.sessions_as_student),
-        joinedload(User.progress_records)
-    ).filter(User.id == user_id).first()
+    # UserResponse не содержит связей - загружать их не нужно
+    user = await db.get(User, user_id)
 
     if not user:
         raise HTTPException(
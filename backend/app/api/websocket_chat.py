@@ -15,6 +15,7 @@ from app.models.message import Message
 from app.models.notification import NotificationType
 from app.models.user import User
 from app.utils.security import decode_access_token
+from app.utils.statements import get_user_by_id
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +31,7 @@ async def authenticate_websocket_user(
         if not user_id:
             raise ValueError("Invalid token")
 
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = get_user_by_id(db, int(user_id))
         if not user:
             raise ValueError("User not found")
 
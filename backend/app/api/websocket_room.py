@@ -14,6 +14,7 @@ from app.api.websocket_manager import manager
 from app.dependencies import get_db
 from app.models.chat_room import ChatMessage, ChatRoom
 from app.models.user import User
+from app.utils.statements import get_user_by_id
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,7 @@ async def authenticate_and_join_room(
     if not user_id:
         raise ValueError("Invalid token")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = get_user_by_id(db, int(user_id))
     if not user:
         raise ValueError("User not found")
 
@@ -69,6 +70,17 @@ async def handle_room_message(
         })
         return
 
+    # chat_messages has no self-referencing foreign key, so check the thread parent here
+    if parent_message_id and not db.query(ChatMessage.id).filter(
+        ChatMessage.id == parent_message_id,
+        ChatMessage.room_id == room_id
+    ).first():
+        await websocket.send_json({
+            "type": "error",
+            "message": "Parent message not found"
+        })
+        return
+
     # Save message
     chat_message = ChatMessage(
         room_id=room_id,
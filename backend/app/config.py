@@ -14,16 +14,59 @@ from .constants import (
     ALLOWED_EXTENSIONS as ALLOWED_EXTENSIONS_LIST,
 )
 from .constants import (
+    BCRYPT_ROUNDS,
+    CACHE_COMPRESSION_THRESHOLD,
+    CACHE_L1_TTL,
+    CACHE_WARMUP_CONCURRENCY,
+    CACHE_WARMUP_INTERVAL,
+    CACHE_WARMUP_TIMEOUT,
+    CACHE_WARMUP_TOP_COURSES,
+    COUNT_CACHE_MAX_BYTES,
+    COUNT_CACHE_TTL,
+    DB_CONCURRENCY_ACQUIRE_TIMEOUT,
+    DB_CONCURRENCY_MIN,
+    DB_CONCURRENCY_TARGET_WAIT,
+    DB_CONCURRENCY_WINDOW,
+    DB_N_PLUS_ONE_THRESHOLD,
     DB_POOL_RECYCLE,
+    DB_QUERY_BUDGET,
+    DB_READ_YOUR_WRITES_WINDOW,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_MAX_LAG,
     DEFAULT_BACKEND_PORT,
     DEFAULT_PAGE_SIZE,
+    EXACT_COUNT_LIMIT,
     HSTS_MAX_AGE,
     MAX_PAGE_SIZE,
     MAX_UPLOAD_SIZE,
+    MEMORY_CACHE_MAX_BYTES,
+    MEMORY_CACHE_SWEEP_INTERVAL,
+    MESSAGES_RETENTION_DAYS,
+    NOTIFICATIONS_RETENTION_DAYS,
     OAUTH_SECRET_MIN_LENGTH,
+    PARTITION_MONTHS_AHEAD,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_WORKERS,
+    PRINCIPAL_CACHE_MAX_BYTES,
+    PRINCIPAL_CACHE_TTL,
+    RATE_LIMIT_DEFAULT_MODE,
     RATE_LIMIT_DEFAULT_REQUESTS,
     RATE_LIMIT_DEFAULT_WINDOW,
+    RATE_LIMIT_SYNC_INTERVAL,
+    RATE_LIMIT_SYNC_OVERSHOOT,
     REDIS_DEFAULT_PORT,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    RETENTION_BATCH_PAUSE,
+    RETENTION_BATCH_SIZE,
+    RETENTION_MAX_BATCHES,
+    SLOW_QUERY_EXPLAIN_ANALYZE_MAX,
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    SLOW_QUERY_LOG_SIZE,
+    SLOW_QUERY_THRESHOLD,
+    TOKEN_CACHE_MAX_ENTRIES,
+    TRUSTED_PROXY_NETWORKS,
 )
 
 
@@ -94,6 +137,8 @@ class Settings(BaseSettings):
     # Priority: DATABASE_URL env var > cloud default > local default
     # In Docker production, use PgBouncer by default for connection pooling
     DATABASE_URL: str = os.environ.get("DATABASE_URL") or f"postgresql://mentorhub_user:password@{_default_db_host}/mentorhub"
+    # Async engine URL; derived from DATABASE_URL (asyncpg / aiosqlite) when empty
+    ASYNC_DATABASE_URL: str = os.environ.get("ASYNC_DATABASE_URL", "")
     DB_ECHO: bool = False
     # Optimized pool settings for production with PgBouncer
     # PgBouncer handles connection pooling, so we use smaller pool sizes
@@ -105,18 +150,82 @@ class Settings(BaseSettings):
     # PgBouncer-specific settings
     DB_CONNECT_TIMEOUT: int = int(os.environ.get("DB_CONNECT_TIMEOUT", "10"))
     PGBOUNCER_ENABLED: bool = os.environ.get("PGBOUNCER_ENABLED", "false").lower() in ("true", "1", "yes")
+    # Adaptive concurrency limit for get_db sessions, driven by pool checkout wait (off by default)
+    DB_ADAPTIVE_CONCURRENCY: bool = os.environ.get("DB_ADAPTIVE_CONCURRENCY", "false").lower() in ("true", "1", "yes")
+    DB_CONCURRENCY_MIN: int = DB_CONCURRENCY_MIN
+    DB_CONCURRENCY_TARGET_WAIT: float = float(
+        os.environ.get("DB_CONCURRENCY_TARGET_WAIT", str(DB_CONCURRENCY_TARGET_WAIT))
+    )
+    DB_CONCURRENCY_ACQUIRE_TIMEOUT: float = DB_CONCURRENCY_ACQUIRE_TIMEOUT
+    DB_CONCURRENCY_WINDOW: int = DB_CONCURRENCY_WINDOW
+    # Read replicas (comma-separated URLs); read-only endpoints use them via get_read_db
+    DATABASE_REPLICA_URLS: str = os.environ.get("DATABASE_REPLICA_URLS", "")
+    DB_REPLICA_MAX_LAG: float = DB_REPLICA_MAX_LAG
+    DB_REPLICA_CHECK_INTERVAL: int = DB_REPLICA_CHECK_INTERVAL
+    DB_READ_YOUR_WRITES_WINDOW: int = DB_READ_YOUR_WRITES_WINDOW
+    # Per-request SQL instrumentation (X-DB-* headers outside production)
+    DB_QUERY_BUDGET: int = int(os.environ.get("DB_QUERY_BUDGET", str(DB_QUERY_BUDGET)))
+    DB_N_PLUS_ONE_THRESHOLD: int = DB_N_PLUS_ONE_THRESHOLD
+    # Slow query log (GET /api/v1/admin/db/slow-queries); statement_timeout is 30s
+    SLOW_QUERY_THRESHOLD: float = float(os.environ.get("SLOW_QUERY_THRESHOLD", str(SLOW_QUERY_THRESHOLD)))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(
+        os.environ.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", str(SLOW_QUERY_EXPLAIN_SAMPLE_RATE))
+    )
+    SLOW_QUERY_EXPLAIN_ANALYZE_MAX: float = SLOW_QUERY_EXPLAIN_ANALYZE_MAX
+    SLOW_QUERY_LOG_SIZE: int = SLOW_QUERY_LOG_SIZE
+    # Retention (Celery archive_old_rows): rows older than the horizon move to *_archive tables
+    MESSAGES_RETENTION_DAYS: int = int(os.environ.get("MESSAGES_RETENTION_DAYS", str(MESSAGES_RETENTION_DAYS)))
+    NOTIFICATIONS_RETENTION_DAYS: int = int(
+        os.environ.get("NOTIFICATIONS_RETENTION_DAYS", str(NOTIFICATIONS_RETENTION_DAYS))
+    )
+    RETENTION_BATCH_SIZE: int = RETENTION_BATCH_SIZE
+    RETENTION_BATCH_PAUSE: float = RETENTION_BATCH_PAUSE
+    RETENTION_MAX_BATCHES: int = RETENTION_MAX_BATCHES
+    PARTITION_MONTHS_AHEAD: int = PARTITION_MONTHS_AHEAD
 
     # ==================== REDIS ====================
     REDIS_URL: str = os.environ.get("REDIS_URL", f"redis://{_default_redis_host}:{REDIS_DEFAULT_PORT}/0")
     REDIS_HOST: str = os.environ.get("REDIS_HOST", _default_redis_host)
     REDIS_PORT: int = int(os.environ.get("REDIS_PORT", str(REDIS_DEFAULT_PORT)))
     REDIS_DB: int = 0
+    # Один пул соединений на воркер: при исчерпании запросы ждут REDIS_POOL_TIMEOUT секунд
+    REDIS_MAX_CONNECTIONS: int = int(os.environ.get("REDIS_MAX_CONNECTIONS", str(REDIS_MAX_CONNECTIONS)))
+    REDIS_POOL_TIMEOUT: int = REDIS_POOL_TIMEOUT
+    REDIS_SOCKET_TIMEOUT: int = REDIS_SOCKET_TIMEOUT
+
+    # ==================== CACHE ====================
+    # In-process кеш (используется без Redis): бюджет в байтах и интервал очистки протухших записей
+    CACHE_MEMORY_MAX_BYTES: int = MEMORY_CACHE_MAX_BYTES
+    CACHE_SWEEP_INTERVAL: int = MEMORY_CACHE_SWEEP_INTERVAL
+    # Near-cache (L1) в каждом воркере перед Redis, согласованный через pub/sub
+    CACHE_L1_ENABLED: bool = False
+    CACHE_L1_TTL: int = CACHE_L1_TTL
+    # Сериализация значений: orjson | msgpack | json; сжатие zlib | zstd | none для значений больше порога
+    CACHE_SERIALIZER: str = "orjson"
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESSION_THRESHOLD: int = CACHE_COMPRESSION_THRESHOLD
+    # Прогрев горячих ключей при старте воркера (до готовности в /health/ready) и периодически из Celery
+    CACHE_WARMUP_ENABLED: bool = True
+    CACHE_WARMUP_KEYS: list[str] = ["course_detail", "mentors_top_rated", "mentor_specializations", "platform_stats"]
+    CACHE_WARMUP_TOP_COURSES: int = CACHE_WARMUP_TOP_COURSES
+    CACHE_WARMUP_CONCURRENCY: int = CACHE_WARMUP_CONCURRENCY
+    CACHE_WARMUP_TIMEOUT: int = CACHE_WARMUP_TIMEOUT
+    CACHE_WARMUP_INTERVAL: int = CACHE_WARMUP_INTERVAL
 
     # ==================== JWT AUTHENTICATION ====================
     SECRET_KEY: str = os.environ.get("SECRET_KEY") or ""
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Principal cache for get_current_user (per worker; 0 disables)
+    PRINCIPAL_CACHE_TTL: float = float(os.environ.get("PRINCIPAL_CACHE_TTL", str(PRINCIPAL_CACHE_TTL)))
+    PRINCIPAL_CACHE_MAX_BYTES: int = PRINCIPAL_CACHE_MAX_BYTES
+    # Verified access token payloads, kept until exp (per worker; 0 disables)
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.environ.get("TOKEN_CACHE_MAX_ENTRIES", str(TOKEN_CACHE_MAX_ENTRIES)))
+    # Password hashing: bcrypt cost (rehash on login when it changes) and its thread pool
+    BCRYPT_ROUNDS: int = int(os.environ.get("BCRYPT_ROUNDS", str(BCRYPT_ROUNDS)))
+    PASSWORD_HASH_WORKERS: int = int(os.environ.get("PASSWORD_HASH_WORKERS", str(PASSWORD_HASH_WORKERS)))
+    PASSWORD_HASH_MAX_PENDING: int = PASSWORD_HASH_MAX_PENDING
 
     # ==================== CORS ====================
 
@@ -250,6 +359,11 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_REQUESTS: int = RATE_LIMIT_DEFAULT_REQUESTS
     RATE_LIMIT_PERIOD: int = RATE_LIMIT_DEFAULT_WINDOW  # seconds (default: 60 = 1 minute)
+    RATE_LIMIT_MODE: str = os.environ.get("RATE_LIMIT_MODE", RATE_LIMIT_DEFAULT_MODE)  # "redis" | "hybrid"
+    RATE_LIMIT_SYNC_INTERVAL: float = float(os.environ.get("RATE_LIMIT_SYNC_INTERVAL", str(RATE_LIMIT_SYNC_INTERVAL)))
+    RATE_LIMIT_SYNC_OVERSHOOT: float = float(
+        os.environ.get("RATE_LIMIT_SYNC_OVERSHOOT", str(RATE_LIMIT_SYNC_OVERSHOOT))
+    )
 
     # ==================== SESSION ====================
     SESSION_EXPIRE_DAYS: int = 7
@@ -258,6 +372,8 @@ class Settings(BaseSettings):
 
     # ==================== SECURITY ====================
     ALLOWED_HOSTS: list[str] = []
+    # Адреса и сети обратных прокси: только от них учитывается X-Forwarded-For (app/utils/client_ip.py)
+    TRUSTED_PROXIES: list[str] = list(TRUSTED_PROXY_NETWORKS)
     SECURE_SSL_REDIRECT: bool = os.environ.get('ENVIRONMENT') == 'production'
     HSTS_SECONDS: int = HSTS_MAX_AGE
 
@@ -290,6 +406,10 @@ class Settings(BaseSettings):
     # ==================== PAGINATION ====================
     DEFAULT_PAGE_SIZE: int = DEFAULT_PAGE_SIZE
     MAX_PAGE_SIZE: int = MAX_PAGE_SIZE
+    # total списков: точно до EXACT_COUNT_LIMIT строк, больше - кеш на COUNT_CACHE_TTL или оценка планировщика
+    EXACT_COUNT_LIMIT: int = int(os.environ.get("EXACT_COUNT_LIMIT", str(EXACT_COUNT_LIMIT)))
+    COUNT_CACHE_TTL: int = COUNT_CACHE_TTL
+    COUNT_CACHE_MAX_BYTES: int = COUNT_CACHE_MAX_BYTES
 
     # ==================== FILE UPLOAD ====================
     MAX_UPLOAD_SIZE: int = MAX_UPLOAD_SIZE
@@ -55,8 +55,26 @@ DB_POOL_RECYCLE = 1800  # 30 minutes
 DB_POOL_TIMEOUT = 30  # 30 seconds
 
 # Cache
-MAX_MEMORY_CACHE_ITEMS = 1000
 MAX_CACHE_TTL = 3600  # 1 hour
+MEMORY_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+MEMORY_CACHE_SWEEP_INTERVAL = 60  # 1 minute
+CACHE_L1_TTL = 30  # near-cache (L1) TTL, ограничивает устаревание при потере pub/sub сообщений
+CACHE_INVALIDATION_CHANNEL = "mentorhub:cache:invalidate"
+CACHE_INVALIDATION_RETRY_DELAY = 5  # seconds
+CACHE_LOCK_PREFIX = "lock:"
+CACHE_LOCK_TIMEOUT = 10  # seconds, блокировка пересчёта ключа между воркерами
+CACHE_LOCK_POLL_INTERVAL = 0.05  # seconds
+CACHE_TAG_PREFIX = "tag:"
+CACHE_SCAN_BATCH_SIZE = 500
+CACHE_COMPRESSION_THRESHOLD = 1024  # bytes, значения меньше не сжимаются
+CACHE_COMPRESSION_LEVEL = 3
+CACHE_KEY_DIGEST_SIZE = 16  # bytes, blake2b-хеш параметров в ключе (32 hex-символа)
+CACHE_WARMUP_TOP_COURSES = 20  # самые популярные по записям курсы для прогрева
+CACHE_WARMUP_CONCURRENCY = 4
+CACHE_WARMUP_TIMEOUT = 60  # seconds
+CACHE_WARMUP_INTERVAL = 300  # seconds, периодический прогрев из Celery beat
+ETAG_DIGEST_SIZE = 16  # bytes, blake2b-хеш тела ответа в ETag
+HTTP_CACHE_MAX_AGE = 60  # seconds, Cache-Control max-age публичных ответов (браузеры, nginx)
 
 
 # ==================== RATE LIMITING ====================
@@ -67,6 +85,10 @@ RATE_LIMIT_AUTHENTICATED_WINDOW = 60  # 1 minute
 RATE_LIMIT_ANONYMOUS_REQUESTS = 20
 RATE_LIMIT_ANONYMOUS_WINDOW = 60  # 1 minute
 RATE_LIMIT_MAX_ATTEMPTS = 100
+RATE_LIMIT_MEMORY_MAX_KEYS = 10000  # clients tracked per worker when Redis is unavailable
+RATE_LIMIT_DEFAULT_MODE = "redis"  # "redis": every check in Redis; "hybrid": local buckets synced in batches
+RATE_LIMIT_SYNC_INTERVAL = 0.5  # seconds between batched Redis syncs in hybrid mode
+RATE_LIMIT_SYNC_OVERSHOOT = 0.1  # share of a limit each worker may admit ahead of the last sync
 RATE_LIMIT_DISABLED = 999999
 
 
@@ -78,6 +100,9 @@ MIN_PAGE_SIZE = 1
 DEFAULT_LIMIT = 50
 MAX_LIMIT = 100
 MIN_LIMIT = 1
+EXACT_COUNT_LIMIT = 1000  # rows counted exactly for total; larger results get a cached count or an estimate
+COUNT_CACHE_TTL = 30  # seconds a large total is cached per filter signature
+COUNT_CACHE_MAX_BYTES = 1024 * 1024  # per-worker budget of the total count cache
 
 
 # ==================== VALIDATION ====================
@@ -127,9 +152,28 @@ PHONE_MAX_LENGTH = 20
 # ==================== SECURITY ====================
 # Brute force protection
 MAX_LOGIN_ATTEMPTS = 5
+MAX_LOGIN_ATTEMPTS_PER_IP = 50  # failures from one IP across all accounts before its logins are slowed down
 LOCKOUT_DURATION_SECONDS = 900  # 15 minutes
+LOGIN_THROTTLE_STEP = 0.5  # seconds of delay per failure over MAX_LOGIN_ATTEMPTS_PER_IP
+LOGIN_THROTTLE_MAX_DELAY = 5.0  # seconds
+
+# Reverse proxies whose X-Forwarded-For is trusted (nginx on the docker network)
+TRUSTED_PROXY_NETWORKS = ("127.0.0.1/32", "::1/128", "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16")
+BRUTE_FORCE_MEMORY_MAX_ENTRIES = 10000  # counters kept per worker when Redis is unavailable
 BRUTE_FORCE_CLEANUP_INTERVAL = 3600  # 1 hour
 
+# Principal cache (get_current_user): user columns, role and mentor id per user and token
+PRINCIPAL_CACHE_TTL = 30  # seconds; 0 disables the cache
+PRINCIPAL_CACHE_MAX_BYTES = 4 * 1024 * 1024  # 4 MB per worker
+
+# Verified JWT cache: payloads of checked access tokens, kept until exp
+TOKEN_CACHE_MAX_ENTRIES = 10000  # per worker; 0 disables the cache
+
+# Password hashing: bcrypt cost and the bounded pool it runs in
+BCRYPT_ROUNDS = 12  # existing hashes with another cost are rehashed on login
+PASSWORD_HASH_WORKERS = 4  # threads per worker process
+PASSWORD_HASH_MAX_PENDING = 64  # running + queued; more get 503
+
 # Password strength
 PASSWORD_MIN_LENGTH_STRENGTH = 12
 
@@ -152,10 +196,42 @@ DB_ECHO_DEBUG = False
 # Statement timeout
 STATEMENT_TIMEOUT_MS = 30000  # 30 seconds
 
+# Read replicas
+DB_REPLICA_MAX_LAG = 5.0  # seconds; lagging replicas are skipped
+DB_REPLICA_CHECK_INTERVAL = 5  # seconds between lag / pool metric checks
+DB_READ_YOUR_WRITES_WINDOW = 10  # seconds a client's reads stay on primary after a write
+
+# Adaptive concurrency for get_db (AIMD on connection pool checkout wait)
+DB_CONCURRENCY_MIN = 2  # lower bound for the concurrent session limit
+DB_CONCURRENCY_TARGET_WAIT = 0.05  # seconds; average checkout wait above it shrinks the limit
+DB_CONCURRENCY_ACQUIRE_TIMEOUT = 5.0  # seconds a request waits for a slot before 503 (below DB_POOL_TIMEOUT)
+DB_CONCURRENCY_WINDOW = 20  # checkouts per adjustment
+
+# Per-request SQL instrumentation
+DB_QUERY_BUDGET = 20  # queries per request; more is logged and counted as budget_exceeded
+DB_N_PLUS_ONE_THRESHOLD = 5  # repeats of one SELECT within a request treated as N+1
+
+# Slow query log
+SLOW_QUERY_THRESHOLD = 0.5  # seconds
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.1  # share of slow SELECTs that get an execution plan
+SLOW_QUERY_EXPLAIN_ANALYZE_MAX = 5.0  # seconds; slower queries get EXPLAIN without ANALYZE (it re-runs the query)
+SLOW_QUERY_LOG_SIZE = 100  # entries kept per worker
+
+# Retention: rows older than the horizon move to *_archive tables
+MESSAGES_RETENTION_DAYS = 365  # messages and chat_messages
+NOTIFICATIONS_RETENTION_DAYS = 90
+RETENTION_BATCH_SIZE = 1000  # rows moved per transaction
+RETENTION_BATCH_PAUSE = 0.1  # seconds between batches (lets replicas and autovacuum keep up)
+RETENTION_MAX_BATCHES = 500  # per table per run; the rest waits for the next run
+PARTITION_MONTHS_AHEAD = 3  # monthly partitions created in advance (PostgreSQL)
+
 
 # ==================== REDIS ====================
 REDIS_DEFAULT_DB = 0
 REDIS_DEFAULT_PORT = 6379
+REDIS_MAX_CONNECTIONS = 50  # общий пул воркера (кеш, rate limiter, pub/sub)
+REDIS_POOL_TIMEOUT = 5  # seconds, ожидание свободного соединения из пула
+REDIS_SOCKET_TIMEOUT = 5  # seconds
 
 
 # ==================== WEBSOCKET ====================
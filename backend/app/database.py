@@ -4,13 +4,20 @@ SQLAlchemy setup and session management
 """
 
 import logging
-from contextlib import contextmanager
-
-from sqlalchemy import Engine, create_engine, event
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import asynccontextmanager, contextmanager
+from typing import Protocol
+
+from sqlalchemy import Engine, create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
-from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 
 from app.config import settings
+from app.utils.prometheus import DB_CONCURRENCY_REJECTED, DB_CONNECTION_POOL, DB_POOL_CHECKOUT_WAIT, DB_POOL_TIMEOUTS
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +29,125 @@ class Base(DeclarativeBase):
     pass
 
 
-def _create_engine_for_testing():
+# ==================== CONNECTION POOL TELEMETRY ====================
+
+# Called with (pool, wait_seconds, timed_out) after every checkout attempt from a monitored pool
+checkout_wait_listeners: list[Callable[[Pool, float, bool], None]] = []
+
+
+class CheckoutLimiter(Protocol):
+    def acquire(self) -> bool: ...
+
+    def release(self) -> None: ...
+
+
+# Limiters by pool label ("primary", ...): a checkout takes a slot first and gives it back on checkin
+checkout_limiters: dict[str, CheckoutLimiter] = {}
+
+_LIMITER_SLOT = "checkout_limiter"
+
+
+class DatabaseBusyError(exc.TimeoutError):
+    """No free checkout slot in the pool's limiter; served as 503 instead of waiting for pool_timeout"""
+
+
+class _PoolTelemetryMixin(QueuePool):
+    """
+    Pool telemetry on the public Pool API only: checkout wait (queue wait,
+    connect and pre-ping) and pool timeouts are measured around connect(),
+    which the engine calls for every checkout.
+
+    The primary pool gauges are read from size() / overflow() / checkedout()
+    at scrape time rather than in the checkin listener: the checkin event
+    fires before the connection is back in the pool.
+    """
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        # pool_size + max_overflow; max_overflow=-1 (no limit) counts as no overflow
+        self.capacity = pool_size + max(max_overflow, 0)
+
+    def connect(self):
+        limiter = checkout_limiters.get(_pool_label(self))
+        if limiter is not None and not limiter.acquire():
+            DB_CONCURRENCY_REJECTED.inc()
+            raise DatabaseBusyError("Database is busy, please retry")
+
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            connection = super().connect()
+        except BaseException as e:
+            timed_out = isinstance(e, exc.TimeoutError)
+            if limiter is not None:
+                limiter.release()
+            raise
+        finally:
+            _record_checkout_wait(self, time.perf_counter() - started, timed_out)
+        if limiter is not None:
+            connection.info[_LIMITER_SLOT] = limiter
+        return connection
+
+
+class MonitoredQueuePool(_PoolTelemetryMixin, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_PoolTelemetryMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _release_checkout_slot(dbapi_connection, connection_record) -> None:
+    limiter = connection_record.info.pop(_LIMITER_SLOT, None)
+    if limiter is not None:
+        limiter.release()
+
+
+# Checkout limiters are for sync pools only: waiting for a slot would block the event loop
+event.listen(MonitoredQueuePool, "checkin", _release_checkout_slot)
+
+
+def _pool_label(pool: Pool) -> str:
+    if pool is engine.pool:
+        return "primary"
+    if pool is async_engine.pool:
+        return "primary_async"
+    return "replica"
+
+
+def _record_checkout_wait(pool: Pool, wait: float, timed_out: bool) -> None:
+    label = _pool_label(pool)
+    DB_POOL_CHECKOUT_WAIT.labels(pool=label).observe(wait)
+    if timed_out:
+        DB_POOL_TIMEOUTS.labels(pool=label).inc()
+        logger.warning(f"⏳ Connection pool timeout ({label}) after {wait:.1f}s")
+    for listener in checkout_wait_listeners:
+        listener(pool, wait, timed_out)
+
+
+def pool_status(db_engine: Engine | AsyncEngine) -> dict[str, int]:
+    """Connection pool state (NullPool and other pools without counters report zeros)"""
+    pool = db_engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"size": 0, "overflow": 0, "used": 0}
+    return {"size": pool.size(), "overflow": max(pool.overflow(), 0), "used": pool.checkedout()}
+
+
+def _create_engine_for_testing(url: str | None = None):
     """Create engine for testing environment with NullPool"""
     return create_engine(
-        settings.DATABASE_URL,
+        url or settings.DATABASE_URL,
         poolclass=NullPool,
         echo=settings.DB_ECHO,
         connect_args={"check_same_thread": False},
     )
 
 
-def _create_engine_for_sqlite():
+def _create_engine_for_sqlite(url: str | None = None):
     """Create engine for SQLite with QueuePool"""
     return create_engine(
-        settings.DATABASE_URL,
-        poolclass=QueuePool,
+        url or settings.DATABASE_URL,
+        poolclass=MonitoredQueuePool,
         pool_size=settings.DB_POOL_SIZE,
         max_overflow=settings.DB_MAX_OVERFLOW,
         pool_pre_ping=True,
@@ -45,11 +156,11 @@ def _create_engine_for_sqlite():
     )
 
 
-def _create_engine_for_postgresql():
+def _create_engine_for_postgresql(url: str | None = None):
     """Create engine for PostgreSQL with PgBouncer connection pooling support"""
     # PgBouncer is used in Docker production environment
     # The DATABASE_URL should already point to pgbouncer:6432 in production
-    db_url = settings.DATABASE_URL
+    db_url = url or settings.DATABASE_URL
 
     # Detect if using PgBouncer based on host or port
     is_pgbouncer = "pgbouncer" in db_url.lower() or ":6432" in db_url
@@ -60,7 +171,7 @@ def _create_engine_for_postgresql():
         logger.info("🔄 PgBouncer detected - using optimized pool settings")
         return create_engine(
             db_url,
-            poolclass=QueuePool,
+            poolclass=MonitoredQueuePool,
             pool_size=settings.DB_POOL_SIZE,  # 5 in production with PgBouncer
             max_overflow=settings.DB_MAX_OVERFLOW,  # 10 in production with PgBouncer
             pool_pre_ping=True,  # Health check before using connection
@@ -79,7 +190,7 @@ def _create_engine_for_postgresql():
         logger.info("📡 Direct PostgreSQL connection - using standard pool settings")
         return create_engine(
             db_url,
-            poolclass=QueuePool,
+            poolclass=MonitoredQueuePool,
             pool_size=20,  # Larger pool for direct connections
             max_overflow=40,
             pool_pre_ping=True,
@@ -110,6 +221,112 @@ else:
     )
 
 
+def _primary_pool_gauge(key: str) -> Callable[[], float]:
+    return lambda: pool_status(engine)[key]
+
+
+# Primary pool gauges, read from the pool's public counters at scrape time
+for _pool_type in ("size", "overflow", "used"):
+    DB_CONNECTION_POOL.labels(pool_type=_pool_type).set_function(_primary_pool_gauge(_pool_type))
+
+
+# ==================== ASYNC ENGINE SETUP ====================
+
+# Sync dialect -> async driver for the same database
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Build async engine URL: asyncpg for PostgreSQL, aiosqlite for SQLite"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    if backend != "sqlite":
+        # sslmode is a libpq option, asyncpg expects ssl
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _create_async_engine_for_testing(url: str) -> AsyncEngine:
+    """Async engine for testing environment with NullPool"""
+    return create_async_engine(
+        url,
+        poolclass=NullPool,
+        echo=settings.DB_ECHO,
+    )
+
+
+def _create_async_engine_for_sqlite(url: str) -> AsyncEngine:
+    """Async engine for SQLite (aiosqlite)"""
+    return create_async_engine(
+        url,
+        poolclass=MonitoredAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=settings.DB_ECHO,
+    )
+
+
+def _create_async_engine_for_postgresql(url: str) -> AsyncEngine:
+    """Async engine for PostgreSQL (asyncpg) with the same PgBouncer-aware pool settings as the sync engine"""
+    db_url = url
+    is_pgbouncer = "pgbouncer" in db_url.lower() or ":6432" in db_url
+
+    connect_args: dict = {
+        "timeout": settings.DB_CONNECT_TIMEOUT,
+        "server_settings": {"application_name": "mentorhub", "statement_timeout": "30000"},
+    }
+    if is_pgbouncer:
+        # PgBouncer transaction pooling does not keep prepared statements between transactions
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+
+    return create_async_engine(
+        db_url,
+        poolclass=MonitoredAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE if is_pgbouncer else 20,
+        max_overflow=settings.DB_MAX_OVERFLOW if is_pgbouncer else 40,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        echo=settings.DB_ECHO,
+        connect_args=connect_args,
+    )
+
+
+def create_engines(url: str, async_url: str | None = None) -> tuple[Engine, AsyncEngine]:
+    """
+    Create sync and async engines for a database URL (primary or read replica)
+
+    Uses the same pool settings as the primary engines for the environment.
+    """
+    async_url = async_url or get_async_database_url(url)
+    if settings.ENVIRONMENT == "testing":
+        return _create_engine_for_testing(url), _create_async_engine_for_testing(async_url)
+    if "sqlite" in url.lower():
+        return _create_engine_for_sqlite(url), _create_async_engine_for_sqlite(async_url)
+    return _create_engine_for_postgresql(url), _create_async_engine_for_postgresql(async_url)
+
+
+_async_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+if settings.ENVIRONMENT == "testing":
+    async_engine = _create_async_engine_for_testing(_async_url)
+elif "sqlite" in settings.DATABASE_URL.lower():
+    async_engine = _create_async_engine_for_sqlite(_async_url)
+else:
+    async_engine = _create_async_engine_for_postgresql(_async_url)
+logger.info(f"⚡ Async database engine created ({async_engine.dialect.driver})")
+
+
 # ==================== CONNECTION POOL LISTENERS ====================
 
 
@@ -154,6 +371,14 @@ SessionLocal = sessionmaker(
 
 logger.info("✅ SessionLocal factory created")
 
+# expire_on_commit=False: attributes stay loaded after commit (no implicit async refresh)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 # ==================== BASE MODEL ====================
 # Base is already defined at the top of the file
@@ -251,6 +476,15 @@ def close_db():
         logger.error(f"❌ Error closing database: {e}")
 
 
+async def close_async_db():
+    """Close async database connections"""
+    try:
+        await async_engine.dispose()
+        logger.info("✅ Async database connections closed")
+    except Exception as e:
+        logger.error(f"❌ Error closing async database: {e}")
+
+
 # ==================== CONTEXT MANAGERS ====================
 
 @contextmanager
@@ -297,15 +531,42 @@ def transactional():
         db.close()
 
 
+@asynccontextmanager
+async def get_async_db_context():
+    """
+    Async context manager for database session (commit on success)
+
+    Usage:
+        async with get_async_db_context() as db:
+            user = await db.get(User, user_id)
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database error: {e}")
+            raise
+
+
 # ==================== EXPORT ====================
 
 __all__ = [
     "engine",
     "SessionLocal",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_async_database_url",
+    "create_engines",
+    "pool_status",
+    "checkout_wait_listeners",
     "Base",
     "Database",
     "init_db",
     "close_db",
+    "close_async_db",
     "get_db_context",
+    "get_async_db_context",
     "transactional",
 ]
@@ -5,18 +5,31 @@ Shared dependencies for routes: authentication, database, pagination, etc.
 
 import logging
 import time
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 import jwt
 from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal, SessionLocal
 from app.models import User
 from app.models.user import UserRole
 from app.schemas import PaginationParams
+from app.utils import statements
+from app.utils.principal_cache import (
+    UNKNOWN,
+    Principal,
+    attach_user,
+    attach_user_async,
+    remember_principal,
+    request_principal,
+    with_mentor_id,
+)
+from app.utils.read_replicas import Replica, client_key, replica_router
+from app.utils.token_cache import decode_verified
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
@@ -26,7 +39,12 @@ security = HTTPBearer(auto_error=False)
 
 
 def get_db() -> Generator[Session, None, None]:
-    """Get database session with proper error handling."""
+    """
+    Get database session with proper error handling.
+
+    With DB_ADAPTIVE_CONCURRENCY the primary pool takes a limiter slot when the
+    session actually checks out a connection (see utils/db_concurrency.py).
+    """
     db = SessionLocal()
     try:
         yield db
@@ -40,16 +58,30 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session (asyncpg / aiosqlite) with proper error handling."""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            # Endpoints manage their own commits, same as get_db
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database error: {e}", exc_info=True)
+            raise
+
+
 # ==================== AUTHENTICATION DEPENDENCIES ====================
 
 
 class TokenPayload:
     """Token payload model"""
 
-    def __init__(self, user_id: int, email: str, role: str):
+    def __init__(self, user_id: int, email: str, role: str, token_version: int = 0):
         self.user_id = user_id
         self.email = email
         self.role = role
+        # Issue time (iat): tokens issued after a login/refresh never share cached principals with older ones
+        self.token_version = token_version
 
 
 def verify_token(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> TokenPayload:
@@ -60,14 +92,8 @@ def verify_token(credentials: HTTPAuthorizationCredentials | None = Depends(secu
     token = credentials.credentials
 
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-            audience="mentorhub",
-            issuer="mentorhub-api",
-            options={"require": ["aud", "iss", "exp"]},
-        )
+        # Full signature and claim check once per token, then from the verified-token cache until exp
+        payload = decode_verified(token)
 
         sub_value = payload.get("sub")
         if sub_value is None:
@@ -86,7 +112,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials | None = Depends(secu
                 detail="Invalid token payload: missing email",
             )
 
-        return TokenPayload(user_id=user_id, email=email, role=role or "student")
+        return TokenPayload(
+            user_id=user_id, email=email, role=role or "student", token_version=int(payload.get("iat") or 0)
+        )
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired") from None
@@ -98,22 +126,59 @@ def verify_token(credentials: HTTPAuthorizationCredentials | None = Depends(secu
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate token") from e
 
 
-def get_current_user(
-    token: TokenPayload = Depends(verify_token),
-    db: Session = Depends(get_db),
-) -> User:
-    """Get current authenticated user"""
-    user = db.query(User).filter(User.id == token.user_id).first()
+def _load_user(request: Request, token: TokenPayload, db: Session) -> tuple[User, Principal] | None:
+    """User and principal for the token: from the principal cache without a query, otherwise one SELECT"""
+    principal = request_principal(request, token.user_id, token.token_version)
+    if principal is not None:
+        return attach_user(db, principal), principal
+
+    user = statements.get_user_by_id(db, token.user_id)
+    if user is None:
+        return None
+    return user, remember_principal(request, Principal.from_user(user, token.token_version))
 
+
+async def _load_user_async(request: Request, token: TokenPayload, db: AsyncSession) -> tuple[User, Principal] | None:
+    """Async counterpart of _load_user"""
+    principal = request_principal(request, token.user_id, token.token_version)
+    if principal is not None:
+        return await attach_user_async(db, principal), principal
+
+    user = await statements.get_user_by_id_async(db, token.user_id)
     if user is None:
+        return None
+    return user, remember_principal(request, Principal.from_user(user, token.token_version))
+
+
+def _active_user(loaded: tuple[User, Principal] | None) -> User:
+    if loaded is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    if not user.is_active:
+    user, principal = loaded
+    if not principal.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account is inactive")
 
     return user
 
 
+def get_current_user(
+    request: Request,
+    token: TokenPayload = Depends(verify_token),
+    db: Session = Depends(get_db),
+) -> User:
+    """Get current authenticated user"""
+    return _active_user(_load_user(request, token, db))
+
+
+async def get_current_user_async(
+    request: Request,
+    token: TokenPayload = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Get current authenticated user without blocking the event loop (for async endpoints)"""
+    return _active_user(await _load_user_async(request, token, db))
+
+
 def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     """Get current user and verify admin role"""
     if not current_user.is_admin:
@@ -140,19 +205,27 @@ def get_current_student(current_user: User = Depends(get_current_user)) -> User:
 
 
 def get_current_user_mentor_id(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> int | None:
     """Return the mentor profile ID for the current user, or None if not a mentor."""
-    from app.models.mentor import Mentor
-    mentor = db.query(Mentor).filter(Mentor.user_id == current_user.id).first()
-    return mentor.id if mentor else None
+    # Set by get_current_user for this request (absent when it is overridden)
+    principal: Principal | None = getattr(request.state, "principal", None)
+    if principal is not None and principal.mentor_id is not UNKNOWN:
+        return principal.mentor_id
+
+    mentor_id = statements.get_mentor_id_by_user_id(db, current_user.id)
+    if principal is not None:
+        with_mentor_id(request, principal, mentor_id)
+    return mentor_id
 
 
 # ==================== OPTIONAL AUTHENTICATION ====================
 
 
 def get_current_user_optional(
+    request: Request,
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
 ) -> User | None:
@@ -162,12 +235,55 @@ def get_current_user_optional(
 
     try:
         token_payload = verify_token(credentials)
-        user = db.query(User).filter(User.id == token_payload.user_id).first()
-        return user if user and user.is_active else None
+        loaded = _load_user(request, token_payload, db)
+        return loaded[0] if loaded is not None and loaded[1].is_active else None
+    except HTTPException:
+        return None
+
+
+def get_token_payload_optional(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> TokenPayload | None:
+    """Get token payload if a valid token is present (no database access)"""
+    if not credentials:
+        return None
+
+    try:
+        return verify_token(credentials)
     except HTTPException:
         return None
 
 
+# ==================== READ REPLICA DEPENDENCIES ====================
+
+
+async def get_read_replica(
+    request: Request,
+    token: TokenPayload | None = Depends(get_token_payload_optional),
+) -> Replica | None:
+    """Read replica for this client; None - read from primary (no replicas, lag, or a recent write)"""
+    return await replica_router.route(client_key(request, token))
+
+
+def get_read_db(replica: Replica | None = Depends(get_read_replica)) -> Generator[Session, None, None]:
+    """Database session for read-only endpoints: a read replica when available, otherwise primary."""
+    # The primary session is opened only when no replica qualifies
+    db = replica.session_factory() if replica is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(
+    replica: Replica | None = Depends(get_read_replica),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Async database session for read-only endpoints: a read replica when available, otherwise primary."""
+    session_factory = replica.async_session_factory if replica is not None else AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+
 # ==================== PAGINATION DEPENDENCY ====================
 
 
@@ -225,9 +341,7 @@ def verify_user_ownership(
 
 def get_mentor_by_id(mentor_id: int, db: Session = Depends(get_db)):
     """Get mentor by ID and verify exists"""
-    from app.models import Mentor
-
-    mentor = db.query(Mentor).filter(Mentor.id == mentor_id).first()
+    mentor = statements.get_mentor_by_id(db, mentor_id)
     if not mentor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mentor not found")
     return mentor
@@ -235,9 +349,7 @@ def get_mentor_by_id(mentor_id: int, db: Session = Depends(get_db)):
 
 def get_session_by_id(session_id: int, db: Session = Depends(get_db)):
     """Get session by ID and verify exists"""
-    from app.models import Session as SessionModel
-
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = statements.get_session_by_id(db, session_id)
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     return session
@@ -249,9 +361,7 @@ def verify_session_access(
     db: Session = Depends(get_db),
 ) -> object:
     """Verify that current user has access to session (as mentor, student, or admin)"""
-    from app.models import Session as SessionModel
-
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = statements.get_session_by_id(db, session_id)
     if not session:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
@@ -340,13 +450,14 @@ _webhook_rate_limiter = (
 
 
 def rate_limit_dependency(
-    current_user: User | None = Depends(get_current_user_optional),
+    token: TokenPayload | None = Depends(get_token_payload_optional),
 ) -> bool:
     """Rate limiting dependency — Redis-backed, multi-worker safe."""
     if not _rate_limiter:
         return True
 
-    client_id = f"user_{current_user.id}" if current_user else "anonymous"
+    # Only the user id is needed: the token is enough, no database session per request
+    client_id = f"user_{token.user_id}" if token else "anonymous"
 
     if not _rate_limiter.is_allowed(client_id):
         raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
@@ -14,9 +14,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from redis.asyncio import Redis
 
-from app.config import is_production, settings
-from app.database import Base, engine
-from app.utils.cache import init_cache
+from app.config import is_production, is_testing, settings
+from app.database import Base, close_async_db, engine
+from app.utils.cache import init_cache, shutdown_cache
+from app.utils.cache_serializer import CacheSerializer
+from app.utils.cache_warmup import start_cache_warmup, stop_cache_warmup
+from app.utils.principal_cache import principal_cache
+from app.utils.read_replicas import replica_router, start_replica_monitor, stop_replica_monitor
+from app.utils.security import brute_force_protection, password_hasher
 
 logger = logging.getLogger(__name__)
 
@@ -79,15 +84,31 @@ def get_redis_client() -> Redis | None:
 
 
 def initialize_redis_client() -> Redis | None:
-    """Initialize Redis client if configured"""
+    """
+    Initialize Redis client if configured
+
+    The client is created once per worker on top of a bounded blocking
+    connection pool and shared by the cache, rate limiter and pub/sub;
+    repeated calls return the existing client.
+    """
     global redis_client
 
+    if redis_client is not None:
+        return redis_client
+
     try:
-        from redis.asyncio import Redis
+        from redis.asyncio import BlockingConnectionPool, Redis
 
         # Initialize Redis if URL is configured (even localhost)
         if settings.REDIS_URL and settings.REDIS_URL.strip():
-            redis_client = Redis.from_url(settings.REDIS_URL)
+            pool = BlockingConnectionPool.from_url(
+                settings.REDIS_URL,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+            redis_client = Redis.from_pool(pool)
             logger.info(f"✅ Redis client initialized with URL: {settings.REDIS_URL[:50]}...")
         else:
             logger.info("ℹ️ Redis URL not configured, using memory-only features")
@@ -167,9 +188,22 @@ async def shutdown_database():
     except Exception as e:
         logger.error(f"❌ Error disposing database engine: {e}")
 
+    await close_async_db()
+
+
+async def is_redis_reachable(client: Redis | None) -> bool:
+    """Check that Redis answers PING (used to fall back to memory-only cache)"""
+    if client is None:
+        return False
+    try:
+        return bool(await client.ping())
+    except Exception as e:
+        logger.debug(f"Redis ping failed: {e}")
+        return False
+
 
 async def shutdown_redis():
-    """Close Redis connection gracefully"""
+    """Close Redis connection pool gracefully"""
     global redis_client  # noqa: F824
 
     if redis_client:
@@ -199,13 +233,42 @@ async def lifespan(app: FastAPI):
     # Initialize Redis
     initialize_redis_client()
 
-    # Initialize cache with Redis client if available
-    init_cache(redis_client)
+    # Initialize cache with the shared Redis client (memory-only if Redis is unreachable)
+    if await is_redis_reachable(redis_client):
+        cache_redis = redis_client
+    else:
+        cache_redis = None
+        logger.info("ℹ️ Using memory cache (Redis not available)")
+    cache = init_cache(
+        cache_redis,
+        max_memory_bytes=settings.CACHE_MEMORY_MAX_BYTES,
+        near_cache=settings.CACHE_L1_ENABLED,
+        near_cache_ttl=settings.CACHE_L1_TTL,
+        serializer=CacheSerializer(
+            codec=settings.CACHE_SERIALIZER,
+            compression=settings.CACHE_COMPRESSION,
+            compress_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+        ),
+    )
+    brute_force_protection.set_redis(cache_redis)
+    principal_cache.connect(cache)
+    cache.start_sweeper(settings.CACHE_SWEEP_INTERVAL)
+    cache.start_invalidation_listener()
     logger.info("✅ Cache initialized")
 
     # Initialize database
     await startup_database()
 
+    # Read replicas are used once the first lag check passes
+    if replica_router.enabled:
+        start_replica_monitor()
+        logger.info(f"📚 Read replica monitor started ({len(replica_router.replicas)} replicas)")
+
+    # Warm up hot cache keys in background; /health/ready reports 503 until it finishes
+    if settings.CACHE_WARMUP_ENABLED and not is_testing():
+        start_cache_warmup()
+        logger.info("🔥 Cache warm-up started")
+
     # Log startup info
     logger.info(f"📊 Environment: {settings.ENVIRONMENT}")
     logger.info(f"🔒 Debug mode: {settings.DEBUG}")
@@ -217,10 +280,19 @@ async def lifespan(app: FastAPI):
     logger.info("🛑 Lifespan shutdown triggered...")
     logger.info("🔄 Closing all connections gracefully...")
 
+    # Stop cache background tasks
+    await stop_cache_warmup()
+    principal_cache.disconnect()
+    await shutdown_cache()
+
+    # Stop the bcrypt thread pool
+    password_hasher.shutdown()
+
     # Close Redis connection
     await shutdown_redis()
 
     # Close database connections
+    await stop_replica_monitor()
     await shutdown_database()
 
     logger.info("✅ Lifespan shutdown complete")
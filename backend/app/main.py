@@ -20,6 +20,7 @@ from app.config import is_production, settings
 from app.constants import EXCLUDE_PORTS
 from app.lifespan import get_shutdown_event, initialize_redis_client, lifespan
 from app.middleware.setup import register_middleware
+from app.utils.cache_warmup import is_cache_warm
 from app.utils.error_handlers import register_error_handlers
 from app.utils.prometheus import metrics_endpoint
 
@@ -121,6 +122,11 @@ async def readiness_check():
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"status": "shutting_down", "message": "Service is shutting down"}
         )
+    if not is_cache_warm():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up", "message": "Cache warm-up in progress"}
+        )
     return {"status": "ready"}
 
 
@@ -6,6 +6,7 @@ Consolidated middleware to avoid duplication.
 """
 
 from .rate_limiter_unified import (
+    HybridRateLimiter,
     RateLimiter,
     UnifiedRateLimitMiddleware,
     create_rate_limiter,
@@ -19,6 +20,7 @@ __all__ = [
     # Rate limiting (unified)
     "UnifiedRateLimitMiddleware",
     "RateLimiter",
+    "HybridRateLimiter",
     "create_rate_limiter",
 
     # Security
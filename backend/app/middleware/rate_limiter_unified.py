@@ -5,18 +5,23 @@ Unified rate limiting with Redis backend and per-endpoint configuration.
 Replaces both rate_limiter.py and rate_limit_advanced.py
 
 Features:
-- Redis-backed rate limiting with automatic memory fallback
+- GCRA (generic cell rate algorithm) limiter: one Redis key and one script
+  call per request, with a bounded in-memory fallback
+- Hybrid mode: per-worker buckets reconciled with Redis in batches
 - Per-endpoint rate limits
 - User-based throttling (authenticated vs anonymous)
 - API abuse protection
 - Returns proper 429 responses with retry-after headers
+- X-RateLimit-Limit / Remaining / Reset headers on every limited endpoint
 """
 
+import asyncio
 import hashlib
 import logging
+import math
 import time
-from collections import defaultdict
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 
 from fastapi import Request, status
@@ -29,27 +34,95 @@ from app.constants import (
     RATE_LIMIT_AUTHENTICATED_REQUESTS,
     RATE_LIMIT_DEFAULT_REQUESTS,
     RATE_LIMIT_DEFAULT_WINDOW,
+    RATE_LIMIT_MEMORY_MAX_KEYS,
+    RATE_LIMIT_SYNC_INTERVAL,
+    RATE_LIMIT_SYNC_OVERSHOOT,
 )
+from app.utils.client_ip import get_client_ip
 
 logger = logging.getLogger(__name__)
 
+# GCRA: the key stores the theoretical arrival time (TAT) in ms. Each request
+# moves it by interval = window / limit; a request is rejected while TAT would
+# run more than window ahead of now. Uses the Redis clock so all workers agree.
+# Returns {limited, remaining, retry_after_ms, reset_after_ms}.
+GCRA_SCRIPT = """
+local clock = redis.call("time")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tat = math.max(tonumber(redis.call("get", KEYS[1]) or now), now)
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then
+    return {1, 0, allow_at - now, tat - now}
+end
+redis.call("set", KEYS[1], string.format("%.0f", new_tat), "PX", new_tat - now)
+return {0, math.floor((now - allow_at) / interval), 0, new_tat - now}
+"""
+
+# Hybrid mode sync: ARGV holds (interval_ms, admitted) per key. Requests admitted
+# locally since the last sync were already served, so they only move the shared
+# TAT forward. Returns how far each TAT is ahead of the Redis clock, in ms.
+GCRA_SYNC_SCRIPT = """
+local clock = redis.call("time")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local ahead = {}
+for i = 1, #KEYS do
+    local interval = tonumber(ARGV[i * 2 - 1])
+    local admitted = tonumber(ARGV[i * 2])
+    local tat = math.max(tonumber(redis.call("get", KEYS[i]) or now), now) + interval * admitted
+    redis.call("set", KEYS[i], string.format("%.0f", tat), "PX", tat - now)
+    ahead[i] = tat - now
+end
+return ahead
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """Outcome of one rate limit check; times are in seconds"""
+
+    limited: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if self.limited:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
 
 class RateLimiter:
-    """Rate limiter with Redis backend and automatic memory fallback"""
+    """
+    GCRA rate limiter with Redis backend and automatic memory fallback
+
+    State per client is a single timestamp, so memory does not grow with
+    request volume. `max_requests` may arrive as a burst; after that requests
+    are admitted one per `window_seconds / max_requests`.
+    """
 
-    def __init__(self, redis_client: Redis | None = None):
+    def __init__(self, redis_client: Redis | None = None, max_keys: int = RATE_LIMIT_MEMORY_MAX_KEYS):
         self.redis = redis_client
-        self.memory_store: dict[str, list[datetime]] = defaultdict(list)
-        self.memory_store_locks: dict[str, datetime] = {}
+        self.max_keys = max_keys
+        # Memory fallback: key -> TAT in seconds, least recently used first
+        self.memory_store: OrderedDict[str, float] = OrderedDict()
 
-    async def is_rate_limited(
+    async def check(
         self,
         key: str,
         max_requests: int = RATE_LIMIT_DEFAULT_REQUESTS,
         window_seconds: int = RATE_LIMIT_DEFAULT_WINDOW
-    ) -> bool:
+    ) -> RateLimitResult:
         """
-        Check if request should be rate limited
+        Count a request and report whether it is over the limit
 
         Args:
             key: Unique identifier (IP address, user ID, etc.)
@@ -57,51 +130,178 @@ class RateLimiter:
             window_seconds: Time window in seconds
 
         Returns:
-            True if rate limit exceeded, False otherwise
+            RateLimitResult with the remaining quota and retry/reset times
         """
-        # Try Redis first if available
         if self.redis:
             try:
-                current_time = time.time()
-                redis_key = f"rate_limit:{key}"
+                interval_ms = max(round(window_seconds * 1000 / max_requests), 1)
+                limited, remaining, retry_ms, reset_ms = await self.redis.eval(
+                    GCRA_SCRIPT, 1, f"rate_limit:{key}", interval_ms, window_seconds * 1000
+                )
+                return RateLimitResult(
+                    limited=bool(limited),
+                    limit=max_requests,
+                    remaining=int(remaining),
+                    retry_after=int(retry_ms) / 1000,
+                    reset_after=int(reset_ms) / 1000,
+                )
+            except Exception as e:
+                logger.debug(f"Redis rate limit failed, using memory fallback: {e}")
+                self.redis = None
 
-                # Use Redis pipeline for atomic operations
-                pipe = self.redis.pipeline()
-                pipe.zadd(redis_key, {str(current_time): current_time})
-                pipe.zremrangebyscore(redis_key, 0, current_time - window_seconds)
-                pipe.zcard(redis_key)
-                pipe.expire(redis_key, window_seconds)
+        return self._check_memory(key, max_requests, window_seconds, time.monotonic())
+
+    def _check_memory(self, key: str, max_requests: int, window_seconds: int, now: float) -> RateLimitResult:
+        """Same GCRA as GCRA_SCRIPT over the per-worker memory store"""
+        self._evict_idle(now)
+        interval = window_seconds / max_requests
+        tat = max(self.memory_store.get(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - window_seconds
+
+        if now < allow_at:
+            return RateLimitResult(True, max_requests, 0, allow_at - now, tat - now)
+
+        self.memory_store[key] = new_tat
+        self.memory_store.move_to_end(key)
+        while len(self.memory_store) > self.max_keys:
+            self.memory_store.popitem(last=False)
+        # Small epsilon keeps float error from eating a whole request
+        remaining = int((now - allow_at) / interval + 1e-9)
+        return RateLimitResult(False, max_requests, remaining, 0.0, new_tat - now)
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop least recently used keys whose bucket has fully refilled (same as no entry)"""
+        while self.memory_store:
+            key, tat = next(iter(self.memory_store.items()))
+            if tat > now:
+                break
+            del self.memory_store[key]
 
-                results = await pipe.execute()
-                request_count = results[2]
+    async def is_rate_limited(
+        self,
+        key: str,
+        max_requests: int = RATE_LIMIT_DEFAULT_REQUESTS,
+        window_seconds: int = RATE_LIMIT_DEFAULT_WINDOW
+    ) -> bool:
+        """
+        Check if request should be rate limited
 
-                if request_count > max_requests:
-                    logger.warning(f"Rate limit exceeded for {key}: {request_count}/{max_requests}")
-                    return True
-                return False
+        Returns:
+            True if rate limit exceeded, False otherwise
+        """
+        result = await self.check(key, max_requests, window_seconds)
+        if result.limited:
+            logger.warning(f"Rate limit exceeded for {key}: {max_requests}/{window_seconds}s")
+        return result.limited
 
-            except Exception as e:
-                logger.debug(f"Redis rate limit failed, using memory fallback: {e}")
-                self.redis = None
 
-        # Fallback to memory store
-        now = datetime.now()
-        window_start = now - timedelta(seconds=window_seconds)
+class HybridRateLimiter(RateLimiter):
+    """
+    Per-worker GCRA buckets reconciled with Redis in batches
+
+    Checks run against the worker's memory store, with no network round
+    trip. Requests admitted since the last sync are sent to Redis in one
+    script call every `sync_interval` seconds. The reply moves each local
+    TAT forward by what the other workers consumed.
 
-        # Clean old entries
-        self.memory_store[key] = [
-            req_time for req_time in self.memory_store[key]
-            if req_time > window_start
-        ]
+    A worker admits at most `overshoot * limit` requests per key (at least 1)
+    ahead of the last sync. The request that reaches this budget waits for a
+    sync. Across N workers the global limit can be exceeded by at most N
+    budgets per sync interval; overshoot=0 syncs on every request.
 
-        # Check limit
-        if len(self.memory_store[key]) >= max_requests:
-            logger.warning(f"Rate limit exceeded for {key} (memory store)")
-            return True
+    A failed sync keeps its batch for the next attempt one interval later;
+    until then requests do not wait for Redis.
+    """
 
-        # Record request
-        self.memory_store[key].append(now)
-        return False
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        sync_interval: float = RATE_LIMIT_SYNC_INTERVAL,
+        overshoot: float = RATE_LIMIT_SYNC_OVERSHOOT,
+        max_keys: int = RATE_LIMIT_MEMORY_MAX_KEYS,
+    ):
+        super().__init__(redis_client, max_keys)
+        self.sync_interval = sync_interval
+        self.overshoot = overshoot
+        # key -> [requests admitted since the last sync, GCRA interval in ms]
+        self._pending: dict[str, list[int]] = {}
+        self._sync_handle: asyncio.TimerHandle | None = None
+        # Event loop of _sync_handle: a handle from another (closed) loop never fires
+        self._sync_loop: asyncio.AbstractEventLoop | None = None
+        self._sync_task: asyncio.Task | None = None
+        # After a failed sync, requests stop waiting for Redis until this time
+        self._retry_at = 0.0
+
+    async def check(
+        self,
+        key: str,
+        max_requests: int = RATE_LIMIT_DEFAULT_REQUESTS,
+        window_seconds: int = RATE_LIMIT_DEFAULT_WINDOW
+    ) -> RateLimitResult:
+        """Count a request against the local bucket; see RateLimiter.check"""
+        result = self._check_memory(key, max_requests, window_seconds, time.monotonic())
+        if result.limited or not self.redis:
+            return result
+
+        pending = self._pending.setdefault(key, [0, max(round(window_seconds * 1000 / max_requests), 1)])
+        pending[0] += 1
+        if pending[0] >= max(int(max_requests * self.overshoot), 1) and time.monotonic() >= self._retry_at:
+            await self.sync()
+        else:
+            self._schedule_sync()
+        return result
+
+    def _schedule_sync(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._sync_handle is None or self._sync_loop is not loop:
+            self._sync_handle = loop.call_later(self.sync_interval, self._start_sync)
+            self._sync_loop = loop
+
+    def _start_sync(self) -> None:
+        self._sync_handle = None
+        self._sync_task = asyncio.ensure_future(self.sync())
+
+    async def sync(self) -> None:
+        """Send requests admitted since the last sync to Redis and adopt the shared state"""
+        if self._sync_handle is not None:
+            if self._sync_loop is asyncio.get_running_loop():
+                self._sync_handle.cancel()
+            self._sync_handle = None
+        batch, self._pending = self._pending, {}
+        if not batch or not self.redis:
+            return
+
+        keys = list(batch)
+        args = [value for key in keys for value in (batch[key][1], batch[key][0])]
+        try:
+            ahead = await self.redis.eval(GCRA_SYNC_SCRIPT, len(keys), *(f"rate_limit:{key}" for key in keys), *args)
+        except Exception as e:
+            logger.error(f"Redis rate limit sync failed, retrying in {self.sync_interval}s: {e}")
+            self._requeue(batch)
+            self._retry_at = time.monotonic() + self.sync_interval
+            self._schedule_sync()
+            return
+        self._retry_at = 0.0
+
+        # The shared TAT already includes this worker's requests, so it replaces
+        # the local one when it is further ahead
+        now = time.monotonic()
+        for key, ahead_ms in zip(keys, ahead):
+            tat = now + int(ahead_ms) / 1000
+            if tat > self.memory_store.get(key, now):
+                self.memory_store[key] = tat
+                self.memory_store.move_to_end(key)
+
+    def _requeue(self, batch: dict[str, list[int]]) -> None:
+        """Return an unsent batch to the pending counts (bounded by max_keys)"""
+        for key, (count, interval) in batch.items():
+            pending = self._pending.get(key)
+            if pending is None:
+                if len(self._pending) >= self.max_keys:
+                    continue
+                pending = self._pending[key] = [0, interval]
+            pending[0] += count
 
 
 class UnifiedRateLimitMiddleware(BaseHTTPMiddleware):
@@ -116,10 +316,13 @@ class UnifiedRateLimitMiddleware(BaseHTTPMiddleware):
         app: Any,
         redis_client: Redis | None = None,
         enabled: bool = True,
+        mode: str = "redis",
+        sync_interval: float = RATE_LIMIT_SYNC_INTERVAL,
+        overshoot: float = RATE_LIMIT_SYNC_OVERSHOOT,
     ):
         super().__init__(app)
         self.enabled = enabled
-        self.rate_limiter = RateLimiter(redis_client)
+        self.rate_limiter = create_rate_limiter(redis_client, mode, sync_interval, overshoot)
 
         # Per-endpoint rate limits (requests per minute)
         self.endpoint_limits: dict[str, dict[str, int]] = {
@@ -145,9 +348,8 @@ class UnifiedRateLimitMiddleware(BaseHTTPMiddleware):
 
     def _get_client_key(self, request: Request) -> tuple[str, str]:
         """Generate client key based on IP and user ID"""
-        # Get IP address (handle proxies)
-        forwarded = request.headers.get("X-Forwarded-For")
-        ip = forwarded.split(",")[0].strip() if forwarded else (request.client.host if request.client else "unknown")
+        # Get IP address (X-Forwarded-For only from trusted proxies)
+        ip = get_client_ip(request)
 
         # Get user ID from auth header (if authenticated)
         auth_header = request.headers.get("Authorization", "")
@@ -197,27 +399,30 @@ class UnifiedRateLimitMiddleware(BaseHTTPMiddleware):
         # Get limits for this endpoint and user type
         max_requests, window = self._get_limits_for_endpoint(endpoint_key, user_type)
 
-        # Check rate limit
-        if await self.rate_limiter.is_rate_limited(client_key, max_requests, window):
+        # Check rate limit (counters are per client and endpoint group)
+        result = await self.rate_limiter.check(f"{client_key}:{endpoint_key}", max_requests, window)
+        if result.limited:
             logger.warning(
                 f"Rate limit exceeded: {client_key} on {endpoint_key} "
                 f"({user_type}: {max_requests} req/{window}s)"
             )
 
-            retry_after = window
+            headers = result.headers()
             return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "detail": "Too many requests",
-                    "retry_after": retry_after,
+                    "retry_after": int(headers["Retry-After"]),
                     "limit": max_requests,
                     "window": f"{window} seconds",
                 },
-                headers={"Retry-After": str(retry_after)},
+                headers=headers,
             )
 
         # Process request
-        return await call_next(request)
+        response = await call_next(request)
+        response.headers.update(result.headers())
+        return response
 
 
 # Backward compatibility aliases
@@ -225,6 +430,15 @@ RateLimitMiddleware = UnifiedRateLimitMiddleware
 AdvancedRateLimitMiddleware = UnifiedRateLimitMiddleware
 
 
-def create_rate_limiter(redis_client: Redis | None = None) -> RateLimiter:
-    """Create rate limiter instance"""
+def create_rate_limiter(
+    redis_client: Redis | None = None,
+    mode: str = "redis",
+    sync_interval: float = RATE_LIMIT_SYNC_INTERVAL,
+    overshoot: float = RATE_LIMIT_SYNC_OVERSHOOT,
+) -> RateLimiter:
+    """Create rate limiter instance ("redis": every check in Redis, "hybrid": local buckets synced in batches)"""
+    if mode == "hybrid":
+        return HybridRateLimiter(redis_client, sync_interval=sync_interval, overshoot=overshoot)
+    if mode != "redis":
+        raise ValueError(f"Unknown rate limit mode: {mode}")
     return RateLimiter(redis_client)
@@ -0,0 +1,34 @@
+"""
+Read-your-writes Middleware
+После успешной записи чтения клиента идут на primary, пока реплики догоняют
+"""
+
+import logging
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.utils.read_replicas import UNSAFE_METHODS, client_key_from_request, replica_router
+
+logger = logging.getLogger(__name__)
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Отмечает клиентов, выполнивших запись (POST/PUT/PATCH/DELETE)
+
+    get_read_db направляет чтения отмеченного клиента на primary в течение
+    DB_READ_YOUR_WRITES_WINDOW секунд. Регистрируется только при
+    настроенных репликах.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        if request.method in UNSAFE_METHODS and response.status_code < 400:
+            try:
+                await replica_router.mark_write(client_key_from_request(request))
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to mark client write for read-your-writes: {e}")
+
+        return response
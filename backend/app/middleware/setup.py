@@ -16,11 +16,14 @@ from starlette.middleware.gzip import GZipMiddleware
 from app.config import is_production, settings
 from app.constants import DEFAULT_MAX_BODY_SIZE
 from app.middleware.rate_limiter_unified import UnifiedRateLimitMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
 from app.middleware.request_id import RequestIDMiddleware
 from app.middleware.request_logging import RequestLoggingMiddleware
 from app.middleware.security_advanced import SecurityMiddleware
 from app.utils.monitoring import PerformanceMiddleware, performance_monitor
 from app.utils.prometheus import PrometheusMiddleware
+from app.utils.read_replicas import replica_router
+from app.utils.sql_instrumentation import SQLInstrumentationMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +37,9 @@ def register_middleware(app: FastAPI, redis_client: Any = None) -> None:
     2. Request Logging (after Request ID)
     3. Rate Limiting (early for protection)
     4. Prometheus Metrics
+    4a. SQL instrumentation (queries per request, N+1)
     5. Performance Monitoring
+    5a. Read-your-writes (only with read replicas)
     6. Security (before CORS)
     7. CORS
     8. Trusted Host (production only)
@@ -59,9 +64,12 @@ def register_middleware(app: FastAPI, redis_client: Any = None) -> None:
         app.add_middleware(
             UnifiedRateLimitMiddleware,
             redis_client=redis_client,
-            enabled=True
+            enabled=True,
+            mode=settings.RATE_LIMIT_MODE,
+            sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL,
+            overshoot=settings.RATE_LIMIT_SYNC_OVERSHOOT,
         )
-        logger.info("✅ Unified Rate limiting middleware added (per-endpoint limits)")
+        logger.info(f"✅ Unified Rate limiting middleware added (per-endpoint limits, {settings.RATE_LIMIT_MODE} mode)")
     else:
         logger.info("ℹ️ Rate limiting disabled by configuration")
 
@@ -69,10 +77,19 @@ def register_middleware(app: FastAPI, redis_client: Any = None) -> None:
     app.add_middleware(PrometheusMiddleware)
     logger.info("✅ Prometheus metrics middleware added")
 
+    # 4a. SQL instrumentation: queries per request by route, N+1, query budget headers
+    app.add_middleware(SQLInstrumentationMiddleware)
+    logger.info("✅ SQL instrumentation middleware added")
+
     # 5. Performance Monitoring Middleware
     app.add_middleware(PerformanceMiddleware, monitor=performance_monitor)
     logger.info("✅ Performance monitoring middleware added")
 
+    # 5a. Read-your-writes: after a write the client reads from primary for a while
+    if replica_router.enabled:
+        app.add_middleware(ReadYourWritesMiddleware)
+        logger.info("✅ Read-your-writes middleware added")
+
     # 6. Advanced Security Middleware (attack detection + security headers)
     app.add_middleware(
         SecurityMiddleware,
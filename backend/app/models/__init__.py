@@ -4,6 +4,7 @@
 """
 
 from app.models.achievement import Achievement
+from app.models.archive import chat_messages_archive, messages_archive, notifications_archive
 from app.models.base import BaseModel, TimestampMixin
 from app.models.calendar import CalendarEvent, CalendarProvider, CalendarSync
 from app.models.chat_room import ChatMessage, ChatRoom
@@ -52,4 +53,7 @@ __all__ = [
     "Subscription",
     "SubscriptionStatus",
     "SubscriptionTier",
+    "messages_archive",
+    "chat_messages_archive",
+    "notifications_archive",
 ]
@@ -0,0 +1,28 @@
+"""
+Архивные таблицы
+Холодное хранилище сообщений, сообщений чатов и уведомлений старше горизонта
+хранения (см. app/utils/retention.py). Колонки повторяют исходные таблицы;
+внешних ключей нет, чтобы архив не мешал удалению пользователей и комнат
+"""
+
+from sqlalchemy import Column, Index, Table
+
+from app.database import Base
+from app.models.chat_room import ChatMessage
+from app.models.message import Message
+from app.models.notification import Notification
+
+
+def archive_table(source: Table) -> Table:
+    """Таблица {source}_archive с теми же колонками и индексом по created_at"""
+    name = f"{source.name}_archive"
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in source.columns
+    ]
+    return Table(name, Base.metadata, *columns, Index(f"ix_{name}_created_at", "created_at"))
+
+
+messages_archive = archive_table(Message.__table__)
+chat_messages_archive = archive_table(ChatMessage.__table__)
+notifications_archive = archive_table(Notification.__table__)
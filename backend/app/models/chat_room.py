@@ -52,6 +52,7 @@ class ChatMessage(BaseModel):
     """Модель сообщения в чат-комнате"""
 
     __tablename__ = "chat_messages"
+    __table_args__ = ({"sqlite_autoincrement": True},)  # id не переиспользуются после переноса в архив
 
     room_id = Column(Integer, ForeignKey("chat_rooms.id", ondelete="CASCADE"), nullable=False, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -63,8 +64,9 @@ class ChatMessage(BaseModel):
     attachment_url = Column(String(512), nullable=True)
     attachment_type = Column(String(50), nullable=True)  # image, document, video
 
-    # Для тредов
-    parent_message_id = Column(Integer, ForeignKey("chat_messages.id"), nullable=True, index=True)
+    # Для тредов. Без внешнего ключа: в PostgreSQL таблица секционирована (миграция c4e6a8b0d2f1),
+    # а ссылаться на неё можно только по ключу с created_at; существование родителя проверяет API
+    parent_message_id = Column(Integer, nullable=True, index=True)
 
     # Timestamp fields
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
@@ -78,7 +80,11 @@ class ChatMessage(BaseModel):
     # Связи
     room = relationship("ChatRoom", back_populates="messages")
     sender = relationship("User", foreign_keys=[sender_id])
-    parent = relationship("ChatMessage", remote_side="ChatMessage.id", backref="replies")
+    parent = relationship(
+        "ChatMessage",
+        primaryjoin="foreign(ChatMessage.parent_message_id) == remote(ChatMessage.id)",
+        backref="replies",
+    )
 
     def __repr__(self):
         return f"<ChatMessage(id={self.id}, room_id={self.room_id}, sender_id={self.sender_id})>"
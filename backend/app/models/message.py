@@ -16,6 +16,7 @@ class Message(BaseModel):
     __tablename__ = "messages"
     __table_args__ = (
         Index("idx_message_conversation", "sender_id", "recipient_id", "created_at"),
+        {"sqlite_autoincrement": True},  # id не переиспользуются после переноса в архив
     )
 
     sender_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
@@ -53,6 +53,7 @@ class Notification(BaseModel, TimestampMixin):
     __tablename__ = "notifications"
     __table_args__ = (
         Index("idx_notification_user_unread", "user_id", "is_read", "created_at"),
+        {"sqlite_autoincrement": True},  # id не переиспользуются после переноса в архив
     )
 
     # Получатель
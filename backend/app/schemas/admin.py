@@ -22,10 +22,13 @@ class AdminUserResponse(BaseModel):
 
 class AdminUserListResponse(BaseModel):
     items: list[AdminUserResponse]
-    total: int
+    total: int | None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
+    has_more: bool = False
+    total_exact: bool = True
 
 
 class UpdateUserRoleRequest(BaseModel):
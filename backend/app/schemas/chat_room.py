@@ -100,6 +100,7 @@ class ChatMessageListResponse(BaseModel):
 
     messages: list[ChatMessageResponse]
     has_more: bool = False
+    next_cursor: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -28,24 +28,45 @@ class PaginationParams(BaseModel):
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
-    """Универсальный ответ с пагинацией"""
+    """
+    Универсальный ответ с пагинацией
 
-    total: int
+    total и total_pages - None, если запрошено include_total=false;
+    total_exact=False - total является оценкой.
+    """
+
+    total: int | None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
     data: list[T]
+    next_cursor: str | None = None
+    has_more: bool = False
+    total_exact: bool = True
 
     @classmethod
-    def create(cls, items: list[T], total: int, page: int, page_size: int) -> "PaginatedResponse[T]":
-        """Создание ответа с пагинацией"""
-        total_pages = (total + page_size - 1) // page_size
+    def create(
+        cls,
+        items: list[T],
+        total: int | None,
+        page: int,
+        page_size: int,
+        next_cursor: str | None = None,
+        has_more: bool | None = None,
+        total_exact: bool = True,
+    ) -> "PaginatedResponse[T]":
+        """Создание ответа с пагинацией; has_more по умолчанию вычисляется из total"""
+        if has_more is None:
+            has_more = total is not None and page * page_size < total
         return cls(
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages,
+            total_pages=None if total is None else (total + page_size - 1) // page_size,
             data=items,
+            next_cursor=next_cursor,
+            has_more=has_more,
+            total_exact=total_exact,
         )
 
 
@@ -209,15 +209,14 @@ async def invalidate_course_cache(db: Session, course_id: int):
     import asyncio
     import logging
 
-    from app.utils.cache import invalidate_cache
+    from app.utils.cache import invalidate_tags
 
     logger = logging.getLogger(__name__)
 
-    async def _safe(key: str):
+    async def _safe(*tags: str):
         try:
-            await invalidate_cache(key)
+            await invalidate_tags(*tags)
         except Exception:
-            logger.exception("Failed to invalidate cache: %s", key)
+            logger.exception("Failed to invalidate cache tags: %s", tags)
 
-    asyncio.create_task(_safe(f"course_detail:{course_id}"))
-    asyncio.create_task(_safe("courses_list:*"))
+    asyncio.create_task(_safe(f"course:{course_id}", "courses_list"))
@@ -116,33 +116,29 @@ def cleanup_expired_tokens():
     Периодическая очистка истекших токенов
     Выполняется каждый день в 3:00
 
-    Tokens are now stored in Redis via cache_service with TTL,
+    Tokens are now stored in Redis via the cache manager with TTL,
     so Redis handles expiry automatically. This task scans for
     any stale keys that may have survived a Redis restart without
     persistence.
     """
-    from app.services.cache import cache_service
+    import redis
 
     try:
         cleaned = 0
-        if cache_service.redis_client:
+        try:
+            # Celery worker синхронный - используем отдельный sync-клиент
+            client = redis.from_url(settings.REDIS_URL, decode_responses=True)
             try:
                 # Scan for verification and reset token keys
                 for pattern in ["verification:*", "reset:*"]:
-                    cursor = 0
-                    while True:
-                        cursor, keys = cache_service.redis_client.scan(
-                            cursor=cursor, match=pattern, count=100
-                        )
-                        for key in keys:
-                            ttl = cache_service.redis_client.ttl(key)
-                            if ttl == -1:  # Key exists but no TTL
-                                cache_service.redis_client.delete(key)
-                                cleaned += 1
-                        if cursor == 0:
-                            break
-            except Exception as e:
-                logger.debug(f"Redis token cleanup scan failed: {e}")
+                    for key in client.scan_iter(match=pattern, count=100):
+                        if client.ttl(key) == -1:  # Key exists but no TTL
+                            client.delete(key)
+                            cleaned += 1
+            finally:
+                client.close()
+        except Exception as e:
+            logger.debug(f"Redis token cleanup scan failed: {e}")
 
         logger.info(f"✅ Token cleanup completed, cleaned {cleaned} stale keys")
         return {"stale_keys_cleaned": cleaned}
@@ -151,6 +147,46 @@ def cleanup_expired_tokens():
         raise
 
 
+@celery_app.task(name="warm_cache")
+def warm_cache():
+    """
+    Периодический прогрев горячих ключей кеша
+    Выполняется каждые CACHE_WARMUP_INTERVAL секунд
+    """
+    import asyncio
+
+    from app.utils.cache_warmup import rewarm_shared_cache
+
+    if not settings.CACHE_WARMUP_ENABLED:
+        return {"skipped": True}
+
+    try:
+        return asyncio.run(rewarm_shared_cache())
+    except Exception as e:
+        logger.error(f"❌ Error warming cache: {e}")
+        raise
+
+
+@celery_app.task(name="archive_old_rows")
+def archive_old_rows():
+    """
+    Перенос старых сообщений, сообщений чатов и уведомлений в архивные таблицы
+    Выполняется каждый день; горизонты - MESSAGES_RETENTION_DAYS и NOTIFICATIONS_RETENTION_DAYS
+    """
+    from app.utils.retention import run_retention
+
+    db = SessionLocal()
+    try:
+        report = run_retention(db)
+        logger.info(f"✅ Retention completed: {report}")
+        return report
+    except Exception as e:
+        logger.error(f"❌ Error archiving old rows: {e}")
+        raise
+    finally:
+        db.close()
+
+
 @celery_app.task(name="generate_daily_stats")
 def generate_daily_stats():
     """
@@ -407,6 +443,10 @@ celery_app.conf.beat_schedule = {
         "task": "cleanup_expired_tokens",
         "schedule": timedelta(days=1),  # Каждый день
     },
+    "archive-old-rows-daily": {
+        "task": "archive_old_rows",
+        "schedule": timedelta(days=1),  # Каждый день
+    },
     "generate-daily-stats": {
         "task": "generate_daily_stats",
         "schedule": timedelta(days=1),  # Каждый день
@@ -415,4 +455,8 @@ celery_app.conf.beat_schedule = {
         "task": "send_session_reminders",
         "schedule": timedelta(hours=1),  # Каждый час
     },
+    "warm-cache": {
+        "task": "warm_cache",
+        "schedule": timedelta(seconds=settings.CACHE_WARMUP_INTERVAL),
+    },
 }
@@ -7,13 +7,21 @@ Type hints added for better IDE support and type checking.
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import inspect
 import json
 import logging
-from collections.abc import Callable
+import secrets
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
 from functools import wraps
 from typing import Any
 
+from fastapi import Request
+from pydantic import TypeAdapter
+
 try:
     from redis.asyncio import Redis
     REDIS_AVAILABLE = True
@@ -21,6 +29,14 @@ except ImportError:
     REDIS_AVAILABLE = False
 
 from app.constants import (
+    CACHE_INVALIDATION_CHANNEL,
+    CACHE_INVALIDATION_RETRY_DELAY,
+    CACHE_L1_TTL,
+    CACHE_LOCK_POLL_INTERVAL,
+    CACHE_LOCK_PREFIX,
+    CACHE_LOCK_TIMEOUT,
+    CACHE_SCAN_BATCH_SIZE,
+    CACHE_TAG_PREFIX,
     CACHE_TTL_ANALYTICS,
     CACHE_TTL_COURSE,
     CACHE_TTL_DEFAULT,
@@ -30,69 +46,179 @@ from app.constants import (
     CACHE_TTL_SUBSCRIPTION,
     CACHE_TTL_USER,
     MAX_CACHE_TTL,
-    MAX_MEMORY_CACHE_ITEMS,
+    MEMORY_CACHE_MAX_BYTES,
+    MEMORY_CACHE_SWEEP_INTERVAL,
 )
+from app.utils.cache_keys import CacheKeyBuilder
+from app.utils.cache_serializer import CacheSerializer
+from app.utils.http_cache import conditional_response, make_etag
+from app.utils.memory_cache import MISSING, MemoryCache
+from app.utils.pagination import CursorPage
+from app.utils.stampede import SingleFlight, is_envelope, is_stale, make_envelope, should_refresh_early
 
 logger = logging.getLogger(__name__)
 
+# Имя параметра, через который FastAPI передаёт Request в обёртку @cached(response_model=...)
+CACHED_REQUEST_PARAM = "cached_request"
+
 # Константы для кеширования (экспорт из constants.py)
 DEFAULT_CACHE_TTL = CACHE_TTL_DEFAULT  # 5 минут
 DEFAULT_CACHE_EXPIRATION = CACHE_TTL_SUBSCRIPTION  # 1 час
-MEMORY_CACHE_CLEANUP_COUNT = 500
+
+# Снятие блокировки только владельцем (сравнение токена и удаление атомарно)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Запись значения и регистрация ключа в множествах тегов за один round trip.
+# TTL множества тега только продлевается, чтобы не потерять долгоживущие ключи.
+SET_WITH_TAGS_SCRIPT = """
+redis.call("set", KEYS[1], ARGV[2], "EX", ARGV[1])
+local ttl = tonumber(ARGV[1])
+for i = 2, #KEYS do
+    redis.call("sadd", KEYS[i], KEYS[1])
+    if redis.call("ttl", KEYS[i]) < ttl then
+        redis.call("expire", KEYS[i], ttl)
+    end
+end
+return 1
+"""
+
+# Удаление всех ключей тегов вместе с множествами; возвращает удалённые ключи
+INVALIDATE_TAGS_SCRIPT = """
+local removed = {}
+for i = 1, #KEYS do
+    local members = redis.call("smembers", KEYS[i])
+    for _, key in ipairs(members) do
+        redis.call("del", key)
+        removed[#removed + 1] = key
+    end
+    redis.call("del", KEYS[i])
+end
+return removed
+"""
 
 
 class CacheManager:
-    """Менеджер кеширования с поддержкой Redis и памяти"""
+    """
+    Менеджер кеширования с поддержкой Redis и памяти
+
+    Без Redis значения хранятся в in-process LRU (memory_cache). С Redis
+    memory_cache может работать как near-cache (L1) каждого воркера перед
+    Redis (L2): чтение сначала идёт в L1, а изменения рассылаются другим
+    воркерам через Redis pub/sub, чтобы они сбросили свои копии. Значения
+    из L1 возвращаются без копирования и не должны изменяться вызывающим кодом.
+    Значения в Redis сериализуются CacheSerializer (по умолчанию orjson,
+    большие значения сжимаются).
+    """
 
-    def __init__(self, redis_client: Redis | None = None) -> None:
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        max_memory_bytes: int = MEMORY_CACHE_MAX_BYTES,
+        near_cache: bool = False,
+        near_cache_ttl: int = CACHE_L1_TTL,
+        serializer: CacheSerializer | None = None,
+    ) -> None:
         self.redis = redis_client
-        self.memory_cache: dict[str, Any] = {}
+        self.serializer = serializer or CacheSerializer()
+        self.memory_cache = MemoryCache(max_bytes=max_memory_bytes)
         self.use_redis = redis_client is not None
-        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "errors": 0}
-        self.cache_sizes: dict[str, int] = {"memory": 0, "redis": 0}
+        self.near_cache = near_cache and self.use_redis
+        self.near_cache_ttl = near_cache_ttl
+        self.instance_id = uuid.uuid4().hex
+        self.stats: dict[str, int] = self._empty_stats()
+        self.redis_size = 0
+        self.single_flight = SingleFlight()
+        self._listener_task: asyncio.Task | None = None
+        # Обработчики сообщений других видов на том же канале (например, кеш принципала)
+        self._invalidation_handlers: dict[str, Callable[[Any], None]] = {}
+        self._invalidation_resets: list[Callable[[], None]] = []
 
         if self.use_redis:
-            logger.info("✅ Cache: используется Redis")
+            logger.info("✅ Cache: используется Redis" + (" + near-cache (L1)" if self.near_cache else ""))
         else:
             logger.warning("⚠️ Cache: используется память (ограниченная)")
 
+    @staticmethod
+    def _empty_stats() -> dict[str, int]:
+        return {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "deletes": 0,
+            "errors": 0,
+            "l1_hits": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0,
+            "early_refreshes": 0,
+            "lock_waits": 0,
+            "stale_served": 0,
+            "background_refreshes": 0,
+        }
+
     async def get(self, key: str) -> Any | None:
         """Получение значения из кеша"""
         try:
             if self.use_redis and self.redis is not None:
+                if self.near_cache:
+                    local_value = self.memory_cache.get(key)
+                    if local_value is not MISSING:
+                        self.stats["hits"] += 1
+                        self.stats["l1_hits"] += 1
+                        return local_value
                 value = await self.redis.get(key)
                 if value:
                     self.stats["hits"] += 1
-                    return json.loads(value)
+                    result = self.serializer.loads(value)
+                    if self.near_cache:
+                        self.memory_cache.set(key, result, self.near_cache_ttl, len(value))
+                    return result
                 self.stats["misses"] += 1
             else:
-                if key in self.memory_cache:
+                value = self.memory_cache.get(key)
+                if value is not MISSING:
                     self.stats["hits"] += 1
-                    return self.memory_cache.get(key)
+                    return value
                 self.stats["misses"] += 1
         except Exception as e:
             logger.error(f"Cache get error: {e}")
             self.stats["errors"] += 1
         return None
 
-    async def set(self, key: str, value: Any, ttl: int | None = DEFAULT_CACHE_TTL) -> None:
-        """Сохранение значения в кеш"""
+    async def set(self, key: str, value: Any, ttl: int | None = DEFAULT_CACHE_TTL, tags: Iterable[str] = ()) -> None:
+        """Сохранение значения в кеш (с необязательными тегами для групповой инвалидации)"""
         try:
-            serialized_value = json.dumps(value)
+            serialized_value = self.serializer.dumps(value)
             value_size = len(serialized_value)
+            tags = tuple(tags)
 
             if self.use_redis and self.redis is not None:
-                await self.redis.setex(key, ttl or DEFAULT_CACHE_EXPIRATION, serialized_value)
-                self.cache_sizes["redis"] += value_size
+                if tags:
+                    tag_keys = [f"{CACHE_TAG_PREFIX}{tag}" for tag in tags]
+                    await self.redis.eval(
+                        SET_WITH_TAGS_SCRIPT,
+                        1 + len(tag_keys),
+                        key,
+                        *tag_keys,
+                        ttl or DEFAULT_CACHE_EXPIRATION,
+                        serialized_value,
+                    )
+                else:
+                    await self.redis.setex(key, ttl or DEFAULT_CACHE_EXPIRATION, serialized_value)
+                self.redis_size += value_size
+                if self.near_cache:
+                    local_ttl = min(ttl or DEFAULT_CACHE_EXPIRATION, self.near_cache_ttl)
+                    # В L1 - копия, прочитанная из тех же байт, что и в Redis: L1-хит
+                    # возвращает то же, что и чтение из Redis, а не изменяемый объект вызывающего
+                    local_value = self.serializer.loads(serialized_value)
+                    self.memory_cache.set(key, local_value, local_ttl, value_size, tags)
+                    await self.publish_invalidation("key", key)
             else:
-                if len(self.memory_cache) > MAX_MEMORY_CACHE_ITEMS:
-                    keys_to_delete: list[str] = list(self.memory_cache.keys())[:MEMORY_CACHE_CLEANUP_COUNT]
-                    for k in keys_to_delete:
-                        if k in self.memory_cache:
-                            self.cache_sizes["memory"] -= len(json.dumps(self.memory_cache[k]))
-                        del self.memory_cache[k]
-                self.memory_cache[key] = value
-                self.cache_sizes["memory"] += value_size
+                self.memory_cache.set(key, value, ttl or DEFAULT_CACHE_EXPIRATION, value_size, tags)
             self.stats["sets"] += 1
         except Exception as e:
             logger.error(f"Cache set error: {e}")
@@ -104,45 +230,334 @@ class CacheManager:
             if self.use_redis and self.redis is not None:
                 value = await self.redis.get(key)
                 if value:
-                    self.cache_sizes["redis"] -= len(value)
+                    self.redis_size -= len(value)
                 await self.redis.delete(key)
+                if self.near_cache:
+                    self.memory_cache.delete(key)
+                    await self.publish_invalidation("key", key)
             else:
-                if key in self.memory_cache:
-                    self.cache_sizes["memory"] -= len(json.dumps(self.memory_cache[key]))
-                self.memory_cache.pop(key, None)
+                self.memory_cache.delete(key)
             self.stats["deletes"] += 1
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
             self.stats["errors"] += 1
 
-    async def clear(self, pattern: str = "*") -> None:
-        """Очистка кеша по паттерну"""
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Инвалидация всех записей с указанными тегами
+
+        Стоимость пропорциональна числу записей в тегах, а не размеру keyspace.
+        Возвращает число удалённых ключей.
+        """
+        if not tags:
+            return 0
         try:
             if self.use_redis and self.redis is not None:
-                keys = await self.redis.keys(pattern)
-                if keys:
-                    self.cache_sizes["redis"] = 0
-                    await self.redis.delete(*keys)
+                tag_keys = [f"{CACHE_TAG_PREFIX}{tag}" for tag in tags]
+                removed = await self.redis.eval(INVALIDATE_TAGS_SCRIPT, len(tag_keys), *tag_keys)
+                removed_keys = [k.decode() if isinstance(k, bytes) else k for k in removed or []]
+                if self.near_cache:
+                    # Записи L1, заполненные при чтении из Redis, хранятся без тегов
+                    for key in removed_keys:
+                        self.memory_cache.delete(key)
+                    for tag in tags:
+                        self.memory_cache.invalidate_tag(tag)
+                    if removed_keys:
+                        await self.publish_invalidation("keys", removed_keys)
+                count = len(removed_keys)
             else:
+                count = sum(self.memory_cache.invalidate_tag(tag) for tag in tags)
+            self.stats["deletes"] += count
+            return count
+        except Exception as e:
+            logger.error(f"Cache tag invalidation error: {e}")
+            self.stats["errors"] += 1
+            return 0
+
+    async def clear(self, pattern: str = "*") -> None:
+        """
+        Очистка кеша по паттерну
+
+        Ключи в Redis перебираются через SCAN пачками, не блокируя Redis.
+        Для регулярной инвалидации используйте теги (invalidate_tags).
+        """
+        try:
+            if self.use_redis and self.redis is not None:
+                batch: list[Any] = []
+                async for found_key in self.redis.scan_iter(match=pattern, count=CACHE_SCAN_BATCH_SIZE):
+                    batch.append(found_key)
+                    if len(batch) >= CACHE_SCAN_BATCH_SIZE:
+                        await self.redis.delete(*batch)
+                        batch = []
+                if batch:
+                    await self.redis.delete(*batch)
                 if pattern == "*":
-                    self.cache_sizes["memory"] = 0
-                    self.memory_cache.clear()
-                else:
-                    prefix = pattern.replace("*", "")
-                    keys_to_delete: list[str] = [k for k in self.memory_cache if k.startswith(prefix)]
-                    for k in keys_to_delete:
-                        if k in self.memory_cache:
-                            self.cache_sizes["memory"] -= len(json.dumps(self.memory_cache[k]))
-                        del self.memory_cache[k]
+                    self.redis_size = 0
+                if self.near_cache:
+                    self.memory_cache.clear(pattern.replace("*", ""))
+                    await self.publish_invalidation("pattern", pattern)
+            else:
+                self.memory_cache.clear(pattern.replace("*", ""))
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
             self.stats["errors"] += 1
 
+    # ==================== STAMPEDE PROTECTION ====================
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = DEFAULT_CACHE_TTL,
+        cache_none: bool = False,
+        early_refresh: float = 0.0,
+        stale_ttl: int = 0,
+        refresh: Callable[[], Awaitable[Any]] | None = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Получение значения из кеша или его вычисление с защитой от stampede
+
+        Одновременные промахи одного ключа в воркере объединяются (single-flight),
+        между воркерами пересчёт сериализуется короткой блокировкой в Redis.
+
+        Args:
+            key: Ключ кеша
+            compute: Корутина-фабрика, вычисляющая значение
+            ttl: Время жизни (мягкое истечение) в секундах
+            cache_none: Кешировать None
+            early_refresh: Коэффициент beta для досрочного обновления (0 - выключено)
+            stale_ttl: Сколько секунд после ttl отдавать устаревшее значение,
+                обновляя его в фоне (stale-while-revalidate, 0 - выключено)
+            refresh: Фабрика для фонового обновления (по умолчанию compute)
+            tags: Теги записи для групповой инвалидации
+        """
+        tags = tuple(tags)
+        cached_data = await self.get(key)
+        stale = None
+        if is_envelope(cached_data):
+            if stale_ttl and is_stale(cached_data):
+                self.stats["stale_served"] += 1
+                revalidate = refresh or compute
+                if self.single_flight.spawn(
+                    key,
+                    lambda: self._compute_with_lock(key, revalidate, ttl, cache_none, cached_data, stale_ttl, tags),
+                ):
+                    self.stats["background_refreshes"] += 1
+                return cached_data["value"]
+            if not should_refresh_early(cached_data["delta"], cached_data["expires_at"], early_refresh):
+                return cached_data["value"]
+            self.stats["early_refreshes"] += 1
+            stale = cached_data
+
+        return await self.single_flight.do(
+            key, lambda: self._compute_with_lock(key, compute, ttl, cache_none, stale, stale_ttl, tags)
+        )
+
+    async def refresh(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = DEFAULT_CACHE_TTL,
+        cache_none: bool = False,
+        stale_ttl: int = 0,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Принудительный пересчёт значения и запись в кеш (прогрев)
+
+        Текущее значение не читается; пересчёт защищён так же, как в get_or_compute.
+        """
+        tags = tuple(tags)
+        return await self.single_flight.do(
+            key, lambda: self._compute_with_lock(key, compute, ttl, cache_none, None, stale_ttl, tags)
+        )
+
+    async def _compute_with_lock(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        cache_none: bool,
+        stale: dict[str, Any] | None,
+        stale_ttl: int = 0,
+        tags: tuple[str, ...] = (),
+    ) -> Any:
+        token = await self._acquire_lock(key)
+        if token is None:
+            # Ключ уже пересчитывает другой воркер
+            if stale is not None:
+                return stale["value"]
+            self.stats["lock_waits"] += 1
+            fresh = await self._wait_for_value(key)
+            if fresh is not None:
+                return fresh["value"]
+            logger.debug(f"Cache lock wait timed out for {key}, computing locally")
+
+        try:
+            started = time.perf_counter()
+            result = await compute()
+            if result is not None or cache_none:
+                envelope = make_envelope(result, time.perf_counter() - started, ttl)
+                await self.set(key, envelope, ttl + stale_ttl, tags)
+            return result
+        finally:
+            if token:
+                await self._release_lock(key, token)
+
+    async def _acquire_lock(self, key: str) -> str | None:
+        """Захват блокировки пересчёта ключа; None, если её держит другой воркер"""
+        token = secrets.token_hex(8)
+        if not self.use_redis or self.redis is None:
+            return token
+        try:
+            acquired = await self.redis.set(f"{CACHE_LOCK_PREFIX}{key}", token, nx=True, ex=CACHE_LOCK_TIMEOUT)
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Cache lock error: {e}")
+            self.stats["errors"] += 1
+            return token
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        if not self.use_redis or self.redis is None:
+            return
+        try:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, f"{CACHE_LOCK_PREFIX}{key}", token)
+        except Exception as e:
+            logger.error(f"Cache unlock error: {e}")
+            self.stats["errors"] += 1
+
+    async def _wait_for_value(self, key: str) -> dict[str, Any] | None:
+        """Ожидание значения, которое вычисляет владелец блокировки"""
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            try:
+                raw = await self.redis.get(key)  # type: ignore[union-attr]
+            except Exception as e:
+                logger.error(f"Cache get error: {e}")
+                return None
+            if raw:
+                data = self.serializer.loads(raw)
+                if is_envelope(data):
+                    return data
+        return None
+
+    # ==================== NEAR-CACHE INVALIDATION ====================
+
+    def add_invalidation_handler(
+        self, kind: str, handler: Callable[[Any], None], reset: Callable[[], None] | None = None
+    ) -> None:
+        """
+        Обработчик сообщений вида kind от других воркеров
+
+        Args:
+            kind: Вид сообщения (кроме key, keys и pattern)
+            handler: Вызывается с target сообщения
+            reset: Вызывается, когда подписка прервалась и сообщения могли потеряться
+        """
+        self._invalidation_handlers[kind] = handler
+        if reset is not None:
+            self._invalidation_resets.append(reset)
+
+    async def publish_invalidation(self, kind: str, target: Any) -> None:
+        """Рассылка сообщения об инвалидации другим воркерам"""
+        if self.redis is None:
+            return
+        message = json.dumps({"origin": self.instance_id, "kind": kind, "target": target})
+        try:
+            await self.redis.publish(CACHE_INVALIDATION_CHANNEL, message)
+            self.stats["invalidations_sent"] += 1
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error: {e}")
+            self.stats["errors"] += 1
+
+    def apply_invalidation(self, raw_message: str | bytes) -> None:
+        """Применение сообщения об инвалидации, полученного от другого воркера"""
+        try:
+            message = json.loads(raw_message)
+        except (TypeError, ValueError):
+            logger.warning(f"Malformed cache invalidation message: {raw_message!r}")
+            return
+
+        if message.get("origin") == self.instance_id:
+            return
+
+        target = message.get("target", "")
+        kind = message.get("kind")
+        handler = self._invalidation_handlers.get(kind)
+        if handler is not None:
+            handler(target)
+        elif kind == "key":
+            self.memory_cache.delete(target)
+        elif kind == "keys":
+            for key in target:
+                self.memory_cache.delete(key)
+        else:
+            self.memory_cache.clear(target.replace("*", ""))
+        self.stats["invalidations_received"] += 1
+
+    def start_invalidation_listener(self) -> None:
+        """Подписка на канал инвалидации (при включённом near-cache или зарегистрированных обработчиках)"""
+        if self.redis is None or not (self.near_cache or self._invalidation_handlers):
+            return
+        if self._listener_task is not None and not self._listener_task.done():
+            return
+        self._listener_task = asyncio.create_task(self._listen_invalidations())
+
+    async def stop_invalidation_listener(self) -> None:
+        """Остановка подписки на канал инвалидации"""
+        task, self._listener_task = self._listener_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _listen_invalidations(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()  # type: ignore[union-attr]
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                logger.info(f"✅ Cache: подписка на {CACHE_INVALIDATION_CHANNEL}")
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Пока подписка не работает, сообщения теряются - L1 и кеши обработчиков больше не достоверны
+                logger.warning(f"Cache invalidation listener error: {e}, reconnecting...")
+                self.memory_cache.clear()
+                for reset in self._invalidation_resets:
+                    reset()
+                await asyncio.sleep(CACHE_INVALIDATION_RETRY_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()  # type: ignore[union-attr]
+                except Exception:
+                    pass
+
     def generate_key(self, *args: Any, **kwargs: Any) -> str:
         """Генерация ключа кеша из параметров"""
         key_data = f"{args}:{sorted(kwargs.items())}"
         return hashlib.sha256(key_data.encode()).hexdigest()
 
+    @property
+    def cache_sizes(self) -> dict[str, int]:
+        """Размер закешированных данных в байтах по бэкендам"""
+        return {"memory": self.memory_cache.total_bytes, "redis": self.redis_size}
+
+    def start_sweeper(self, interval: float = MEMORY_CACHE_SWEEP_INTERVAL) -> None:
+        """Запуск фоновой очистки протухших записей in-process кеша"""
+        self.memory_cache.start_sweeper(interval)
+
+    async def stop_sweeper(self) -> None:
+        """Остановка фоновой очистки"""
+        await self.memory_cache.stop_sweeper()
+
     def get_stats(self) -> dict[str, Any]:
         """Получение статистики кеша"""
         total_requests = self.stats["hits"] + self.stats["misses"]
@@ -150,89 +565,257 @@ class CacheManager:
         return {
             "stats": self.stats.copy(),
             "hit_rate": round(hit_rate, 2),
-            "cache_sizes": self.cache_sizes.copy(),
+            "cache_sizes": self.cache_sizes,
+            "memory": self.memory_cache.get_stats(),
+            "near_cache": self.near_cache,
+            "coalesced": self.single_flight.coalesced,
             "total_requests": total_requests
         }
 
     def reset_stats(self) -> None:
         """Сброс статистики кеша"""
-        self.stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "errors": 0}
+        self.stats = self._empty_stats()
+        self.memory_cache.reset_stats()
+        self.single_flight.coalesced = 0
 
 
 # Глобальный экземпляр
 cache_manager: CacheManager | None = None
 
 
-def init_cache(redis_client: Redis | None = None) -> CacheManager:
+def init_cache(
+    redis_client: Redis | None = None,
+    max_memory_bytes: int = MEMORY_CACHE_MAX_BYTES,
+    near_cache: bool = False,
+    near_cache_ttl: int = CACHE_L1_TTL,
+    serializer: CacheSerializer | None = None,
+) -> CacheManager:
     """Инициализация кеш-менеджера"""
     global cache_manager
-    cache_manager = CacheManager(redis_client)
+    cache_manager = CacheManager(
+        redis_client,
+        max_memory_bytes=max_memory_bytes,
+        near_cache=near_cache,
+        near_cache_ttl=near_cache_ttl,
+        serializer=serializer,
+    )
+    return cache_manager
+
+
+def get_cache() -> CacheManager:
+    """
+    Общий кеш-менеджер воркера для прямых вызовов (get/set/delete)
+
+    До init_cache (например, вне lifespan) создаётся менеджер только с памятью.
+    """
+    global cache_manager
+    if cache_manager is None:
+        cache_manager = CacheManager()
     return cache_manager
 
 
+async def shutdown_cache() -> None:
+    """Остановка фоновых задач кеш-менеджера"""
+    if cache_manager:
+        await cache_manager.stop_invalidation_listener()
+        await cache_manager.stop_sweeper()
+
+
 def cached(
     ttl: int = 300,
     key_prefix: str = "",
     skip_auth: bool = False,
     cache_none: bool = False,
-    invalidate_on_error: bool = False
+    invalidate_on_error: bool = False,
+    early_refresh: float = 0.0,
+    stale_ttl: int = 0,
+    tags: Iterable[str] = (),
+    response_model: Any = None,
+    http_max_age: int | None = None,
 ) -> Callable:
     """
     Декоратор для кеширования результатов функций
 
+    Одновременные промахи одного ключа вычисляются один раз (single-flight
+    в воркере и блокировка в Redis между воркерами).
+
+    Ключ строится CacheKeyBuilder: в него входят path/query параметры и
+    обычные аргументы, но не зависимости FastAPI (сессия БД, rate limit).
+
     Args:
         ttl: Время жизни кеша в секундах
         key_prefix: Префикс для ключа кеша
-        skip_auth: Не учитывать user_id в ключе
+        skip_auth: Не учитывать текущего пользователя в ключе (общий кеш для всех пользователей)
         cache_none: Кешировать None значения
         invalidate_on_error: Инвалидировать кеш при ошибках
+        early_refresh: Коэффициент вероятностного досрочного обновления (0 - выключено, обычно 1.0)
+        stale_ttl: Окно stale-while-revalidate после ttl в секундах (0 - выключено)
+        tags: Шаблоны тегов для инвалидации, подставляются аргументы функции,
+            например ("courses_list", "course:{course_id}")
+        response_model: Схема ответа эндпоинта. Результат (в том числе ORM-объекты
+            или CursorPage - список с курсором в заголовке X-Next-Cursor)
+            валидируется ею один раз и кешируется готовым JSON; эндпоинт возвращает
+            Response с этим JSON, и FastAPI не валидирует и не сериализует ответ повторно.
+            Вместе с JSON кешируется его ETag: на If-None-Match с тем же ETag
+            эндпоинт отвечает 304 без тела
+        http_max_age: max-age в Cache-Control ответа (только с response_model);
+            без него ответ помечается no-cache и перепроверяется по ETag
     """
 
+    tag_templates = tuple(tags)
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    async def render(result: Awaitable[Any]) -> Any:
+        value = await result
+        headers = None
+        if isinstance(value, CursorPage):
+            # Список с курсором следующей страницы: курсор кешируется вместе с телом и отдаётся заголовком
+            headers, value = value.headers, value.items
+        if adapter is None:
+            return value
+        body = adapter.dump_json(adapter.validate_python(value, from_attributes=True), by_alias=True).decode()
+        rendered = {"etag": make_etag(body), "body": body}
+        if headers:
+            rendered["headers"] = headers
+        return rendered
+
     def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        key_builder = CacheKeyBuilder(func, key_prefix=key_prefix, skip_auth=skip_auth)
+        private = key_builder.user_param is not None and not skip_auth
+        request_param = _find_request_param(key_builder.signature)
+        inject_request = adapter is not None and request_param is None
+
+        def to_response(value: Any, request: Request | None) -> Any:
+            if adapter is None:
+                return value
+            if isinstance(value, str):
+                # JSON, закешированный до появления ETag
+                value = {"etag": make_etag(value), "body": value}
+            response = conditional_response(
+                request, value["body"], etag=value["etag"], max_age=http_max_age, private=private
+            )
+            response.headers.update(value.get("headers") or {})
+            return response
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request = kwargs.pop(CACHED_REQUEST_PARAM, None) if inject_request else kwargs.get(request_param or "")
             if not cache_manager:
-                return await func(*args, **kwargs)
+                return to_response(await render(func(*args, **kwargs)), request)
 
-            cache_key = f"{key_prefix}:{func.__name__}:"
-            key_parts: list[str] = []
-
-            for arg in args:
-                if hasattr(arg, "id"):
-                    key_parts.append(f"{arg.__class__.__name__}_{arg.id}")
-                elif not isinstance(arg, (dict, list)):
-                    key_parts.append(str(arg))
-
-            for k, v in sorted(kwargs.items()):
-                if k == "current_user" and skip_auth:
-                    continue
-                if hasattr(v, "id"):
-                    key_parts.append(f"{k}_{v.id}")
-                elif not isinstance(v, (dict, list)):
-                    key_parts.append(f"{k}_{v}")
-
-            cache_key += "_".join(key_parts)
-
-            cached_result = await cache_manager.get(cache_key)
-            if cached_result is not None:
-                return cached_result
+            cache_key = key_builder.build(args, kwargs)
 
             try:
-                result = await func(*args, **kwargs)
-                if result is not None or cache_none:
-                    await cache_manager.set(cache_key, result, ttl)
-                return result
+                value = await cache_manager.get_or_compute(
+                    cache_key,
+                    lambda: render(func(*args, **kwargs)),
+                    ttl=ttl,
+                    cache_none=cache_none,
+                    early_refresh=early_refresh,
+                    stale_ttl=stale_ttl,
+                    refresh=lambda: render(call_with_fresh_sessions(func, args, kwargs)),
+                    tags=resolve_tags(signature, tag_templates, args, kwargs),
+                )
             except Exception:
                 if invalidate_on_error:
                     await cache_manager.delete(cache_key)
                 raise
 
+            return to_response(value, request)
+
+        async def warm(*args: Any, **kwargs: Any) -> None:
+            """Пересчёт и запись значения для аргументов вызова, даже если оно уже в кеше"""
+            if not cache_manager:
+                return
+            await cache_manager.refresh(
+                key_builder.build(args, kwargs),
+                lambda: render(func(*args, **kwargs)),
+                ttl=ttl,
+                cache_none=cache_none,
+                stale_ttl=stale_ttl,
+                tags=resolve_tags(signature, tag_templates, args, kwargs),
+            )
+
+        if inject_request:
+            # FastAPI передаёт текущий запрос для проверки If-None-Match; в func он не попадает
+            wrapper.__signature__ = _signature_with_request(key_builder.signature)  # type: ignore[attr-defined]
+        wrapper.cache_key_builder = key_builder  # type: ignore[attr-defined]
+        wrapper.warm = warm  # type: ignore[attr-defined]
         return wrapper
     return decorator
 
 
+def _find_request_param(signature: inspect.Signature) -> str | None:
+    for name, param in signature.parameters.items():
+        if isinstance(param.annotation, type) and issubclass(param.annotation, Request):
+            return name
+    return None
+
+
+def _signature_with_request(signature: inspect.Signature) -> inspect.Signature:
+    """Сигнатура эндпоинта с дополнительным keyword-only параметром Request"""
+    params = [p for p in signature.parameters.values() if p.kind != inspect.Parameter.VAR_KEYWORD]
+    request = inspect.Parameter(CACHED_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+    var_keyword = [p for p in signature.parameters.values() if p.kind == inspect.Parameter.VAR_KEYWORD]
+    return signature.replace(parameters=[*params, request, *var_keyword])
+
+
+def resolve_tags(
+    signature: inspect.Signature, templates: tuple[str, ...], args: tuple, kwargs: dict[str, Any]
+) -> tuple[str, ...]:
+    """Подстановка аргументов вызова в шаблоны тегов ("course:{course_id}" -> "course:42")"""
+    if not templates:
+        return ()
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple(template.format(**bound.arguments) for template in templates)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        logger.error(f"Cache tags resolution error: {e}")
+        return ()
+
+
+async def call_with_fresh_sessions(func: Callable, args: tuple, kwargs: dict[str, Any]) -> Any:
+    """
+    Вызов func с заменой SQLAlchemy-сессий запроса на собственные
+
+    Нужен для фонового обновления кеша: сессия из get_db закрывается
+    после отправки ответа, поэтому фоновая задача открывает свою.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+    from app.database import AsyncSessionLocal, SessionLocal
+
+    sessions: list[Session | AsyncSession] = []
+
+    def _swap(value: Any) -> Any:
+        if isinstance(value, (Session, AsyncSession)):
+            session = AsyncSessionLocal() if isinstance(value, AsyncSession) else SessionLocal()
+            sessions.append(session)
+            return session
+        return value
+
+    try:
+        return await func(*[_swap(a) for a in args], **{k: _swap(v) for k, v in kwargs.items()})
+    finally:
+        for session in sessions:
+            if isinstance(session, AsyncSession):
+                await session.close()
+            else:
+                session.close()
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Инвалидация кеша по тегам"""
+    if cache_manager:
+        removed = await cache_manager.invalidate_tags(*tags)
+        logger.info(f"🗑️ Cache tags invalidated: {', '.join(tags)} ({removed} keys)")
+
+
 async def invalidate_cache(pattern: str) -> None:
-    """Инвалидация кеша по паттерну"""
+    """Инвалидация кеша по паттерну (SCAN по keyspace - предпочтительнее invalidate_tags)"""
     if cache_manager:
         await cache_manager.clear(pattern)
         logger.info(f"🗑️ Cache invalidated: {pattern}")
@@ -266,8 +849,8 @@ CACHE_TTL = {
 }
 
 CACHE_CONFIG = {
-    "max_memory_items": MAX_MEMORY_CACHE_ITEMS,
-    "cleanup_threshold": MEMORY_CACHE_CLEANUP_COUNT,
+    "max_memory_bytes": MEMORY_CACHE_MAX_BYTES,
+    "sweep_interval": MEMORY_CACHE_SWEEP_INTERVAL,
     "default_ttl": CACHE_TTL_DEFAULT,
     "max_ttl": MAX_CACHE_TTL
 }
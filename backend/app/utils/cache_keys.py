@@ -0,0 +1,209 @@
+"""
+Построение ключей кеша для эндпоинтов
+Детерминированный ключ из параметров запроса без внедрённых зависимостей FastAPI
+"""
+
+from __future__ import annotations
+
+import enum
+import hashlib
+import inspect
+import json
+import logging
+from collections.abc import Callable, Mapping
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Annotated, Any, Union, get_args, get_origin
+from uuid import UUID
+
+from fastapi import BackgroundTasks, Request, Response, WebSocket
+from fastapi.params import Depends
+from pydantic import BaseModel, TypeAdapter
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.constants import CACHE_KEY_DIGEST_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Объекты, которые FastAPI внедряет сам; на результат они не влияют
+INJECTED_TYPES = (Request, Response, BackgroundTasks, WebSocket, Session, AsyncSession)
+
+_REQUIRED: Any = object()
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Приведение значения к JSON-совместимому каноническому виду
+
+    Enum заменяется значением, целые float - int, даты - ISO-строкой,
+    множества сортируются, Pydantic-модели разворачиваются в dict,
+    объекты с id (ORM) - в "Class:id".
+    """
+    if isinstance(value, enum.Enum):
+        return canonicalize(value.value)
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return canonicalize(float(value))
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return canonicalize(value.model_dump(mode="json"))
+    if isinstance(value, Mapping):
+        return {str(k): canonicalize(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted((canonicalize(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if hasattr(value, "id"):
+        return f"{type(value).__name__}:{value.id}"
+    return str(value)
+
+
+def _is_dependency(param: inspect.Parameter) -> bool:
+    if isinstance(param.default, Depends):
+        return True
+    annotation = param.annotation
+    if get_origin(annotation) is Annotated:
+        if any(isinstance(meta, Depends) for meta in annotation.__metadata__):
+            return True
+        annotation = get_args(annotation)[0]
+    return isinstance(annotation, type) and issubclass(annotation, INJECTED_TYPES)
+
+
+def _is_user_annotation(annotation: Any) -> bool:
+    from app.models.user import User
+
+    if get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    if get_origin(annotation) is Union or type(annotation).__name__ == "UnionType":
+        return any(_is_user_annotation(arg) for arg in get_args(annotation))
+    return isinstance(annotation, type) and issubclass(annotation, User)
+
+
+def _plain_default(default: Any) -> Any:
+    """Значение по умолчанию параметра (Query(20) -> 20); _REQUIRED, если его нет"""
+    if default is inspect.Parameter.empty:
+        return _REQUIRED
+    if isinstance(default, FieldInfo):
+        return _REQUIRED if default.default is PydanticUndefined else default.default
+    return default
+
+
+def _is_sequence_annotation(annotation: Any) -> bool:
+    if get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    origin = get_origin(annotation)
+    if origin is Union or type(annotation).__name__ == "UnionType":
+        return any(_is_sequence_annotation(arg) for arg in get_args(annotation))
+    return origin in (list, set, frozenset, tuple)
+
+
+class CacheKeyBuilder:
+    """
+    Ключ кеша для функции (обычно эндпоинта FastAPI)
+
+    В ключ входят только параметры, определяющие результат: path/query
+    параметры и обычные аргументы. Зависимости (Depends: сессия БД, rate
+    limit, сервисы) и служебные объекты (Request, Session) исключаются.
+    Если эндпоинт получает текущего пользователя, ключ по умолчанию
+    зависит от его id (skip_auth=True - общий ключ для всех пользователей).
+
+    Формат ключа: "{key_prefix}:{имя функции}:{blake2b-хеш параметров}",
+    длина не зависит от числа и размера параметров.
+    """
+
+    def __init__(self, func: Callable, key_prefix: str = "", skip_auth: bool = False) -> None:
+        try:
+            self.signature = inspect.signature(func, eval_str=True)
+        except (NameError, TypeError):
+            self.signature = inspect.signature(func)
+        self.prefix = f"{key_prefix}:{func.__name__}"
+        self.skip_auth = skip_auth
+        self.key_params: list[str] = []
+        self.user_param: str | None = None
+
+        for name, param in self.signature.parameters.items():
+            if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+            if not _is_dependency(param):
+                self.key_params.append(name)
+            elif self.user_param is None and _is_user_annotation(param.annotation):
+                self.user_param = name
+
+    def default_params(self) -> dict[str, Any]:
+        """Значения по умолчанию параметров ключа (Query(10) -> 10) для вызова функции напрямую"""
+        defaults: dict[str, Any] = {}
+        for name in self.key_params:
+            value = _plain_default(self.signature.parameters[name].default)
+            if value is not _REQUIRED:
+                defaults[name] = value
+        return defaults
+
+    def key_data(self, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Канонические параметры вызова, входящие в ключ"""
+        bound = self.signature.bind_partial(*args, **kwargs)
+        params: dict[str, Any] = {}
+        for name in self.key_params:
+            if name in bound.arguments:
+                value = bound.arguments[name]
+            else:
+                value = _plain_default(self.signature.parameters[name].default)
+                if value is _REQUIRED:
+                    continue
+            params[name] = canonicalize(value)
+
+        user = bound.arguments.get(self.user_param) if self.user_param else None
+        return self._with_user(params, getattr(user, "id", None))
+
+    def key_data_from_request(
+        self, path_params: Mapping[str, str], query_params: Mapping[str, list[str]], user_id: int | None = None
+    ) -> dict[str, Any]:
+        """
+        Канонические параметры для "сырого" запроса (строки path/query)
+
+        Значения приводятся к аннотациям параметров так же, как это делает
+        FastAPI, поэтому ключ совпадает с ключом настоящего запроса.
+
+        Raises:
+            ValueError: Нет обязательного параметра или значение не проходит валидацию
+        """
+        params: dict[str, Any] = {}
+        for name in self.key_params:
+            param = self.signature.parameters[name]
+            annotation = str if param.annotation is inspect.Parameter.empty else param.annotation
+            if name in path_params:
+                raw: Any = path_params[name]
+            elif name in query_params:
+                values = query_params[name]
+                raw = values if _is_sequence_annotation(annotation) else values[-1]
+            else:
+                default = _plain_default(param.default)
+                if default is _REQUIRED:
+                    raise ValueError(f"Missing required parameter: {name}")
+                params[name] = canonicalize(default)
+                continue
+            params[name] = canonicalize(TypeAdapter(annotation).validate_python(raw))
+        return self._with_user(params, user_id)
+
+    def _with_user(self, params: dict[str, Any], user_id: int | None) -> dict[str, Any]:
+        if self.user_param is None or self.skip_auth:
+            return {"params": params}
+        return {"params": params, "user": user_id}
+
+    def key_for(self, key_data: dict[str, Any]) -> str:
+        """Ключ по каноническим данным (key_data)"""
+        payload = json.dumps(key_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.blake2b(payload.encode(), digest_size=CACHE_KEY_DIGEST_SIZE).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def build(self, args: tuple, kwargs: dict[str, Any]) -> str:
+        """Ключ кеша для вызова с аргументами args/kwargs"""
+        return self.key_for(self.key_data(args, kwargs))
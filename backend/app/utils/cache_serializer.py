@@ -0,0 +1,161 @@
+"""
+Сериализация значений кеша
+Кодеки orjson/msgpack/json и прозрачное сжатие zlib/zstd больших значений
+"""
+
+from __future__ import annotations
+
+import enum
+import json
+import logging
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.constants import CACHE_COMPRESSION_LEVEL, CACHE_COMPRESSION_THRESHOLD
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Первый байт заголовка. 0xC1 не используется в msgpack и не может начинать
+# JSON/UTF-8, поэтому значения без заголовка читаются как JSON старого формата.
+HEADER_MAGIC = 0xC1
+
+CODEC_IDS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+def to_primitive(obj: Any) -> Any:
+    """
+    Приведение объектов, которые кодек не умеет сериализовать сам
+
+    Pydantic-модели разворачиваются в dict, даты - в ISO-строку, Decimal и
+    UUID - в строку, Enum - в значение, множества - в список.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, UUID)):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not cache serializable")
+
+
+class CacheSerializer:
+    """
+    Сериализатор значений кеша
+
+    Формат записи: 3 байта заголовка (HEADER_MAGIC, кодек, сжатие) и тело.
+    Кодек и сжатие читаются из заголовка, поэтому смена настроек не ломает
+    уже записанные значения. Тела короче compress_threshold не сжимаются.
+
+    Args:
+        codec: "orjson" (по умолчанию), "msgpack" или "json"
+        compression: "zlib", "zstd" или "none"
+        compress_threshold: Минимальный размер тела в байтах для сжатия
+        compression_level: Уровень сжатия
+    """
+
+    def __init__(
+        self,
+        codec: str = "orjson",
+        compression: str = "zlib",
+        compress_threshold: int = CACHE_COMPRESSION_THRESHOLD,
+        compression_level: int = CACHE_COMPRESSION_LEVEL,
+    ) -> None:
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown cache codec: {codec}")
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        if codec == "orjson" and not ORJSON_AVAILABLE:
+            logger.warning("⚠️ orjson not installed, cache falls back to json codec")
+            codec = "json"
+        if codec == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("⚠️ msgpack not installed, cache falls back to json codec")
+            codec = "json"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("⚠️ zstandard not installed, cache falls back to zlib compression")
+            compression = "zlib"
+
+        self.codec = codec
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=compression_level) if compression == "zstd" else None
+
+    # ==================== ENCODE ====================
+
+    def dumps(self, value: Any) -> bytes:
+        """Сериализация значения в bytes с заголовком"""
+        body = self._encode(value)
+        compression = "none"
+        if self.compression != "none" and len(body) >= self.compress_threshold:
+            body = self._compress(body)
+            compression = self.compression
+        return bytes((HEADER_MAGIC, CODEC_IDS[self.codec], COMPRESSION_IDS[compression])) + body
+
+    def _encode(self, value: Any) -> bytes:
+        if self.codec == "orjson":
+            return orjson.dumps(value, default=to_primitive, option=orjson.OPT_NON_STR_KEYS)
+        if self.codec == "msgpack":
+            return msgpack.packb(value, default=to_primitive, datetime=False)
+        return json.dumps(value, default=to_primitive, separators=(",", ":")).encode()
+
+    def _compress(self, body: bytes) -> bytes:
+        if self._zstd_compressor is not None:
+            return self._zstd_compressor.compress(body)
+        return zlib.compress(body, self.compression_level)
+
+    # ==================== DECODE ====================
+
+    def loads(self, data: bytes | str) -> Any:
+        """Десериализация значения (включая JSON без заголовка, записанный до введения формата)"""
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data or data[0] != HEADER_MAGIC:
+            return json.loads(data)
+
+        codec_id, compression_id, body = data[1], data[2], data[3:]
+        if compression_id == COMPRESSION_IDS["zlib"]:
+            body = zlib.decompress(body)
+        elif compression_id == COMPRESSION_IDS["zstd"]:
+            if not ZSTD_AVAILABLE:
+                raise ValueError("Cache value is zstd-compressed, but zstandard is not installed")
+            body = zstandard.ZstdDecompressor().decompress(body)
+
+        if codec_id == CODEC_IDS["orjson"]:
+            return orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+        if codec_id == CODEC_IDS["msgpack"]:
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Cache value is msgpack-encoded, but msgpack is not installed")
+            return msgpack.unpackb(body, strict_map_key=False)
+        return json.loads(body)
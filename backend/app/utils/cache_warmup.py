@@ -0,0 +1,254 @@
+"""
+Прогрев кеша
+Предвычисление горячих ключей при старте воркера и периодически из Celery
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.utils.cache_keys import CacheKeyBuilder
+
+logger = logging.getLogger(__name__)
+
+
+class WarmableEndpoint(Protocol):
+    """Эндпоинт с @cached: построитель ключа и пересчёт значения в кеше"""
+
+    __name__: str
+    cache_key_builder: CacheKeyBuilder
+
+    def warm(self, *args: Any, **kwargs: Any) -> Awaitable[None]: ...
+
+
+@dataclass(slots=True)
+class WarmupTarget:
+    """Ключ для прогрева: кешируемый эндпоинт и параметры запроса"""
+
+    endpoint: WarmableEndpoint
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+def _course_detail_targets(db: Session, top_courses: int) -> list[WarmupTarget]:
+    """Страницы самых популярных по числу записей курсов"""
+    from app.api.courses_crud import get_course
+    from app.models.course import CourseEnrollment
+
+    rows = (
+        db.query(CourseEnrollment.course_id)
+        .group_by(CourseEnrollment.course_id)
+        .order_by(func.count(CourseEnrollment.id).desc())
+        .limit(top_courses)
+        .all()
+    )
+    return [WarmupTarget(get_course, {"course_id": course_id}) for (course_id,) in rows]
+
+
+def _mentors_top_rated_targets(db: Session, top_courses: int) -> list[WarmupTarget]:
+    from app.api.mentors_search import get_top_rated_mentors
+
+    return [WarmupTarget(get_top_rated_mentors)]
+
+
+def _mentor_specializations_targets(db: Session, top_courses: int) -> list[WarmupTarget]:
+    from app.api.mentors_search import get_specializations
+
+    return [WarmupTarget(get_specializations)]
+
+
+def _platform_stats_targets(db: Session, top_courses: int) -> list[WarmupTarget]:
+    from app.api.stats import get_platform_stats
+
+    return [WarmupTarget(get_platform_stats)]
+
+
+# Имя группы ключей (settings.CACHE_WARMUP_KEYS) -> функция, перечисляющая её ключи
+WARMUP_JOBS: dict[str, Callable[[Session, int], list[WarmupTarget]]] = {
+    "course_detail": _course_detail_targets,
+    "mentors_top_rated": _mentors_top_rated_targets,
+    "mentor_specializations": _mentor_specializations_targets,
+    "platform_stats": _platform_stats_targets,
+}
+
+# Состояние прогрева воркера: пока он идёт, /health/ready отвечает 503
+_warmup_status: dict[str, Any] = {"state": "idle"}
+_warmup_task: asyncio.Task | None = None
+
+
+def collect_targets(jobs: Iterable[str], top_courses: int) -> list[WarmupTarget]:
+    """Список ключей для прогрева по именам групп (ошибка одной группы не прерывает остальные)"""
+    targets: list[WarmupTarget] = []
+    db = SessionLocal()
+    try:
+        for name in jobs:
+            job = WARMUP_JOBS.get(name)
+            if job is None:
+                logger.warning(f"⚠️ Unknown cache warm-up job: {name}")
+                continue
+            try:
+                targets.extend(job(db, top_courses))
+            except Exception as e:
+                logger.error(f"❌ Cache warm-up job {name} failed to list keys: {e}")
+    finally:
+        db.close()
+    return targets
+
+
+async def warm_target(target: WarmupTarget) -> None:
+    """Пересчёт одного ключа в собственной сессии БД (async, если эндпоинт ожидает AsyncSession)"""
+    params = {**target.endpoint.cache_key_builder.default_params(), **target.params}
+    db_param = target.endpoint.cache_key_builder.signature.parameters.get("db")
+    if db_param is not None and db_param.annotation is AsyncSession:
+        async with AsyncSessionLocal() as async_db:
+            await target.endpoint.warm(db=async_db, **params)
+        return
+    db = SessionLocal()
+    try:
+        await target.endpoint.warm(db=db, **params)
+    finally:
+        db.close()
+
+
+async def run_cache_warmup(
+    jobs: Iterable[str] | None = None,
+    top_courses: int | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    """
+    Прогрев горячих ключей кеша
+
+    Ключи пересчитываются параллельно, не более concurrency одновременно;
+    значения перезаписываются, даже если уже есть в кеше. Прогрев
+    прерывается по timeout, ошибки отдельных ключей только логируются.
+
+    Args:
+        jobs: Группы ключей (по умолчанию settings.CACHE_WARMUP_KEYS)
+        top_courses: Сколько самых популярных курсов прогревать
+        concurrency: Максимум одновременно пересчитываемых ключей
+        timeout: Ограничение времени всего прогрева в секундах
+
+    Returns:
+        Статистика: число ключей, прогретых, с ошибкой, длительность
+    """
+    jobs = list(jobs if jobs is not None else settings.CACHE_WARMUP_KEYS)
+    top_courses = top_courses if top_courses is not None else settings.CACHE_WARMUP_TOP_COURSES
+    timeout = timeout or settings.CACHE_WARMUP_TIMEOUT
+    semaphore = asyncio.Semaphore(concurrency or settings.CACHE_WARMUP_CONCURRENCY)
+    started = time.perf_counter()
+    result = {"keys": 0, "warmed": 0, "failed": 0, "timed_out": False}
+
+    async def warm(target: WarmupTarget) -> None:
+        async with semaphore:
+            try:
+                await warm_target(target)
+                result["warmed"] += 1
+            except Exception as e:
+                result["failed"] += 1
+                logger.warning(f"⚠️ Cache warm-up failed for {target.endpoint.__name__}{target.params}: {e}")
+
+    targets = collect_targets(jobs, top_courses)
+    result["keys"] = len(targets)
+    try:
+        await asyncio.wait_for(asyncio.gather(*(warm(target) for target in targets)), timeout)
+    except asyncio.TimeoutError:
+        result["timed_out"] = True
+        logger.warning(f"⚠️ Cache warm-up timed out after {timeout}s")
+
+    result["duration"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"🔥 Cache warm-up: {result['warmed']}/{result['keys']} keys in {result['duration']}s"
+        f" ({result['failed']} failed)"
+    )
+    return result
+
+
+async def rewarm_shared_cache() -> dict[str, Any]:
+    """
+    Периодический прогрев общего кеша в Redis (задача Celery)
+
+    Celery-воркер не проходит lifespan приложения, поэтому кеш-менеджер
+    с собственным клиентом Redis создаётся на время прогрева. Без Redis
+    прогрев бесполезен: память Celery-воркера не видна API-воркерам.
+    """
+    from redis.asyncio import Redis
+
+    from app.utils.cache import init_cache, shutdown_cache
+    from app.utils.cache_serializer import CacheSerializer
+
+    client = Redis.from_url(settings.REDIS_URL, socket_timeout=settings.REDIS_SOCKET_TIMEOUT)
+    try:
+        try:
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Redis unavailable, skipping cache warm-up: {e}")
+            return {"keys": 0, "warmed": 0, "failed": 0, "skipped": True}
+
+        init_cache(
+            client,
+            serializer=CacheSerializer(
+                codec=settings.CACHE_SERIALIZER,
+                compression=settings.CACHE_COMPRESSION,
+                compress_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+            ),
+        )
+        try:
+            return await run_cache_warmup()
+        finally:
+            await shutdown_cache()
+    finally:
+        await client.aclose()  # type: ignore[attr-defined]
+
+
+# ==================== WORKER STARTUP ====================
+
+
+def is_cache_warm() -> bool:
+    """Прогрев при старте не идёт (завершён, не запускался или выключен)"""
+    return _warmup_status["state"] != "running"
+
+
+def get_warmup_status() -> dict[str, Any]:
+    """Состояние прогрева воркера для health-эндпоинтов"""
+    return dict(_warmup_status)
+
+
+def start_cache_warmup() -> asyncio.Task:
+    """Запуск прогрева в фоне; до его окончания воркер не готов принимать трафик"""
+    global _warmup_task
+
+    async def _run() -> None:
+        try:
+            _warmup_status.update(await run_cache_warmup(), state="done")
+        except Exception as e:
+            logger.error(f"❌ Cache warm-up failed: {e}")
+            _warmup_status.update(state="failed", error=str(e))
+
+    _warmup_status.clear()
+    _warmup_status["state"] = "running"
+    _warmup_task = asyncio.create_task(_run())
+    return _warmup_task
+
+
+async def stop_cache_warmup() -> None:
+    """Отмена незавершённого прогрева при остановке воркера"""
+    global _warmup_task
+    if _warmup_task and not _warmup_task.done():
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except asyncio.CancelledError:
+            pass
+        _warmup_status["state"] = "cancelled"
+    _warmup_task = None
@@ -0,0 +1,48 @@
+"""
+IP клиента за обратным прокси
+X-Forwarded-For учитывается, только если запрос пришёл от доверенного прокси
+(TRUSTED_PROXIES). Адреса заголовка разбираются справа налево до первого
+недоверенного: его дописал последний доверенный прокси, и подделать его
+клиент не может - подставленные клиентом адреса стоят левее
+"""
+
+from __future__ import annotations
+
+import ipaddress
+from collections.abc import Iterable
+
+from fastapi import Request
+
+from app.config import settings
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+def parse_networks(values: Iterable[str]) -> tuple[IPNetwork, ...]:
+    """Сети из строк вида 10.0.0.0/8 или 127.0.0.1 (одиночный адрес)"""
+    return tuple(ipaddress.ip_network(value.strip(), strict=False) for value in values if value.strip())
+
+
+trusted_proxies = parse_networks(settings.TRUSTED_PROXIES)
+
+
+def is_trusted_proxy(address: str, networks: tuple[IPNetwork, ...] | None = None) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in (trusted_proxies if networks is None else networks))
+
+
+def get_client_ip(request: Request, networks: tuple[IPNetwork, ...] | None = None) -> str:
+    """IP клиента: адрес соединения или, за доверенным прокси, из X-Forwarded-For"""
+    peer = request.client.host if request.client else "unknown"
+    if not is_trusted_proxy(peer, networks):
+        return peer
+
+    hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop, networks):
+            return hop
+    # Все адреса цепочки - прокси: клиентом считается самый левый
+    return hops[0] if hops else peer
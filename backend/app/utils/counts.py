@@ -0,0 +1,129 @@
+"""
+Подсчёт total для пагинированных списков
+COUNT(*) по отфильтрованному набору в PostgreSQL - полный проход по нему,
+поэтому точный подсчёт ограничивается EXACT_COUNT_LIMIT строками, а total
+больших наборов берётся из кеша или оценки планировщика
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Select, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.utils.memory_cache import MISSING, MemoryCache
+from app.utils.prometheus import DB_TOTAL_COUNTS
+
+logger = logging.getLogger(__name__)
+
+# Примерный размер записи кеша (ключ и TotalCount) для бюджета MemoryCache
+COUNT_CACHE_ENTRY_SIZE = 128
+
+
+@dataclass(frozen=True, slots=True)
+class TotalCount:
+    """Значение total; exact=False - оценка планировщика"""
+
+    value: int
+    exact: bool = True
+
+
+class TotalCounter:
+    """
+    Стратегия подсчёта total
+
+    1. Значение из кеша по сигнатуре запроса (SQL и параметры фильтров).
+    2. Набор без фильтров в PostgreSQL - pg_class.reltuples, если таблица
+       больше exact_limit (оценка обновляется ANALYZE/autovacuum).
+    3. COUNT по подзапросу с LIMIT exact_limit + 1: маленькие результаты
+       считаются точно и не кешируются, поэтому сразу видят изменения.
+    4. Больше exact_limit - полный COUNT, кешируется на ttl секунд.
+
+    Кеш свой у каждого воркера.
+    """
+
+    def __init__(self, exact_limit: int, ttl: float, max_bytes: int) -> None:
+        self.exact_limit = exact_limit
+        self.ttl = ttl
+        self._cache = MemoryCache(max_bytes=max_bytes)
+        # Синхронные эндпоинты считают total в пуле потоков
+        self._lock = threading.Lock()
+
+    def count(self, session: Session, query: Query | Select) -> TotalCount:
+        """total для запроса списка (без сортировки, offset и limit)"""
+        stmt = query.statement if isinstance(query, Query) else query
+        if not isinstance(stmt, Select):
+            raise TypeError(f"total_counter expects a SELECT query, got {type(stmt).__name__}")
+        stmt = stmt.order_by(None)
+        dialect = session.get_bind().dialect
+        key = self._signature(stmt, dialect)
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not MISSING:
+            DB_TOTAL_COUNTS.labels(strategy="cached").inc()
+            return cached
+
+        table = self._unfiltered_table(stmt)
+        if table is not None and dialect.name == "postgresql":
+            estimate = self._estimate(session, table)
+            if estimate is not None and estimate > self.exact_limit:
+                DB_TOTAL_COUNTS.labels(strategy="estimate").inc()
+                return self._store(key, TotalCount(estimate, exact=False))
+
+        bounded = session.scalar(select(func.count()).select_from(stmt.limit(self.exact_limit + 1).subquery())) or 0
+        if bounded <= self.exact_limit:
+            DB_TOTAL_COUNTS.labels(strategy="exact").inc()
+            return TotalCount(bounded)
+
+        DB_TOTAL_COUNTS.labels(strategy="full").inc()
+        total = session.scalar(select(func.count()).select_from(stmt.subquery())) or 0
+        return self._store(key, TotalCount(total))
+
+    async def count_async(self, session: AsyncSession, query: Select) -> TotalCount:
+        return await session.run_sync(self.count, query)
+
+    def _store(self, key: str, total: TotalCount) -> TotalCount:
+        with self._lock:
+            self._cache.set(key, total, ttl=self.ttl, size=COUNT_CACHE_ENTRY_SIZE)
+        return total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _signature(stmt: Select, dialect: Any) -> str:
+        compiled = stmt.compile(dialect=dialect)
+        params = sorted((name, repr(value)) for name, value in compiled.params.items())
+        return hashlib.sha256(f"{compiled}|{params}".encode()).hexdigest()
+
+    @staticmethod
+    def _unfiltered_table(stmt: Select) -> str | None:
+        """Имя таблицы, если запрос выбирает её целиком (без WHERE, JOIN и GROUP BY)"""
+        froms = stmt.get_final_froms()
+        if stmt.whereclause is not None or stmt._group_by_clauses or len(froms) != 1:
+            return None
+        return froms[0].fullname if isinstance(froms[0], Table) else None
+
+    @staticmethod
+    def _estimate(session: Session, table: str) -> int | None:
+        """Оценка числа строк из статистики планировщика; None, если таблица ещё не анализировалась"""
+        estimate = session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+        )
+        return estimate if estimate is not None and estimate >= 0 else None
+
+
+total_counter = TotalCounter(
+    exact_limit=settings.EXACT_COUNT_LIMIT,
+    ttl=settings.COUNT_CACHE_TTL,
+    max_bytes=settings.COUNT_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,162 @@
+"""
+Адаптивное ограничение конкурентности соединений БД
+Лимит одновременно выданных соединений primary пула подстраивается под
+время ожидания соединения (AIMD), чтобы при всплесках запросы ждали слот
+с коротким таймаутом и получали 503 вместо pool_timeout через 30 секунд
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.pool import Pool
+
+from app.config import settings
+from app.database import checkout_limiters, checkout_wait_listeners, engine
+from app.utils.prometheus import DB_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Множитель лимита при ожидании выше целевого (multiplicative decrease)
+DECREASE_FACTOR = 0.75
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Семафор с изменяемым лимитом
+
+    Каждые window выдач соединения из пула сравнивается среднее ожидание
+    с target_wait: выше - лимит умножается на DECREASE_FACTOR, ниже
+    половины и лимит был исчерпан - лимит растёт на 1. Таймаут пула
+    сразу уменьшает лимит вдвое.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, target_wait: float, acquire_timeout: float, window: int) -> None:
+        self.min_limit = min(min_limit, max_limit)
+        self.max_limit = max_limit
+        self.target_wait = target_wait
+        self.acquire_timeout = acquire_timeout
+        self.window = window
+        self.limit = max_limit
+        self.in_use = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+        self._samples = 0
+        self._wait_total = 0.0
+        self._saturated = False
+        self._update_gauges()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Занять слот; False - слот не освободился за timeout секунд"""
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        with self._condition:
+            self.waiting += 1
+            try:
+                while self.in_use >= self.limit:
+                    self._saturated = True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.in_use += 1
+                if self.in_use >= self.limit:
+                    self._saturated = True
+                return True
+            finally:
+                self.waiting -= 1
+                self._update_gauges()
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+            self._update_gauges()
+
+    def observe(self, wait: float, timed_out: bool = False) -> None:
+        """Учёт ожидания соединения из пула и пересчёт лимита"""
+        with self._condition:
+            if timed_out:
+                self._set_limit(self.limit // 2, f"pool timeout after {wait:.1f}s")
+                return
+            self._samples += 1
+            self._wait_total += wait
+            if self._samples < self.window:
+                return
+
+            average = self._wait_total / self._samples
+            if average > self.target_wait:
+                self._set_limit(int(self.limit * DECREASE_FACTOR), f"average checkout wait {average * 1000:.0f} ms")
+            elif average < self.target_wait / 2 and self._saturated:
+                self._set_limit(self.limit + 1)
+            else:
+                self._reset_window()
+
+    def _set_limit(self, limit: int, reason: str | None = None) -> None:
+        limit = max(self.min_limit, min(self.max_limit, limit))
+        if limit != self.limit:
+            if reason and limit < self.limit:
+                logger.warning(f"📉 DB concurrency limit {self.limit} -> {limit} ({reason})")
+            self.limit = limit
+            self._condition.notify_all()
+        self._reset_window()
+        self._update_gauges()
+
+    def _reset_window(self) -> None:
+        self._samples = 0
+        self._wait_total = 0.0
+        self._saturated = False
+
+    def _update_gauges(self) -> None:
+        DB_CONCURRENCY.labels(state="limit").set(self.limit)
+        DB_CONCURRENCY.labels(state="in_use").set(self.in_use)
+        DB_CONCURRENCY.labels(state="waiting").set(self.waiting)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "target_wait_ms": self.target_wait * 1000,
+        }
+
+
+def _pool_capacity(pool: Pool) -> int:
+    """pool_size + max_overflow пула MonitoredQueuePool; для пулов без лимита (NullPool) - из настроек"""
+    capacity = getattr(pool, "capacity", None)
+    return capacity if capacity is not None else settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+
+def create_limiter() -> AdaptiveConcurrencyLimiter | None:
+    """
+    Ограничитель соединений primary, если включён DB_ADAPTIVE_CONCURRENCY
+
+    Слот занимается при выдаче соединения из пула, а не при открытии сессии:
+    сессии, которые не дошли до запроса в БД, слот не держат.
+    """
+    if not settings.DB_ADAPTIVE_CONCURRENCY:
+        return None
+
+    limiter = AdaptiveConcurrencyLimiter(
+        min_limit=settings.DB_CONCURRENCY_MIN,
+        max_limit=_pool_capacity(engine.pool),
+        target_wait=settings.DB_CONCURRENCY_TARGET_WAIT,
+        acquire_timeout=settings.DB_CONCURRENCY_ACQUIRE_TIMEOUT,
+        window=settings.DB_CONCURRENCY_WINDOW,
+    )
+
+    def _observe_primary(pool: Pool, wait: float, timed_out: bool) -> None:
+        if pool is engine.pool:
+            limiter.observe(wait, timed_out)
+
+    checkout_wait_listeners.append(_observe_primary)
+    checkout_limiters["primary"] = limiter
+    logger.info(f"🎚️ Adaptive DB concurrency enabled (limit {limiter.min_limit}..{limiter.max_limit})")
+    return limiter
+
+
+db_concurrency_limiter = create_limiter()
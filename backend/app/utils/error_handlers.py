@@ -15,6 +15,8 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.database import DatabaseBusyError
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,7 +80,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException)
         f"IP: {request.client.host if request.client else 'unknown'}"
     )
 
-    return JSONResponse(status_code=exc.status_code, content=error.to_dict())
+    # Заголовки исключения (Retry-After, WWW-Authenticate) передаются клиенту
+    return JSONResponse(status_code=exc.status_code, content=error.to_dict(), headers=exc.headers)
 
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
@@ -121,6 +124,20 @@ async def database_exception_handler(request: Request, exc: SQLAlchemyError) ->
     Returns:
         JSONResponse с информацией об ошибке БД
     """
+    # Лимитер пула не выдал слот (DB_ADAPTIVE_CONCURRENCY) - клиенту стоит повторить
+    if isinstance(exc, DatabaseBusyError):
+        error = ErrorResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="Database is busy",
+            error_code="DATABASE_BUSY",
+            detail="Database is busy, please retry",
+            path=str(request.url),
+        )
+        logger.warning(f"Database busy: {exc} | Path: {request.url}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=error.to_dict(), headers={"Retry-After": "1"}
+        )
+
     # Специальная обработка для нарушений целостности
     if isinstance(exc, IntegrityError):
         error = ErrorResponse(
@@ -0,0 +1,102 @@
+"""
+HTTP-кеширование ответов
+ETag, Cache-Control и условные запросы (If-None-Match -> 304)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response, status
+
+from app.constants import ETAG_DIGEST_SIZE
+
+
+def make_etag(body: bytes | str) -> str:
+    """Сильный ETag по содержимому ответа"""
+    if isinstance(body, str):
+        body = body.encode()
+    return f'"{hashlib.blake2b(body, digest_size=ETAG_DIGEST_SIZE).hexdigest()}"'
+
+
+def version_etag(*parts: Any) -> str:
+    """
+    Сильный ETag по версии данных (id, updated_at, количество записей...)
+
+    Позволяет ответить 304, не загружая и не сериализуя сами данные.
+    """
+    payload = json.dumps(parts, default=str, separators=(",", ":"))
+    return make_etag(payload)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match
+
+    По RFC 9110 для If-None-Match используется слабое сравнение: префикс
+    W/ игнорируется (например, после сжатия ответа прокси).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def cache_control(max_age: int | None = None, private: bool = False) -> str:
+    """
+    Значение Cache-Control
+
+    Без max_age ответ можно хранить, но перед использованием нужно
+    перепроверить по ETag (no-cache). private - ответ зависит от пользователя,
+    общие кеши (nginx, CDN) его не хранят.
+    """
+    scope = "private" if private else "public"
+    if not max_age:
+        return f"{scope}, no-cache"
+    return f"{scope}, max-age={max_age}"
+
+
+def is_not_modified(request: Request | None, etag: str) -> bool:
+    """Клиент уже имеет актуальную версию ответа"""
+    return request is not None and etag_matches(request.headers.get("if-none-match"), etag)
+
+
+def not_modified_response(etag: str, cache_control_value: str) -> Response:
+    """Ответ 304 без тела"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control_value},
+    )
+
+
+def conditional_response(
+    request: Request | None,
+    body: bytes | str,
+    etag: str | None = None,
+    max_age: int | None = None,
+    private: bool = False,
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Ответ с ETag и Cache-Control; 304, если If-None-Match совпадает с ETag
+
+    Args:
+        request: Текущий запрос (None - без проверки If-None-Match)
+        body: Готовое тело ответа
+        etag: ETag, если уже известен (например, сохранён в кеше вместе с телом)
+        max_age: Cache-Control max-age в секундах
+        private: Ответ зависит от текущего пользователя
+        media_type: Тип содержимого
+    """
+    etag = etag or make_etag(body)
+    cache_control_value = cache_control(max_age, private)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, cache_control_value)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": cache_control_value},
+    )
@@ -0,0 +1,209 @@
+"""
+In-process кеш для MentorHub
+LRU с TTL для каждой записи и бюджетом по байтам
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from app.constants import MEMORY_CACHE_MAX_BYTES, MEMORY_CACHE_SWEEP_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Маркер отсутствия значения (None - допустимое значение кеша)
+MISSING: Any = object()
+
+
+@dataclass(slots=True)
+class MemoryCacheEntry:
+    """Запись кеша: значение, момент истечения (monotonic), размер в байтах и теги"""
+
+    value: Any
+    expires_at: float | None
+    size: int
+    tags: tuple[str, ...] = ()
+
+
+class MemoryCache:
+    """
+    LRU-кеш в памяти процесса.
+
+    Все операции O(1): порядок использования хранится в OrderedDict,
+    размер записи считается один раз при вставке. При превышении бюджета
+    по байтам вытесняются наименее используемые записи. Протухшие записи
+    удаляются лениво при чтении и периодически фоновым sweeper'ом.
+    Записи можно помечать тегами и инвалидировать все записи тега сразу.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, MemoryCacheEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._sweeper_task: asyncio.Task | None = None
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key) if isinstance(key, str) else None
+        return entry is not None and not self._is_expired(entry, time.monotonic())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def keys(self) -> list[str]:
+        """Список ключей (включая ещё не удалённые протухшие)"""
+        return list(self._entries)
+
+    @staticmethod
+    def _is_expired(entry: MemoryCacheEntry, now: float) -> bool:
+        return entry.expires_at is not None and now >= entry.expires_at
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """Получение значения; возвращает default при промахе или истечении TTL"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return default
+        if self._is_expired(entry, time.monotonic()):
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: float | None, size: int, tags: Iterable[str] = ()) -> bool:
+        """
+        Сохранение значения.
+
+        Args:
+            key: Ключ кеша
+            value: Значение
+            ttl: Время жизни в секундах (None - без истечения)
+            size: Размер значения в байтах (обычно длина сериализованного представления)
+            tags: Теги для групповой инвалидации
+
+        Returns:
+            False, если запись больше всего бюджета и не была сохранена
+        """
+        if size > self.max_bytes:
+            logger.debug(f"Memory cache: value for {key} exceeds budget ({size} > {self.max_bytes} bytes)")
+            self._remove(key)
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        expires_at = time.monotonic() + ttl if ttl else None
+        entry_tags = tuple(tags)
+        self._entries[key] = MemoryCacheEntry(value=value, expires_at=expires_at, size=size, tags=entry_tags)
+        self.total_bytes += size
+        for tag in entry_tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Удаление ключа; True, если ключ был в кеше"""
+        return self._remove(key) is not None
+
+    def clear(self, prefix: str = "") -> int:
+        """Очистка всего кеша или только ключей с префиксом. Возвращает число удалённых записей"""
+        if not prefix:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            self.total_bytes = 0
+            return removed
+
+        keys_to_delete = [k for k in self._entries if k.startswith(prefix)]
+        for k in keys_to_delete:
+            self._remove(k)
+        return len(keys_to_delete)
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Удаление всех записей с тегом. Возвращает число удалённых записей"""
+        keys = self._tags.pop(tag, set())
+        for k in keys:
+            self._remove(k)
+        return len(keys)
+
+    def purge_expired(self) -> int:
+        """Удаление всех протухших записей. Возвращает число удалённых записей"""
+        now = time.monotonic()
+        expired = [k for k, entry in self._entries.items() if self._is_expired(entry, now)]
+        for k in expired:
+            self._remove(k)
+        self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def _remove(self, key: str) -> MemoryCacheEntry | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.total_bytes -= entry.size
+        for tag in entry.tags:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+        return entry
+
+    # ==================== SWEEPER ====================
+
+    def start_sweeper(self, interval: float = MEMORY_CACHE_SWEEP_INTERVAL) -> None:
+        """Запуск фоновой задачи очистки протухших записей (требует запущенный event loop)"""
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            return
+        self._sweeper_task = asyncio.create_task(self._sweep_loop(interval))
+
+    async def stop_sweeper(self) -> None:
+        """Остановка фоновой задачи очистки"""
+        task, self._sweeper_task = self._sweeper_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _sweep_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = self.purge_expired()
+                if removed:
+                    logger.debug(f"Memory cache sweeper removed {removed} expired entries")
+            except Exception as e:
+                logger.error(f"Memory cache sweeper error: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """Статистика in-process кеша"""
+        return {
+            **self.stats,
+            "items": len(self._entries),
+            "tags": len(self._tags),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def reset_stats(self) -> None:
+        """Сброс счётчиков"""
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
@@ -1,8 +1,29 @@
 """
 Pagination validation utilities
-Common helpers for skip/limit validation to avoid code duplication
+Common helpers for skip/limit validation to avoid code duplication,
+and keyset (cursor) pagination over (sort_key, id)
 """
 
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal, tuple_
+
+from app.config import settings
+
+# Заголовок со следующим курсором для эндпоинтов, отдающих список без обёртки
+CURSOR_HEADER = "X-Next-Cursor"
+CURSOR_SIGNATURE_BYTES = 16
+
 
 def validate_pagination(skip: int, limit: int, max_limit: int = 100) -> tuple[int, int]:
     """
@@ -22,3 +43,153 @@ def validate_pagination(skip: int, limit: int, max_limit: int = 100) -> tuple[in
         limit = max_limit
 
     return skip, limit
+
+
+# ==================== KEYSET (CURSOR) PAGINATION ====================
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(scope: str, payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"{scope}|{payload}".encode(), hashlib.sha256).digest()
+    return _b64encode(digest[:CURSOR_SIGNATURE_BYTES])
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any], scope: str) -> str:
+    """
+    Непрозрачный подписанный курсор
+
+    Args:
+        values: Значения ключа последней строки страницы (sort_key, id)
+        scope: Эндпоинт и сортировка; курсор другого scope не принимается
+    """
+    payload = _b64encode(json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode())
+    return f"{payload}.{_sign(scope, payload)}"
+
+
+def decode_cursor(cursor: str, scope: str) -> list[Any]:
+    """
+    Значения ключа из курсора
+
+    Raises:
+        HTTPException: 400, если курсор повреждён, подделан или выдан для другой сортировки
+    """
+    payload, _, signature = cursor.partition(".")
+    if not signature or not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        values = json.loads(_b64decode(payload))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+    if not isinstance(values, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+def _from_json(value: Any, column: Any) -> Any:
+    """Значение из курсора в тип колонки (datetime, Enum)"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if isinstance(python_type, type) and issubclass(python_type, Enum):
+        return python_type(value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class CursorPage:
+    """Страница списка и курсор следующей (None - страница последняя)"""
+
+    items: list[Any]
+    next_cursor: str | None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {CURSOR_HEADER: self.next_cursor} if self.next_cursor else {}
+
+
+@dataclass(frozen=True, slots=True)
+class Keyset:
+    """
+    Курсорная пагинация по (sort_key, id)
+
+    Запрос упорядочивается по (sort_column, id_column) в одном направлении,
+    страница после курсора выбирается условием (sort_key, id) < / > значений
+    последней строки, поэтому её стоимость не растёт с глубиной, в отличие от
+    OFFSET. Порядок одинаков в режиме page/offset, так что курсор из ответа
+    страницы offset продолжает список с того же места.
+
+    Args:
+        sort_column: Колонка или выражение сортировки; None - только по id
+        id_column: Уникальная колонка (первичный ключ) для однозначного порядка
+        descending: Порядок по убыванию
+        scope: Эндпоинт и сортировка, входит в подпись курсора
+        sort_value: Значение sort_key из строки результата
+            (по умолчанию - атрибут с именем sort_column)
+    """
+
+    sort_column: Any
+    id_column: Any
+    descending: bool = True
+    scope: str = ""
+    sort_value: Callable[[Any], Any] | None = None
+
+    @property
+    def _columns(self) -> tuple[Any, ...]:
+        return (self.id_column,) if self.sort_column is None else (self.sort_column, self.id_column)
+
+    def apply(self, query: Any, limit: int, cursor: str | None = None) -> Any:
+        """
+        Сортировка, условие курсора и limit + 1 (лишняя строка показывает, есть ли следующая страница)
+
+        Работает с Query и select(); в режиме offset вызывающий добавляет .offset() сам.
+        """
+        columns = self._columns
+        query = query.order_by(*(column.desc() if self.descending else column.asc() for column in columns))
+        if cursor:
+            values = decode_cursor(cursor, self.scope)
+            if len(values) != len(columns):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+            values = [
+                literal(_from_json(value, column), column.type) for value, column in zip(values, columns, strict=True)
+            ]
+            if len(columns) == 1:
+                condition = columns[0] < values[0] if self.descending else columns[0] > values[0]
+            else:
+                key = tuple_(*columns)
+                condition = key < tuple_(*values) if self.descending else key > tuple_(*values)
+            query = query.where(condition)
+        return query.limit(limit + 1)
+
+    def page(self, rows: Sequence[Any], limit: int) -> CursorPage:
+        """Страница из результата apply() и курсор по её последней строке"""
+        items = list(rows[:limit])
+        if len(rows) <= limit or not items:
+            return CursorPage(items, None)
+        last = items[-1]
+        id_value = getattr(last, self.id_column.key)
+        if self.sort_column is None:
+            return CursorPage(items, encode_cursor([id_value], self.scope))
+        sort_value = self.sort_value(last) if self.sort_value else getattr(last, self.sort_column.key)
+        return CursorPage(items, encode_cursor([sort_value, id_value], self.scope))
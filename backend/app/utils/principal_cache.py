@@ -0,0 +1,233 @@
+"""
+Кеш принципала для get_current_user
+Роль, is_active, id профиля ментора и колонки пользователя кешируются на
+PRINCIPAL_CACHE_TTL секунд по id пользователя и версии токена (iat). При
+попадании User собирается из кеша и присоединяется к сессии через
+merge(load=False) - без SELECT; связи загружаются лениво, как обычно.
+
+Кеш свой у каждого воркера. Изменения пользователя сбрасывают запись в
+этом воркере сразу (события маппера при flush) и ещё раз после commit;
+тогда же id пользователя рассылается по каналу инвалидации кеша
+(CACHE_INVALIDATION_CHANNEL), и запись сбрасывают остальные воркеры.
+Если подписка на канал прерывается, кеш очищается целиком
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any
+
+from fastapi import Request
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.config import settings
+from app.models.mentor import Mentor
+from app.models.user import User, UserRole
+from app.utils.memory_cache import MISSING, MemoryCache
+from app.utils.prometheus import AUTH_PRINCIPAL_CACHE
+
+if TYPE_CHECKING:
+    from app.utils.cache import CacheManager
+
+# Вид сообщения в канале инвалидации кеша; target - id пользователя
+PRINCIPAL_INVALIDATION_KIND = "principal"
+
+# Пользователи, изменённые в транзакции сессии: рассылка после commit
+PENDING_INVALIDATIONS_KEY = "principal_invalidations"
+
+# Примерный размер записи (колонки пользователя и ключ) для бюджета MemoryCache
+PRINCIPAL_ENTRY_SIZE = 1024
+
+# id профиля ментора ещё не загружен (None - профиля нет)
+UNKNOWN: Any = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Аутентифицированный пользователь: поля для авторизации и снимок колонок User"""
+
+    user_id: int
+    token_version: int
+    columns: dict[str, Any]
+    mentor_id: int | None | Any = UNKNOWN
+
+    @property
+    def role(self) -> UserRole:
+        return self.columns["role"]
+
+    @property
+    def is_active(self) -> bool:
+        return self.columns["is_active"]
+
+    @classmethod
+    def from_user(cls, user: User, token_version: int) -> Principal:
+        columns = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        return cls(user_id=user.id, token_version=token_version, columns=columns)
+
+    def detached_user(self) -> User:
+        """Отсоединённый User с колонками из снимка (для session.merge(..., load=False))"""
+        user = User(**self.columns)
+        make_transient_to_detached(user)
+        return user
+
+
+class PrincipalCache:
+    """LRU с TTL поверх MemoryCache; все версии токенов пользователя помечены тегом user:{id}"""
+
+    def __init__(self, ttl: float, max_bytes: int) -> None:
+        self.ttl = ttl
+        self._cache = MemoryCache(max_bytes=max_bytes)
+        # Синхронные зависимости выполняются в пуле потоков
+        self._lock = threading.Lock()
+        self._cache_manager: CacheManager | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(user_id: int, token_version: int) -> str:
+        return f"{user_id}:{token_version}"
+
+    def get(self, user_id: int, token_version: int) -> Principal | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            principal = self._cache.get(self._key(user_id, token_version))
+        AUTH_PRINCIPAL_CACHE.labels(result="miss" if principal is MISSING else "hit").inc()
+        return None if principal is MISSING else principal
+
+    def put(self, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._cache.set(
+                self._key(principal.user_id, principal.token_version),
+                principal,
+                ttl=self.ttl,
+                size=PRINCIPAL_ENTRY_SIZE,
+                tags=(f"user:{principal.user_id}",),
+            )
+
+    def invalidate(self, user_id: int, broadcast: bool = True) -> None:
+        """Сброс всех записей пользователя (изменение роли, статуса, профиля), по умолчанию во всех воркерах"""
+        with self._lock:
+            removed = self._cache.invalidate_tag(f"user:{user_id}")
+        if removed:
+            AUTH_PRINCIPAL_CACHE.labels(result="invalidated").inc(removed)
+        if broadcast:
+            self._broadcast(user_id)
+
+    def connect(self, cache_manager: CacheManager) -> None:
+        """Рассылка и приём сбросов через канал инвалидации кеш-менеджера; вызывается из цикла событий"""
+        self._cache_manager = cache_manager
+        self._loop = asyncio.get_running_loop()
+        cache_manager.add_invalidation_handler(
+            PRINCIPAL_INVALIDATION_KIND, lambda user_id: self.invalidate(int(user_id), broadcast=False), self.clear
+        )
+
+    def disconnect(self) -> None:
+        self._cache_manager = None
+        self._loop = None
+
+    def _broadcast(self, user_id: int) -> None:
+        cache_manager, loop = self._cache_manager, self._loop
+        if cache_manager is None or loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        publish = cache_manager.publish_invalidation(PRINCIPAL_INVALIDATION_KIND, user_id)
+        if running is loop:
+            task = loop.create_task(publish)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            # Синхронный обработчик в пуле потоков
+            asyncio.run_coroutine_threadsafe(publish, loop)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL, max_bytes=settings.PRINCIPAL_CACHE_MAX_BYTES)
+
+
+# ==================== REQUEST MEMO ====================
+
+
+def request_principal(request: Request, user_id: int, token_version: int) -> Principal | None:
+    """Принципал запроса: сначала из request.state, затем из кеша воркера"""
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and principal.user_id == user_id and principal.token_version == token_version:
+        return principal
+    principal = principal_cache.get(user_id, token_version)
+    if principal is not None:
+        request.state.principal = principal
+    return principal
+
+
+def remember_principal(request: Request, principal: Principal) -> Principal:
+    """Сохранение принципала в request.state и в кеше воркера"""
+    request.state.principal = principal
+    principal_cache.put(principal)
+    return principal
+
+
+def with_mentor_id(request: Request, principal: Principal, mentor_id: int | None) -> Principal:
+    """Принципал с загруженным id профиля ментора"""
+    return remember_principal(request, replace(principal, mentor_id=mentor_id))
+
+
+def attach_user(db: Session, principal: Principal) -> User:
+    """User принципала в сессии: уже загруженный объект или снимок из кеша без SELECT"""
+    user = db.identity_map.get(Session.identity_key(User, principal.user_id))
+    return user if user is not None else db.merge(principal.detached_user(), load=False)
+
+
+async def attach_user_async(db: AsyncSession, principal: Principal) -> User:
+    user = db.sync_session.identity_map.get(Session.identity_key(User, principal.user_id))
+    return user if user is not None else await db.merge(principal.detached_user(), load=False)
+
+
+# ==================== INVALIDATION ====================
+
+
+def _invalidate_in_flush(target: Any, user_id: int) -> None:
+    # Сразу в этом воркере; остальным - после commit, когда они прочитают уже новые данные
+    principal_cache.invalidate(user_id, broadcast=False)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target: User) -> None:
+    _invalidate_in_flush(target, target.id)
+
+
+@event.listens_for(Mentor, "after_insert")
+@event.listens_for(Mentor, "after_delete")
+def _invalidate_mentor_id(mapper, connection, target: Mentor) -> None:
+    _invalidate_in_flush(target, target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    # Повторно и в этом воркере: запрос мог закешировать старое состояние до commit
+    for user_id in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
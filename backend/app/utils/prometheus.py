@@ -48,6 +48,48 @@ DB_CONNECTION_POOL = Gauge(
     ["pool_type"],
 )
 
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "mentorhub_db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool (queue wait and connect)",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    "mentorhub_db_pool_timeouts_total",
+    "Checkouts that hit pool_timeout",
+    ["pool"],
+)
+
+DB_CONCURRENCY = Gauge(
+    "mentorhub_db_concurrency",
+    "Adaptive database concurrency limiter (limit, in_use, waiting)",
+    ["state"],
+)
+
+DB_CONCURRENCY_REJECTED = Counter(
+    "mentorhub_db_concurrency_rejected_total",
+    "Requests rejected with 503 while waiting for a database concurrency slot",
+)
+
+DB_REPLICA_POOL = Gauge(
+    "mentorhub_db_replica_pool",
+    "Connection pool per database engine (primary and read replicas)",
+    ["replica", "pool_type"],
+)
+
+DB_REPLICA_LAG = Gauge(
+    "mentorhub_db_replica_lag_seconds",
+    "Read replica replication lag (-1 - replica unavailable)",
+    ["replica"],
+)
+
+DB_READ_ROUTING = Counter(
+    "mentorhub_db_read_routing_total",
+    "Read-only database sessions by target",
+    ["target"],
+)
+
 CACHE_HITS = Counter("mentorhub_cache_hits_total", "Cache hits", ["cache_type"])
 
 CACHE_MISSES = Counter("mentorhub_cache_misses_total", "Cache misses", ["cache_type"])
@@ -99,6 +141,67 @@ DATABASE_QUERY_DURATION = Histogram(
     ["query_type", "table"],
     buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, float("inf"))
 )
+REQUEST_DB_QUERIES = Histogram(
+    "mentorhub_request_db_queries",
+    "Database queries per request",
+    ["method", "endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf"))
+)
+REQUEST_DB_DURATION = Histogram(
+    "mentorhub_request_db_duration_seconds",
+    "Total database time per request",
+    ["method", "endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float("inf"))
+)
+DB_QUERY_ISSUES = Counter(
+    "mentorhub_db_query_issues_total",
+    "Requests with query problems (n_plus_one, budget_exceeded)",
+    ["method", "endpoint", "issue"]
+)
+SLOW_DB_QUERIES = Counter(
+    "mentorhub_slow_db_queries_total",
+    "Database queries over SLOW_QUERY_THRESHOLD",
+    ["query_type", "table"]
+)
+DB_TOTAL_COUNTS = Counter(
+    "mentorhub_db_total_counts_total",
+    "Pagination totals by strategy (exact, full, cached, estimate)",
+    ["strategy"]
+)
+AUTH_PRINCIPAL_CACHE = Counter(
+    "mentorhub_auth_principal_cache_total",
+    "Principal cache lookups in get_current_user (hit, miss, invalidated)",
+    ["result"]
+)
+AUTH_TOKEN_CACHE = Counter(
+    "mentorhub_auth_token_cache_total",
+    "Verified JWT cache lookups (hit, miss)",
+    ["result"]
+)
+AUTH_LOCKOUTS = Counter(
+    "mentorhub_auth_lockouts_total",
+    "Login lockouts of accounts and throttling of IPs after repeated failures, by backend",
+    ["scope", "backend"]
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "mentorhub_password_hash_in_flight",
+    "bcrypt operations running or queued in the password hashing pool"
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "mentorhub_password_hash_queue_wait_seconds",
+    "Time a bcrypt operation waits for a pool thread",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "mentorhub_password_hash_duration_seconds",
+    "bcrypt hash/verify duration",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, float("inf"))
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "mentorhub_password_hash_rejected_total",
+    "Password checks rejected with 503 because the hashing queue was full"
+)
 CACHE_OPERATIONS = Counter(
     "mentorhub_cache_operations_total",
     "Cache operations count",
@@ -277,6 +380,21 @@ def update_db_pool_metrics(pool_size: int, overflow: int, used: int) -> None:
     DB_CONNECTION_POOL.labels(pool_type="used").set(used)
 
 
+def update_replica_pool_metrics(replica: str, pool_size: int, overflow: int, used: int) -> None:
+    """
+    Обновление метрик пула подключений отдельной БД (primary или реплики).
+
+    Args:
+        replica: Имя БД (primary, replica-0, ...)
+        pool_size: Размер пула
+        overflow: Overflow размер
+        used: Используемых подключений
+    """
+    DB_REPLICA_POOL.labels(replica=replica, pool_type="size").set(pool_size)
+    DB_REPLICA_POOL.labels(replica=replica, pool_type="overflow").set(overflow)
+    DB_REPLICA_POOL.labels(replica=replica, pool_type="used").set(used)
+
+
 def update_active_users_count(count: int) -> None:
     """
     Обновление метрики активных пользователей.
@@ -323,6 +441,20 @@ def record_database_query(query_type: str, table: str, duration: float = 0.0) ->
         DATABASE_QUERY_DURATION.labels(query_type=query_type, table=table).observe(duration)
 
 
+def record_request_queries(method: str, endpoint: str, count: int, duration: float) -> None:
+    """
+    Запись метрик запросов к БД за один HTTP-запрос.
+
+    Args:
+        method: HTTP метод
+        endpoint: Шаблон маршрута
+        count: Количество запросов к БД
+        duration: Суммарное время запросов в секундах
+    """
+    REQUEST_DB_QUERIES.labels(method=method, endpoint=endpoint).observe(count)
+    REQUEST_DB_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+
+
 def record_cache_operation(operation: str, cache_type: str = "redis") -> None:
     """
     Запись операции с кэшем.
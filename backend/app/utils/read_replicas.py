@@ -0,0 +1,254 @@
+"""
+Чтение с реплик БД
+Маршрутизация read-only сессий на реплики с учётом отставания репликации и read-your-writes
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy import Engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import create_engines, engine, pool_status
+from app.utils.client_ip import get_client_ip
+from app.utils.prometheus import DB_READ_ROUTING, DB_REPLICA_LAG, update_replica_pool_metrics
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики PostgreSQL в секундах; 0, если реплика догнала primary
+# (на простаивающем primary pg_last_xact_replay_timestamp() стареет без реального отставания)
+LAG_QUERY_POSTGRESQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+STICKY_KEY_PREFIX = "db_sticky:"
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Без Redis отметки о записи хранятся в памяти; просроченные вычищаются при превышении
+STICKY_MEMORY_MAX_KEYS = 10_000
+
+
+@dataclass(slots=True)
+class Replica:
+    """Реплика: sync и async движки и фабрики сессий"""
+
+    name: str
+    host: str
+    engine: Engine
+    async_engine: AsyncEngine
+    session_factory: sessionmaker = field(init=False)
+    async_session_factory: async_sessionmaker = field(init=False)
+    # None - реплика ещё не проверена или недоступна; такие реплики не используются
+    lag: float | None = None
+    checked_at: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.session_factory = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
+        self.async_session_factory = async_sessionmaker(
+            bind=self.async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+
+    def pool_status(self) -> dict[str, int]:
+        return pool_status(self.engine)
+
+
+class ReplicaRouter:
+    """
+    Выбор БД для read-only сессии
+
+    Реплики выбираются по кругу среди доступных, отставание которых не
+    больше max_lag секунд; если таких нет - чтение идёт с primary.
+    Клиент, недавно выполнивший запись, читает с primary sticky_window
+    секунд (read-your-writes): отметка о записи хранится в Redis, чтобы
+    её видели все воркеры, без Redis - в памяти воркера.
+    """
+
+    def __init__(self, urls: list[str], max_lag: float, sticky_window: int) -> None:
+        self.max_lag = max_lag
+        self.sticky_window = sticky_window
+        self.replicas: list[Replica] = []
+        for index, url in enumerate(urls):
+            sync_engine, async_engine = create_engines(url)
+            host = make_url(url).host or make_url(url).database or ""
+            self.replicas.append(Replica(f"replica-{index}", host, sync_engine, async_engine))
+        self._counter = itertools.count()
+        self._sticky: dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Replica | None:
+        """Следующая реплика с допустимым отставанием; None - читать с primary"""
+        eligible = [r for r in self.replicas if r.lag is not None and r.lag <= self.max_lag]
+        if not eligible:
+            return None
+        return eligible[next(self._counter) % len(eligible)]
+
+    # ==================== REPLICATION LAG ====================
+
+    async def check_replica(self, replica: Replica) -> None:
+        """Измерение отставания реплики; при ошибке реплика исключается до следующей проверки"""
+        try:
+            async with replica.async_engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    replica.lag = float(await conn.scalar(LAG_QUERY_POSTGRESQL) or 0)
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    replica.lag = 0.0
+        except Exception as e:
+            if replica.lag is not None:
+                logger.warning(f"⚠️ Read replica {replica.name} ({replica.host}) unavailable: {e}")
+            replica.lag = None
+        replica.checked_at = time.time()
+
+    async def refresh(self) -> None:
+        """Проверка всех реплик и обновление метрик пулов"""
+        await asyncio.gather(*(self.check_replica(replica) for replica in self.replicas))
+        for name, status in (("primary", pool_status(engine)), *((r.name, r.pool_status()) for r in self.replicas)):
+            update_replica_pool_metrics(name, status["size"], status["overflow"], status["used"])
+        for replica in self.replicas:
+            DB_REPLICA_LAG.labels(replica=replica.name).set(-1 if replica.lag is None else replica.lag)
+
+    # ==================== READ-YOUR-WRITES ====================
+
+    @staticmethod
+    def _redis() -> Any | None:
+        from app.utils.cache import get_cache
+
+        cache = get_cache()
+        return cache.redis if cache.use_redis else None
+
+    async def mark_write(self, client_key: str) -> None:
+        """Отметка записи клиента: его чтения идут на primary sticky_window секунд"""
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(f"{STICKY_KEY_PREFIX}{client_key}", 1, ex=self.sticky_window)
+                return
+            except Exception as e:
+                logger.debug(f"Redis unavailable for read-your-writes, using memory: {e}")
+
+        now = time.monotonic()
+        if len(self._sticky) > STICKY_MEMORY_MAX_KEYS:
+            self._sticky = {key: until for key, until in self._sticky.items() if until > now}
+        self._sticky[client_key] = now + self.sticky_window
+
+    async def is_sticky(self, client_key: str) -> bool:
+        """Клиент недавно выполнял запись"""
+        redis = self._redis()
+        if redis is not None:
+            try:
+                return bool(await redis.exists(f"{STICKY_KEY_PREFIX}{client_key}"))
+            except Exception as e:
+                logger.debug(f"Redis unavailable for read-your-writes, using memory: {e}")
+        return self._sticky.get(client_key, 0.0) > time.monotonic()
+
+    async def route(self, client_key: str) -> Replica | None:
+        """Реплика для read-only сессии клиента; None - читать с primary"""
+        if not self.enabled:
+            return None
+        if await self.is_sticky(client_key):
+            DB_READ_ROUTING.labels(target="primary_sticky").inc()
+            return None
+        replica = self.choose()
+        DB_READ_ROUTING.labels(target=replica.name if replica else "primary_fallback").inc()
+        return replica
+
+    def get_stats(self) -> dict[str, Any]:
+        """Состояние реплик для мониторинга"""
+        return {
+            "max_lag": self.max_lag,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "host": replica.host,
+                    "lag": replica.lag,
+                    "available": replica.lag is not None and replica.lag <= self.max_lag,
+                    "checked_at": replica.checked_at,
+                    "pool": replica.pool_status(),
+                }
+                for replica in self.replicas
+            ],
+        }
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+            await replica.async_engine.dispose()
+
+
+def parse_replica_urls(value: str) -> list[str]:
+    """DATABASE_REPLICA_URLS: список URL через запятую"""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def client_key(request: Request, token: Any | None) -> str:
+    """Ключ клиента для read-your-writes: id пользователя из токена, иначе IP"""
+    if token is not None:
+        return f"user:{token.user_id}"
+    return f"ip:{get_client_ip(request)}"
+
+
+def client_key_from_request(request: Request) -> str:
+    """Ключ клиента по заголовку Authorization (токен проверяется без обращения к БД)"""
+    from fastapi.security import HTTPAuthorizationCredentials
+    from fastapi.security.utils import get_authorization_scheme_param
+
+    from app.dependencies import get_token_payload_optional
+
+    scheme, credentials = get_authorization_scheme_param(request.headers.get("authorization"))
+    token = None
+    if scheme.lower() == "bearer" and credentials:
+        token = get_token_payload_optional(HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials))
+    return client_key(request, token)
+
+
+replica_router = ReplicaRouter(
+    parse_replica_urls(settings.DATABASE_REPLICA_URLS),
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    sticky_window=settings.DB_READ_YOUR_WRITES_WINDOW,
+)
+if replica_router.enabled:
+    logger.info(f"📚 Read replicas configured: {', '.join(r.host for r in replica_router.replicas)}")
+
+_monitor_task: asyncio.Task | None = None
+
+
+def start_replica_monitor() -> asyncio.Task:
+    """Периодическая проверка отставания реплик и метрик пулов"""
+    global _monitor_task
+
+    async def _run() -> None:
+        while True:
+            try:
+                await replica_router.refresh()
+            except Exception as e:
+                logger.error(f"❌ Read replica check failed: {e}")
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL)
+
+    _monitor_task = asyncio.create_task(_run())
+    return _monitor_task
+
+
+async def stop_replica_monitor() -> None:
+    """Остановка проверки реплик и закрытие их соединений"""
+    global _monitor_task
+    if _monitor_task and not _monitor_task.done():
+        _monitor_task.cancel()
+        try:
+            await _monitor_task
+        except asyncio.CancelledError:
+            pass
+    _monitor_task = None
+    await replica_router.dispose()
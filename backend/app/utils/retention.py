@@ -0,0 +1,241 @@
+"""
+Хранение сообщений и уведомлений по времени
+Строки messages, chat_messages и notifications старше горизонта хранения
+переносятся в таблицы *_archive короткими транзакциями по RETENTION_BATCH_SIZE
+строк. В PostgreSQL эти таблицы секционированы по месяцам (миграция
+c4e6a8b0d2f1): задача заранее создаёт секции и удаляет опустевшие старые
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Table, delete, exists, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.archive import chat_messages_archive, messages_archive, notifications_archive
+from app.models.chat_room import ChatMessage
+from app.models.message import Message
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r"_p(?P<year>\d{4})(?P<month>\d{2})$")
+_UPPER_BOUND = re.compile(r"TO \('(?P<day>\d{4}-\d{2}-\d{2})")
+_CURRENT_SCHEMA = "(SELECT oid FROM pg_namespace WHERE nspname = current_schema())"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Перенос строк таблицы в архив
+
+    Args:
+        table: Исходная таблица
+        archive: Архивная таблица с теми же колонками
+        days: Горизонт хранения в днях
+        keep: Дополнительное условие для строк, которые пока остаются (по cutoff)
+    """
+
+    table: Table
+    archive: Table
+    days: int
+    keep: Callable[[datetime], Any] | None = None
+
+
+def _has_recent_replies(cutoff: datetime) -> Any:
+    # Сообщение с ответами новее cutoff остаётся, пока в архив не уйдут и ответы
+    reply = ChatMessage.__table__.alias("reply")
+    source = ChatMessage.__table__
+    return exists().where(reply.c.parent_message_id == source.c.id, reply.c.created_at >= cutoff)
+
+
+def retention_policies() -> list[RetentionPolicy]:
+    return [
+        RetentionPolicy(Message.__table__, messages_archive, settings.MESSAGES_RETENTION_DAYS),
+        RetentionPolicy(
+            ChatMessage.__table__, chat_messages_archive, settings.MESSAGES_RETENTION_DAYS, keep=_has_recent_replies
+        ),
+        RetentionPolicy(Notification.__table__, notifications_archive, settings.NOTIFICATIONS_RETENTION_DAYS),
+    ]
+
+
+def archive_batch(db: Session, policy: RetentionPolicy, cutoff: datetime, batch_size: int) -> int:
+    """
+    Перенос одной пачки строк старше cutoff в архив; возвращает число строк
+
+    Пачка выбирается по индексу created_at начиная с самых старых строк,
+    поэтому прерванный запуск оставляет в таблице только более новые.
+    Сообщения со свежими ответами защищены условием keep. В PostgreSQL
+    строки блокируются с SKIP LOCKED, поэтому параллельный запуск и
+    запросы пользователей не ждут друг друга.
+    """
+    source = policy.table
+    ids_query = select(source.c.id).where(source.c.created_at < cutoff)
+    if policy.keep is not None:
+        ids_query = ids_query.where(~policy.keep(cutoff))
+    ids = db.scalars(
+        ids_query.order_by(source.c.created_at, source.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not ids:
+        return 0
+
+    columns = [column.name for column in source.columns]
+    # Условие по created_at отсекает лишние секции в PostgreSQL
+    batch = (source.c.id.in_(ids), source.c.created_at < cutoff)
+    db.execute(insert(policy.archive).from_select(columns, select(*source.c).where(*batch)))
+    db.execute(delete(source).where(*batch))
+    db.commit()
+    return len(ids)
+
+
+def archive_old_rows(
+    db: Session,
+    policy: RetentionPolicy,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    pause: float | None = None,
+) -> int:
+    """Перенос строк старше горизонта пачками; не больше max_batches пачек за вызов"""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=policy.days)
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    max_batches = max_batches or settings.RETENTION_MAX_BATCHES
+    pause = settings.RETENTION_BATCH_PAUSE if pause is None else pause
+
+    moved = 0
+    for batch in range(max_batches):
+        try:
+            count = archive_batch(db, policy, cutoff, batch_size)
+        except Exception:
+            db.rollback()
+            raise
+        moved += count
+        if count < batch_size:
+            break
+        if batch < max_batches - 1:
+            time.sleep(pause)
+    else:
+        logger.info(f"🗄️ {policy.table.name}: batch limit reached, the rest is left for the next run")
+    return moved
+
+
+# ==================== POSTGRESQL PARTITIONS ====================
+
+
+def _month_start(day: date, months: int = 0) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    return bool(
+        db.scalar(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                f"WHERE c.relname = :table AND c.relnamespace = {_CURRENT_SCHEMA}"
+            ),
+            {"table": table},
+        )
+    )
+
+
+def ensure_partitions(db: Session, table: str, today: date, months_ahead: int) -> list[str]:
+    """Месячные секции с текущего месяца на months_ahead вперёд; возвращает созданные"""
+    existing = set(_partitions(db, table))
+    legacy_bound = _legacy_bound(db, table)
+    created = []
+    for offset in range(months_ahead + 1):
+        start = _month_start(today, offset)
+        name = partition_name(table, start)
+        if name in existing or (legacy_bound and start < legacy_bound):
+            continue
+        try:
+            db.execute(
+                text(
+                    f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_month_start(start, 1).isoformat()}')"
+                )
+            )
+            db.commit()
+        except Exception as e:
+            # Например, в DEFAULT-секции уже есть строки этого месяца
+            db.rollback()
+            logger.warning(f"⚠️ Could not create partition {name}: {e}")
+            continue
+        created.append(name)
+    return created
+
+
+def drop_empty_partitions(db: Session, table: str, cutoff: datetime) -> list[str]:
+    """Удаление пустых месячных секций, целиком старше cutoff (строки уже в архиве)"""
+    dropped = []
+    for name in _partitions(db, table):
+        match = _PARTITION_NAME.search(name)
+        if not match:
+            continue
+        end = _month_start(date(int(match["year"]), int(match["month"]), 1), 1)
+        if datetime(end.year, end.month, end.day, tzinfo=timezone.utc) > cutoff:
+            continue
+        if db.scalar(text(f'SELECT EXISTS (SELECT 1 FROM "{name}")')):
+            continue
+        db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+        db.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append(name)
+    db.commit()
+    return dropped
+
+
+def _partitions(db: Session, table: str) -> list[str]:
+    return list(
+        db.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+                f"WHERE p.relname = :table AND p.relnamespace = {_CURRENT_SCHEMA}"
+            ),
+            {"table": table},
+        )
+    )
+
+
+def _legacy_bound(db: Session, table: str) -> date | None:
+    """Верхняя граница секции {table}_legacy - исходной таблицы, присоединённой миграцией"""
+    bound = db.scalar(
+        text(
+            "SELECT pg_get_expr(c.relpartbound, c.oid) FROM pg_class c "
+            f"WHERE c.relname = :name AND c.relnamespace = {_CURRENT_SCHEMA}"
+        ),
+        {"name": f"{table}_legacy"},
+    )
+    match = _UPPER_BOUND.search(bound or "")
+    return date.fromisoformat(match["day"]) if match else None
+
+
+def run_retention(db: Session, now: datetime | None = None) -> dict[str, dict[str, Any]]:
+    """Перенос в архив по всем политикам и обслуживание секций в PostgreSQL"""
+    now = now or datetime.now(timezone.utc)
+    postgres = db.get_bind().dialect.name == "postgresql"
+    report: dict[str, dict[str, Any]] = {}
+    for policy in retention_policies():
+        table = policy.table.name
+        report[table] = {"archived": archive_old_rows(db, policy, now=now)}
+        if postgres and is_partitioned(db, table):
+            cutoff = now - timedelta(days=policy.days)
+            months_ahead = settings.PARTITION_MONTHS_AHEAD
+            report[table]["partitions_created"] = ensure_partitions(db, table, now.date(), months_ahead)
+            report[table]["partitions_dropped"] = drop_empty_partitions(db, table, cutoff)
+    return report
@@ -3,61 +3,52 @@
 Хеширование паролей, валидация, защита от brute-force, токены
 """
 
+import asyncio
 import hashlib
 import logging
 import re
 import secrets
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import bcrypt
 import jwt
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
 
 from app.config import settings
 from app.constants import (
+    BRUTE_FORCE_MEMORY_MAX_ENTRIES,
     COMMON_PASSWORDS,
     LOCKOUT_DURATION_SECONDS,
+    LOGIN_THROTTLE_MAX_DELAY,
+    LOGIN_THROTTLE_STEP,
     MAX_LOGIN_ATTEMPTS,
+    MAX_LOGIN_ATTEMPTS_PER_IP,
     PASSWORD_ALPHABET,
     PASSWORD_MAX_LENGTH,
     PASSWORD_MIN_LENGTH,
 )
+from app.utils.prometheus import (
+    AUTH_LOCKOUTS,
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_REJECTED,
+)
+from app.utils.token_cache import decode_verified
 
 logger = logging.getLogger(__name__)
 
-# Redis client for BruteForceProtection (lazy init)
-_redis_client = None
-
-
-def _get_redis():
-    """Get or create sync Redis client for brute-force protection."""
-    global _redis_client
-    if _redis_client is not None:
-        return _redis_client
-    try:
-        import redis as sync_redis
-        redis_url = getattr(settings, "REDIS_URL", None)
-        if redis_url:
-            _redis_client = sync_redis.from_url(redis_url, decode_responses=True)
-            _redis_client.ping()
-            logger.info("BruteForceProtection connected to Redis")
-            return _redis_client
-    except Exception as e:
-        logger.debug(f"Redis unavailable for BruteForceProtection: {e}")
-    return None
-
 
 def decode_access_token(token: str) -> dict:
-    """Декодирование access токена с audience/issuer validation"""
+    """Декодирование access токена с audience/issuer validation (через кеш проверенных токенов)"""
     try:
-        return jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-            audience="mentorhub",
-            issuer="mentorhub-api",
-            options={"require": ["aud", "iss", "exp"]},
-        )
+        return decode_verified(token)
     except jwt.ExpiredSignatureError:
         raise ValueError("Token expired") from None
     except jwt.InvalidTokenError:
@@ -65,9 +56,9 @@ def decode_access_token(token: str) -> dict:
 
 
 def get_password_hash(password: str) -> str:
-    """Хеширование пароля с использованием bcrypt"""
+    """Хеширование пароля с использованием bcrypt (стоимость BCRYPT_ROUNDS)"""
     password_bytes = password.encode("utf-8")[:72]
-    return bcrypt.hashpw(password_bytes, bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -82,6 +73,91 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def needs_rehash(hashed_password: str | None) -> bool:
+    """Хеш посчитан с другой стоимостью bcrypt, чем BCRYPT_ROUNDS ($2b$<rounds>$...)"""
+    if not hashed_password:
+        return False
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+class PasswordHasher:
+    """
+    bcrypt в отдельном ограниченном пуле потоков
+
+    Одна проверка пароля - 100-300 мс CPU; в async def она останавливает
+    event loop воркера целиком. Здесь bcrypt выполняется в workers потоках
+    (bcrypt отпускает GIL). В работе и в очереди не больше max_pending
+    операций: при всплеске логинов лишние получают 503, а не ждут в
+    растущей очереди.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Выполнить func(*args) в пуле; operation - метка метрик (hash, verify)"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                PASSWORD_HASH_REJECTED.inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Слишком много одновременных входов, повторите попытку",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            PASSWORD_HASH_IN_FLIGHT.set(self._pending)
+        queued_at = time.perf_counter()
+
+        def timed() -> Any:
+            started = time.perf_counter()
+            PASSWORD_HASH_QUEUE_WAIT.observe(started - queued_at)
+            try:
+                return func(*args)
+            finally:
+                PASSWORD_HASH_DURATION.labels(operation=operation).observe(time.perf_counter() - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), timed)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                PASSWORD_HASH_IN_FLIGHT.set(self._pending)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password_async(password: str) -> str:
+    """get_password_hash в пуле bcrypt (для async-эндпоинтов)"""
+    return await password_hasher.run("hash", get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password в пуле bcrypt (для async-эндпоинтов)"""
+    return await password_hasher.run("verify", verify_password, plain_password, hashed_password)
+
+
 class PasswordValidator:
     """Валидатор паролей с проверкой на надёжность"""
 
@@ -139,116 +215,208 @@ class PasswordValidator:
         return "".join(secrets.choice(PASSWORD_ALPHABET) for _ in range(length))
 
 
-class BruteForceProtection:
-    """Защита от brute-force атак — Redis-backed, multi-worker safe.
+# Неудачная попытка входа за один round trip. KEYS[1], KEYS[2] - счётчик и блокировка
+# аккаунта, KEYS[3] (необязательный) - счётчик неудач IP; ARGV[1] - окно и длительность
+# блокировки, ARGV[2] - лимит неудач аккаунта. Счётчики живут окно с первой неудачи.
+# Возвращает {оставшееся время блокировки аккаунта (отрицательное - блокировка
+# установлена этой попыткой, 0 - нет), число неудач IP за окно}
+RECORD_FAILURE_SCRIPT = """
+local duration = tonumber(ARGV[1])
+local locked = redis.call("ttl", KEYS[2])
+if locked <= 0 then
+    locked = 0
+    local count = redis.call("incr", KEYS[1])
+    if count == 1 then
+        redis.call("expire", KEYS[1], duration)
+    end
+    if count >= tonumber(ARGV[2]) then
+        redis.call("set", KEYS[2], "1", "EX", duration)
+        redis.call("del", KEYS[1])
+        locked = -duration
+    end
+end
+local ip_failures = 0
+if KEYS[3] then
+    ip_failures = redis.call("incr", KEYS[3])
+    if ip_failures == 1 then
+        redis.call("expire", KEYS[3], duration)
+    end
+end
+return {locked, ip_failures}
+"""
+
+# Проверка перед входом: {оставшееся время блокировки аккаунта KEYS[1], число неудач IP KEYS[2]}
+CHECK_LOGIN_SCRIPT = """
+local locked = math.max(redis.call("ttl", KEYS[1]), 0)
+local ip_failures = 0
+if KEYS[2] then
+    ip_failures = tonumber(redis.call("get", KEYS[2]) or "0")
+end
+return {locked, ip_failures}
+"""
+
 
-    Falls back to in-memory when Redis is unavailable (single-worker only).
+class BruteForceProtection:
+    """
+    Защита от brute-force атак на вход
+
+    max_attempts неудач по аккаунту (email) блокируют его на lockout_duration
+    секунд. Неудачи с одного IP по любым аккаунтам не блокируют IP, а
+    замедляют вход с него: начиная с max_attempts_per_ip неудач за окно
+    каждая попытка ждёт throttle_step секунд за каждую лишнюю неудачу, но не
+    больше throttle_max_delay. За одним адресом (NAT, прокси) бывает много
+    пользователей, и блокировка IP закрыла бы вход им всем.
+
+    Счётчики хранятся в общем async-клиенте Redis (set_redis из lifespan):
+    инкремент, срок жизни и проверка блокировки выполняются одним Lua
+    скриптом, атомарно для всех воркеров. Без Redis или при его ошибке
+    используются счётчики в памяти воркера - не больше max_entries записей,
+    давно не использованные вытесняются.
     """
 
     def __init__(
         self,
         max_attempts: int = MAX_LOGIN_ATTEMPTS,
         lockout_duration: int = LOCKOUT_DURATION_SECONDS,
+        max_attempts_per_ip: int = MAX_LOGIN_ATTEMPTS_PER_IP,
+        throttle_step: float = LOGIN_THROTTLE_STEP,
+        throttle_max_delay: float = LOGIN_THROTTLE_MAX_DELAY,
+        max_entries: int = BRUTE_FORCE_MEMORY_MAX_ENTRIES,
     ):
         self.max_attempts = max_attempts
         self.lockout_duration = lockout_duration
-        # In-memory fallback (single-worker only)
-        self._attempts: dict[str, list] = {}
-        self._lockouts: dict[str, float] = {}
-
-    def record_failed_attempt(self, identifier: str):
-        """Записать неудачную попытку входа"""
-        r = _get_redis()
-        now = time.time()
-        key = f"bf:attempts:{identifier}"
-        lockout_key = f"bf:lockout:{identifier}"
-
-        if r:
-            try:
-                pipe = r.pipeline()
-                pipe.zadd(key, {str(now): now})
-                pipe.zremrangebyscore(key, 0, now - self.lockout_duration)
-                pipe.zcard(key)
-                pipe.expire(key, self.lockout_duration)
-                results = pipe.execute()
-                count = results[2]
-
-                if count >= self.max_attempts:
-                    r.setex(lockout_key, self.lockout_duration, str(now + self.lockout_duration))
-                    r.delete(key)
-                    logger.warning(f"Account locked (Redis): {identifier}")
-                return
-            except Exception as e:
-                logger.debug(f"Redis brute-force tracking failed, using memory: {e}")
-
-        # In-memory fallback
-        cutoff = now - self.lockout_duration
-        attempts = self._attempts.get(identifier, [])
-        attempts = [t for t in attempts if t > cutoff]
-        attempts.append(now)
-        self._attempts[identifier] = attempts
-
-        if len(attempts) >= self.max_attempts:
-            self._lockouts[identifier] = now + self.lockout_duration
-            logger.warning(f"Account locked (memory): {identifier}")
-
-    def is_locked(self, identifier: str) -> bool:
-        """Проверка блокировки"""
-        r = _get_redis()
-        lockout_key = f"bf:lockout:{identifier}"
-
-        if r:
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self.throttle_step = throttle_step
+        self.throttle_max_delay = throttle_max_delay
+        self.max_entries = max_entries
+        self.redis: Redis | None = None
+        # key -> [число неудач, конец окна, конец блокировки]
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+
+    def set_redis(self, redis_client: Redis | None) -> None:
+        """Общий async-клиент Redis воркера (None - только память)"""
+        self.redis = redis_client
+
+    def throttle_delay(self, ip_failures: int) -> float:
+        """Задержка входа в секундах для IP с ip_failures неудачами за окно"""
+        excess = ip_failures - self.max_attempts_per_ip + 1
+        return min(excess * self.throttle_step, self.throttle_max_delay) if excess > 0 else 0.0
+
+    # ==================== MEMORY FALLBACK ====================
+
+    def _memory_entry(self, key: str, now: float) -> list[float] | None:
+        entry = self._memory.get(key)
+        if entry is not None and entry[1] <= now and entry[2] <= now:
+            del self._memory[key]
+            return None
+        return entry
+
+    def _memory_remaining(self, key: str, now: float) -> int:
+        entry = self._memory_entry(key, now)
+        return int(entry[2] - now) + 1 if entry is not None and entry[2] > now else 0
+
+    def _memory_failures(self, key: str, now: float) -> int:
+        entry = self._memory_entry(key, now)
+        return int(entry[0]) if entry is not None else 0
+
+    def _memory_increment(self, key: str, now: float) -> list[float]:
+        entry = self._memory_entry(key, now)
+        if entry is None:
+            entry = self._memory[key] = [0, now + self.lockout_duration, 0]
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        self._memory.move_to_end(key)
+        entry[0] += 1
+        return entry
+
+    def _memory_record(self, identifier: str, ip: str | None, now: float) -> tuple[int, int]:
+        key = f"account:{identifier}"
+        locked = self._memory_remaining(key, now)
+        if not locked:
+            entry = self._memory_increment(key, now)
+            if entry[0] >= self.max_attempts:
+                entry[:] = [0, 0, now + self.lockout_duration]
+                locked = -self.lockout_duration
+        ip_failures = int(self._memory_increment(f"ip:{ip}", now)[0]) if ip else 0
+        return locked, ip_failures
+
+    # ==================== API ====================
+
+    async def check(self, identifier: str, ip: str | None = None) -> tuple[int | None, float]:
+        """
+        Проверка перед входом
+
+        Returns:
+            (оставшееся время блокировки аккаунта в секундах или None, задержка входа для IP в секундах)
+        """
+        result: list[int] | None = None
+        if self.redis is not None:
+            keys = [f"bf:lockout:account:{identifier}"] + ([f"bf:attempts:ip:{ip}"] if ip else [])
             try:
-                val = r.get(lockout_key)
-                return bool(val)
+                result = [int(value) for value in await self.redis.eval(CHECK_LOGIN_SCRIPT, len(keys), *keys)]
             except Exception as e:
                 logger.debug(f"Redis lockout check failed, using memory: {e}")
 
-        # In-memory fallback
-        lockout_until = self._lockouts.get(identifier)
-        if lockout_until is None:
-            return False
-        now = time.time()
-        if now < lockout_until:
-            return True
-        del self._lockouts[identifier]
-        self._attempts.pop(identifier, None)
-        return False
-
-    def get_lockout_time_remaining(self, identifier: str) -> int | None:
-        """Оставшееся время блокировки в секундах"""
-        r = _get_redis()
-        lockout_key = f"bf:lockout:{identifier}"
-
-        if r:
+        if result is None:
+            now = time.time()
+            result = [
+                self._memory_remaining(f"account:{identifier}", now),
+                self._memory_failures(f"ip:{ip}", now) if ip else 0,
+            ]
+        locked, ip_failures = result
+        return locked or None, self.throttle_delay(ip_failures)
+
+    async def record_failed_attempt(self, identifier: str, ip: str | None = None) -> int | None:
+        """
+        Записать неудачную попытку входа
+
+        Returns:
+            Время блокировки аккаунта в секундах, если он заблокирован, иначе None
+        """
+        result: list[int] | None = None
+        backend = "redis"
+        if self.redis is not None:
+            keys = [f"bf:attempts:account:{identifier}", f"bf:lockout:account:{identifier}"]
+            if ip:
+                keys.append(f"bf:attempts:ip:{ip}")
             try:
-                ttl = r.ttl(lockout_key)
-                if ttl > 0:
-                    return ttl
-                return None
+                result = [
+                    int(value)
+                    for value in await self.redis.eval(
+                        RECORD_FAILURE_SCRIPT, len(keys), *keys, self.lockout_duration, self.max_attempts
+                    )
+                ]
             except Exception as e:
-                logger.debug(f"Redis TTL check failed, using memory: {e}")
+                logger.debug(f"Redis brute-force tracking failed, using memory: {e}")
 
-        # In-memory fallback
-        lockout_until = self._lockouts.get(identifier)
-        if lockout_until is None:
-            return None
-        now = time.time()
-        if now < lockout_until:
-            return int(lockout_until - now)
-        return None
-
-    def reset_attempts(self, identifier: str):
-        """Сброс попыток"""
-        r = _get_redis()
-        if r:
+        if result is None:
+            backend = "memory"
+            result = list(self._memory_record(identifier, ip, time.time()))
+
+        locked, ip_failures = result
+        # Отрицательное значение - блокировка установлена этой попыткой
+        if locked < 0:
+            AUTH_LOCKOUTS.labels(scope="account", backend=backend).inc()
+            logger.warning(f"Login locked ({backend}): account:{identifier}")
+        if ip_failures == self.max_attempts_per_ip:
+            AUTH_LOCKOUTS.labels(scope="ip", backend=backend).inc()
+            logger.warning(f"Login throttled ({backend}): ip:{ip}")
+        return abs(locked) or None
+
+    async def reset_attempts(self, identifier: str) -> None:
+        """
+        Сброс неудач аккаунта после успешного входа
+
+        Счётчик IP не сбрасывается: иначе вход в свой аккаунт обнулял бы
+        перебор чужих с того же адреса.
+        """
+        key = f"account:{identifier}"
+        self._memory.pop(key, None)
+        if self.redis is not None:
             try:
-                r.delete(f"bf:attempts:{identifier}", f"bf:lockout:{identifier}")
-                return
+                await self.redis.delete(f"bf:attempts:{key}", f"bf:lockout:{key}")
             except Exception as e:
-                logger.debug(f"Redis reset attempts failed, using memory: {e}")
-        self._attempts.pop(identifier, None)
-        self._lockouts.pop(identifier, None)
+                logger.debug(f"Redis reset attempts failed: {e}")
 
 
 class SecureTokenManager:
@@ -0,0 +1,185 @@
+"""
+Журнал медленных SQL-запросов
+Запросы дольше порога сохраняются в кольцевой буфер воркера вместе с формой
+параметров, маршрутом, request id и (выборочно) планом выполнения
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.config import settings
+from app.utils.prometheus import SLOW_DB_QUERIES
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+# SELECT ... FOR UPDATE / SHARE: EXPLAIN ANALYZE снова заблокировал бы строки
+_ROW_LOCK = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Типы связанных параметров без значений (значения могут содержать персональные данные)"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0]) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: _value_type(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_type(value) for value in parameters]
+    return None
+
+
+def _value_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    """Запись о медленном запросе"""
+
+    timestamp: float
+    duration_ms: float
+    query_type: str
+    table: str
+    statement: str
+    parameters: Any
+    method: str | None
+    route: str | None
+    request_id: str | None
+    plan: list[str] | None = None
+
+
+class SlowQueryLog:
+    """
+    Кольцевой буфер медленных запросов
+
+    Для доли explain_sample_rate медленных SELECT тем же соединением
+    снимается план: PostgreSQL - EXPLAIN (ANALYZE, BUFFERS), SQLite -
+    EXPLAIN QUERY PLAN. ANALYZE повторно выполняет запрос, поэтому для
+    запросов дольше explain_analyze_max снимается план без ANALYZE.
+    Буфер у каждого воркера свой.
+    """
+
+    def __init__(self, threshold: float, explain_sample_rate: float, explain_analyze_max: float, size: int) -> None:
+        self.threshold = threshold
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_analyze_max = explain_analyze_max
+        self._entries: deque[SlowQuery] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(
+        self,
+        conn: Any,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration: float,
+        query_type: str,
+        table: str,
+        request: Any | None = None,
+        route: str | None = None,
+    ) -> SlowQuery:
+        """Сохранение медленного запроса; вызывается из after_cursor_execute"""
+        plan = None
+        if query_type == "select" and random.random() < self.explain_sample_rate:
+            plan = self.explain(conn, statement, parameters, duration)
+
+        entry = SlowQuery(
+            timestamp=time.time(),
+            duration_ms=round(duration * 1000, 2),
+            query_type=query_type,
+            table=table,
+            statement=statement,
+            parameters=parameter_shape(parameters, executemany),
+            method=request.method if request is not None else None,
+            route=route,
+            request_id=getattr(request.state, "request_id", None) if request is not None else None,
+            plan=plan,
+        )
+        with self._lock:
+            self._entries.append(entry)
+            self.total += 1
+        SLOW_DB_QUERIES.labels(query_type=query_type, table=table).inc()
+        logger.warning(
+            f"🐢 Slow query {entry.duration_ms:.0f} ms ({query_type} {table}) "
+            f"[{entry.request_id or 'N/A'}] {entry.method or ''} {route or ''}: {statement[:200]}"
+        )
+        return entry
+
+    def explain(self, conn: Any, statement: str, parameters: Any, duration: float) -> list[str] | None:
+        """План запроса на том же соединении (в той же транзакции); None при ошибке"""
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            # ANALYZE выполняет запрос повторно: только для быстрых SELECT без блокировок
+            analyze = duration <= self.explain_analyze_max and not _ROW_LOCK.search(statement)
+            options = "(ANALYZE, BUFFERS) " if analyze else ""
+            sql = f"EXPLAIN {options}{statement}"
+        elif dialect == "sqlite":
+            sql = f"EXPLAIN QUERY PLAN {statement}"
+        else:
+            return None
+
+        # Курсор DBAPI напрямую: события SQLAlchemy не срабатывают, EXPLAIN не попадает в метрики.
+        # Ошибка в PostgreSQL прерывает транзакцию, поэтому EXPLAIN выполняется в savepoint
+        cursor = conn.connection.cursor()
+        savepoint = dialect == "postgresql"
+        try:
+            if savepoint:
+                cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            cursor.execute(sql, parameters)
+            rows = cursor.fetchall()
+            if savepoint:
+                cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return [str(row[-1]) for row in rows]
+        except Exception as e:
+            logger.debug(f"EXPLAIN failed for slow query: {e}")
+            if savepoint:
+                try:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                except Exception:
+                    pass
+            return None
+        finally:
+            cursor.close()
+
+    def get_entries(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Последние медленные запросы, новые первыми"""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        return [asdict(entry) for entry in entries[:limit]]
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "explain_sample_rate": self.explain_sample_rate,
+            "buffer_size": self._entries.maxlen,
+            "buffered": len(self._entries),
+            "total": self.total,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total = 0
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.SLOW_QUERY_THRESHOLD,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    explain_analyze_max=settings.SLOW_QUERY_EXPLAIN_ANALYZE_MAX,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+)
@@ -0,0 +1,208 @@
+"""
+Инструментирование SQL-запросов
+Хуки SQLAlchemy before/after_cursor_execute: метрики запросов к БД по типу и
+таблице, статистика запросов за HTTP-запрос (по шаблону маршрута) и поиск N+1
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from fastapi import Request, Response
+from sqlalchemy import Engine, event
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import is_production, settings
+from app.utils.prometheus import DB_QUERY_ISSUES, record_database_query, record_request_queries
+from app.utils.slow_query_log import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+(?:ONLY\s+)?[\"`\[]?(?P<table>\w+)", re.IGNORECASE)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Изменение данных в WITH; FOR UPDATE - блокировка строк, а не запись
+_CTE_DML = re.compile(r"\b(for\s+)?(insert|update|delete)\b", re.IGNORECASE)
+
+# Длина SQL в логе о N+1
+N_PLUS_ONE_LOG_SQL_LENGTH = 200
+
+
+@lru_cache(maxsize=2048)
+def classify_statement(statement: str) -> tuple[str, str]:
+    """Тип запроса (select, insert, update, delete, other) и основная таблица"""
+    words = statement.split(None, 1)
+    keyword = words[0].lower() if words else ""
+    if keyword == "with":
+        # WITH с INSERT/UPDATE/DELETE изменяет данные и считается записью
+        dml = next((m.group(2).lower() for m in _CTE_DML.finditer(statement) if not m.group(1)), None)
+        keyword = dml or "select"
+    elif keyword not in ("select", "insert", "update", "delete"):
+        return "other", "none"
+    match = _TABLE.search(statement)
+    return keyword, match.group("table").lower() if match else "none"
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """SQL без литералов и списков IN: почти одинаковые запросы дают одну строку"""
+    normalized = _LITERALS.sub("?", statement)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass(slots=True)
+class RequestQueryStats:
+    """Запросы к БД за один HTTP-запрос"""
+
+    request: Request | None = None
+    count: int = 0
+    duration: float = 0.0
+    tables: Counter[str] = field(default_factory=Counter)
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, query_type: str, table: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.tables[table] += 1
+        if query_type == "select":
+            self.statements[normalize_statement(statement)] += 1
+
+    def n_plus_one(self, threshold: int) -> list[tuple[str, int]]:
+        """SELECT, повторённые threshold и более раз (типичный N+1 при ленивой загрузке)"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# Статистика текущего HTTP-запроса; вне запроса (Celery, скрипты) - None.
+# Объект изменяемый: задачи и потоки, куда копируется контекст, пишут в него же
+_request_stats: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+def get_request_query_stats() -> RequestQueryStats | None:
+    """Статистика запросов к БД текущего HTTP-запроса"""
+    return _request_stats.get()
+
+
+# ==================== SQLALCHEMY HOOKS ====================
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_start_time")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    query_type, table = classify_statement(statement)
+    record_database_query(query_type, table, duration)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, query_type, table, duration)
+
+    if duration >= slow_query_log.threshold:
+        request = stats.request if stats is not None else None
+        slow_query_log.record(
+            conn,
+            statement,
+            parameters,
+            executemany,
+            duration,
+            query_type,
+            table,
+            request=request,
+            route=route_template(request) if request is not None else None,
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Запрос с ошибкой не доходит до after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+# ==================== MIDDLEWARE ====================
+
+
+def route_template(request: Request) -> str:
+    """
+    Шаблон маршрута (/api/v1/users/{user_id}); несовпавшие пути - одной меткой
+
+    scope["route"] содержит путь без префикса include_router, поэтому
+    шаблон собирается из пути запроса и path_params найденного маршрута.
+    """
+    if request.scope.get("route") is None:
+        return "unmatched"
+    params = {str(value): name for name, value in request.scope.get("path_params", {}).items()}
+    return "/".join(f"{{{params[part]}}}" if part in params else part for part in request.url.path.split("/"))
+
+
+class SQLInstrumentationMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware для учёта запросов к БД за HTTP-запрос
+
+    Пишет в Prometheus число и время запросов по шаблону маршрута, отмечает
+    N+1 и превышение бюджета запросов. Вне production добавляет заголовки
+    X-DB-Query-Count, X-DB-Query-Budget, X-DB-Query-Time и X-DB-N-Plus-One.
+    Запросы, выполненные при отдаче StreamingResponse, не учитываются.
+    """
+
+    def __init__(self, app, budget: int | None = None, n_plus_one_threshold: int | None = None):
+        super().__init__(app)
+        self.budget = budget or settings.DB_QUERY_BUDGET
+        self.n_plus_one_threshold = n_plus_one_threshold or settings.DB_N_PLUS_ONE_THRESHOLD
+        self.expose_headers = not is_production()
+
+    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        if request.url.path in ("/health", "/metrics"):
+            return await call_next(request)
+
+        stats = RequestQueryStats(request=request)
+        token = _request_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _request_stats.reset(token)
+
+        method = request.method
+        endpoint = route_template(request)
+        record_request_queries(method, endpoint, stats.count, stats.duration)
+
+        repeated = stats.n_plus_one(self.n_plus_one_threshold)
+        if repeated:
+            DB_QUERY_ISSUES.labels(method=method, endpoint=endpoint, issue="n_plus_one").inc()
+            sql, times = repeated[0]
+            logger.warning(
+                f"🔁 Possible N+1: {method} {endpoint} ran the same SELECT {times} times: "
+                f"{sql[:N_PLUS_ONE_LOG_SQL_LENGTH]}"
+            )
+        if stats.count > self.budget:
+            DB_QUERY_ISSUES.labels(method=method, endpoint=endpoint, issue="budget_exceeded").inc()
+            logger.warning(
+                f"📊 Query budget exceeded: {method} {endpoint} ran {stats.count} queries "
+                f"(budget {self.budget}, {stats.duration * 1000:.1f} ms), "
+                f"top tables: {dict(stats.tables.most_common(3))}"
+            )
+
+        if self.expose_headers:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Query-Budget"] = str(self.budget)
+            response.headers["X-DB-Query-Time"] = f"{stats.duration * 1000:.2f}"
+            if repeated:
+                response.headers["X-DB-N-Plus-One"] = str(repeated[0][1])
+
+        return response
@@ -0,0 +1,139 @@
+"""
+Защита кеша от stampede
+Объединение одновременных вычислений одного ключа (single-flight)
+и вероятностное досрочное обновление (XFetch)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeGuard, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Маркер конверта, в котором декораторы хранят результат вместе с метаданными
+ENVELOPE_MARKER = "_cache_envelope"
+
+
+class SingleFlight:
+    """
+    Объединение одновременных вызовов с одинаковым ключом.
+
+    Вычисление выполняет только первый вызов (лидер), остальные ждут его
+    результат. Исключение лидера получают все ожидающие; если лидер был
+    отменён, ожидающие повторяют попытку сами.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._inflight
+
+    def spawn(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Фоновое выполнение fn для ключа, если для него ещё ничего не выполняется
+
+        Returns:
+            True, если фоновая задача была запущена
+        """
+        if key in self._inflight:
+            return False
+        # Ключ регистрируется сразу, чтобы запросы до старта задачи её не дублировали
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        task = asyncio.create_task(self._lead(key, future, fn))
+        self._background.add(task)
+        task.add_done_callback(self._on_background_done)
+        return True
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background cache refresh failed: {task.exception()}")
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Выполнение fn для ключа с объединением одновременных вызовов"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    return await self.do(key, fn)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return await self._lead(key, future, fn)
+
+    async def _lead(self, key: str, future: asyncio.Future, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Помечаем исключение как полученное, если ожидающих не было
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+
+def should_refresh_early(delta: float, expires_at: float, beta: float, now: float | None = None) -> bool:
+    """
+    Вероятностное досрочное обновление (XFetch).
+
+    Чем ближе истечение и чем дольше вычисление (delta), тем выше шанс, что
+    конкретный запрос обновит значение заранее - истечения "размазываются"
+    по времени вместо одновременного промаха у всех.
+
+    Args:
+        delta: Время вычисления значения в секундах
+        expires_at: Unix timestamp истечения
+        beta: Коэффициент агрессивности (0 - выключено, 1 - рекомендуемое значение)
+        now: Текущее время (для тестов)
+    """
+    if beta <= 0:
+        return False
+    now = time.time() if now is None else now
+    return now - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def make_envelope(value: Any, delta: float, ttl: int) -> dict[str, Any]:
+    """
+    Упаковка результата с временем вычисления и моментом истечения
+
+    expires_at - мягкое истечение (ttl); жёсткое истечение задаётся TTL
+    записи в хранилище и при stale-while-revalidate равно ttl + stale_ttl.
+    """
+    return {ENVELOPE_MARKER: 1, "value": value, "delta": delta, "expires_at": time.time() + ttl}
+
+
+def is_stale(envelope: dict[str, Any], now: float | None = None) -> bool:
+    """Проверка, что значение прошло мягкое истечение"""
+    now = time.time() if now is None else now
+    return now >= envelope["expires_at"]
+
+
+def is_envelope(data: Any) -> TypeGuard[dict[str, Any]]:
+    """Проверка, что значение из кеша записано декоратором"""
+    return isinstance(data, dict) and data.get(ENVELOPE_MARKER) == 1
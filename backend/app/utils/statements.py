@@ -0,0 +1,41 @@
+"""
+Заранее собранные запросы для горячих путей
+Поиск пользователя по токену и сущностей по id выполняется почти в каждом
+запросе. select() с bindparam собирается один раз при импорте, а его
+скомпилированная форма берётся из кеша компиляции SQLAlchemy, поэтому на
+вызов остаётся только выполнение (см. scripts/benchmark_statements.py)
+"""
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.mentor import Mentor
+from app.models.session import Session as SessionModel
+from app.models.user import User
+
+USER_BY_ID = select(User).where(User.id == bindparam("id"))
+MENTOR_BY_ID = select(Mentor).where(Mentor.id == bindparam("id"))
+MENTOR_ID_BY_USER_ID = select(Mentor.id).where(Mentor.user_id == bindparam("user_id"))
+SESSION_BY_ID = select(SessionModel).where(SessionModel.id == bindparam("id"))
+
+
+def get_user_by_id(db: Session, user_id: int) -> User | None:
+    return db.scalar(USER_BY_ID, {"id": user_id})
+
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> User | None:
+    return await db.scalar(USER_BY_ID, {"id": user_id})
+
+
+def get_mentor_by_id(db: Session, mentor_id: int) -> Mentor | None:
+    return db.scalar(MENTOR_BY_ID, {"id": mentor_id})
+
+
+def get_mentor_id_by_user_id(db: Session, user_id: int) -> int | None:
+    """id профиля ментора пользователя (без загрузки самого профиля)"""
+    return db.scalar(MENTOR_ID_BY_USER_ID, {"user_id": user_id})
+
+
+def get_session_by_id(db: Session, session_id: int) -> SessionModel | None:
+    return db.scalar(SESSION_BY_ID, {"id": session_id})
@@ -0,0 +1,98 @@
+"""
+Кеш проверенных JWT
+Полная проверка токена (HMAC-подпись, aud, iss, exp) выполняется один раз;
+проверенный payload хранится до exp в LRU по SHA-256 от токена (сам токен в
+памяти не хранится). Общий для HTTP (verify_token) и WebSocket
+(decode_access_token)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import jwt
+
+from app.config import settings
+from app.utils.prometheus import AUTH_TOKEN_CACHE
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """
+    LRU проверенных access токенов
+
+    Запись живёт до exp токена, после чего считается промахом: повторная
+    проверка выдаст ExpiredSignatureError, как и без кеша. При переполнении
+    вытесняются давно не использованные токены. max_entries=0 отключает кеш.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        # verify_token выполняется и в пуле потоков (синхронные зависимости)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        if not self.max_entries:
+            return None
+        key = _token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        AUTH_TOKEN_CACHE.labels(result="miss" if entry is None else "hit").inc()
+        # Копия: вызывающий код не должен менять закешированный payload
+        return None if entry is None else dict(entry[1])
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        if not self.max_entries or "exp" not in payload:
+            return
+        key = _token_key(token)
+        with self._lock:
+            self._entries[key] = (float(payload["exp"]), dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+
+
+def decode_verified(token: str) -> dict[str, Any]:
+    """
+    Payload access токена: из кеша или после полной проверки jwt.decode
+
+    Raises:
+        jwt.ExpiredSignatureError, jwt.InvalidTokenError: как jwt.decode
+    """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[settings.ALGORITHM],
+        audience="mentorhub",
+        issuer="mentorhub-api",
+        options={"require": ["aud", "iss", "exp"]},
+    )
+    token_cache.put(token, payload)
+    return payload
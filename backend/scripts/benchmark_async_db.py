@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк синхронной и асинхронной работы с БД в эндпоинтах
+
+Один и тот же запрос (страница менторов с пользователями, как в
+/mentors/search) выполняется тремя способами:
+
+- sync-in-async: синхронная сессия внутри async def (блокирует event loop)
+- threadpool: синхронная сессия в def-эндпоинте (пул потоков FastAPI)
+- async: AsyncSession (aiosqlite / asyncpg), event loop не блокируется
+
+Задержка сети до БД имитируется функцией SQLite db_latency(), которая
+спит --latency миллисекунд на каждый запрос.
+
+Concurrency выше размера пула (DB_POOL_SIZE + DB_MAX_OVERFLOW) вариант
+sync-in-async не переживает: ожидание соединения из пула блокирует event
+loop, и соединения не возвращаются до pool_timeout.
+
+Использование:
+    python scripts/benchmark_async_db.py --requests 300 --concurrency 10 --latency 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Добавляем backend в PYTHONPATH
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+_db_file = Path(tempfile.mkdtemp()) / "benchmark_async_db.sqlite"
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import event, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+
+from app.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.dependencies import get_async_db, get_db  # noqa: E402
+from app.models import Mentor, User  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+
+LATENCY_MS = 5.0
+
+
+def _register_latency(dbapi_conn, connection_record) -> None:
+    dbapi_conn.create_function("db_latency", 0, lambda: time.sleep(LATENCY_MS / 1000) or 0)
+
+
+def seed(mentors: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        for i in range(1, mentors + 1):
+            user = User(
+                email=f"mentor{i}@example.com",
+                username=f"mentor_{i}",
+                full_name=f"Ментор {i}",
+                hashed_password="x",
+                role=UserRole.MENTOR,
+            )
+            db.add(user)
+            db.flush()
+            db.add(Mentor(user_id=user.id, specialization="Python", rating=(i % 50) / 10, experience_years=i % 15))
+        db.commit()
+
+
+def page_query():
+    return (
+        select(Mentor)
+        .options(joinedload(Mentor.user))
+        .where(Mentor.rating > 0)
+        .order_by(Mentor.rating.desc())
+        .limit(20)
+    )
+
+
+def serialize(mentors) -> list[dict]:
+    return [{"id": m.id, "rating": m.rating, "username": m.user.username} for m in mentors]
+
+
+app = FastAPI()
+
+
+@app.get("/sync-in-async")
+async def sync_in_async(db: Session = Depends(get_db)):
+    db.execute(select(func.db_latency()))
+    return serialize(db.scalars(page_query()).all())
+
+
+@app.get("/threadpool")
+def threadpool(db: Session = Depends(get_db)):
+    db.execute(select(func.db_latency()))
+    return serialize(db.scalars(page_query()).all())
+
+
+@app.get("/async")
+async def async_endpoint(db: AsyncSession = Depends(get_async_db)):
+    await db.execute(select(func.db_latency()))
+    return serialize((await db.scalars(page_query())).all())
+
+
+async def run(path: str, total: int, concurrency: int) -> tuple[float, float, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # прогрев пула соединений
+
+        async def one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    return total / elapsed, statistics.median(samples) * 1000, p95 * 1000
+
+
+async def main() -> None:
+    global LATENCY_MS
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async database access in endpoints")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=5.0, help="Имитируемая задержка БД, мс")
+    parser.add_argument("--mentors", type=int, default=200)
+    args = parser.parse_args()
+    LATENCY_MS = args.latency
+
+    event.listen(engine, "connect", _register_latency)
+    event.listen(async_engine.sync_engine, "connect", _register_latency)
+    seed(args.mentors)
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"simulated latency {args.latency} ms, pool capacity {getattr(engine.pool, 'capacity', 'unlimited')}"
+    )
+    print(f"{'variant':<16}{'req/s':>10}{'p50, ms':>10}{'p95, ms':>10}")
+    for path in ("/sync-in-async", "/threadpool", "/async"):
+        rps, p50, p95 = await run(path, args.requests, args.concurrency)
+        print(f"{path.lstrip('/'):<16}{rps:>10.1f}{p50:>10.1f}{p95:>10.1f}")
+
+    await async_engine.dispose()
+    engine.dispose()
+    _db_file.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
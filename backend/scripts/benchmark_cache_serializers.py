@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сериализаторов кеша
+
+Сравнивает размер и время кодирования/декодирования значений кеша для
+реальных схем ответов: CourseWithLessonsResponse и
+PaginatedResponse[MentorResponse].
+
+Использование:
+    python scripts/benchmark_cache_serializers.py --iterations 2000 --lessons 40 --page-size 20
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+# Добавляем backend в PYTHONPATH
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.common import PaginatedResponse  # noqa: E402
+from app.schemas.course import CourseWithLessonsResponse, LessonResponse  # noqa: E402
+from app.schemas.mentor import MentorResponse  # noqa: E402
+from app.schemas.user import UserResponse  # noqa: E402
+from app.utils.cache_serializer import MSGPACK_AVAILABLE, ZSTD_AVAILABLE, CacheSerializer  # noqa: E402
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+LOREM = (
+    "Практический курс по разработке backend-сервисов: проектирование API, работа с базой данных, "
+    "кеширование, очереди задач и мониторинг в production. "
+)
+
+
+def make_user(user_id: int) -> UserResponse:
+    return UserResponse(
+        id=user_id,
+        email=f"mentor{user_id}@example.com",
+        username=f"mentor_{user_id}",
+        full_name=f"Ментор Номер {user_id}",
+        role="mentor",
+        is_active=True,
+        is_verified=True,
+        avatar_url=f"https://cdn.example.com/avatars/{user_id}.png",
+        created_at=NOW - timedelta(days=user_id),
+        updated_at=NOW,
+    )
+
+
+def make_mentor(mentor_id: int) -> MentorResponse:
+    return MentorResponse(
+        id=mentor_id,
+        user_id=mentor_id,
+        bio=LOREM * 2,
+        specialization="Python, FastAPI, PostgreSQL",
+        experience_years=mentor_id % 15,
+        hourly_rate=250000,
+        is_available=True,
+        rating=4.5 + (mentor_id % 5) / 10,
+        total_sessions=mentor_id * 7,
+        created_at=NOW - timedelta(days=mentor_id),
+        updated_at=NOW,
+        user=make_user(mentor_id),
+    )
+
+
+def make_course(lessons: int) -> CourseWithLessonsResponse:
+    return CourseWithLessonsResponse(
+        id=1,
+        title="Backend-разработка на Python",
+        description=LOREM * 4,
+        category="programming",
+        difficulty="intermediate",
+        duration_hours=40,
+        price=1500000,
+        is_active=True,
+        thumbnail_url="https://cdn.example.com/courses/1.png",
+        instructor_id=1,
+        rating=4.8,
+        total_reviews=120,
+        created_at=NOW,
+        updated_at=NOW,
+        instructor=make_mentor(1),
+        lessons=[
+            LessonResponse(
+                id=i,
+                course_id=1,
+                title=f"Урок {i}: тема занятия",
+                description=LOREM,
+                content=LOREM * 6,
+                video_url=f"https://cdn.example.com/videos/{i}.mp4",
+                duration_minutes=45,
+                order=i,
+                is_preview=i == 1,
+                created_at=NOW,
+                updated_at=NOW,
+            )
+            for i in range(1, lessons + 1)
+        ],
+    )
+
+
+def make_mentors_page(page_size: int) -> PaginatedResponse[MentorResponse]:
+    mentors = [make_mentor(i) for i in range(1, page_size + 1)]
+    return PaginatedResponse[MentorResponse].create(mentors, 500, 1, page_size)
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> float:
+    """Медианное время одного вызова в микросекундах"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1_000_000
+
+
+def serializers() -> dict[str, CacheSerializer]:
+    variants = {
+        "orjson": CacheSerializer(codec="orjson", compression="none"),
+        "orjson+zlib": CacheSerializer(codec="orjson", compression="zlib"),
+    }
+    if ZSTD_AVAILABLE:
+        variants["orjson+zstd"] = CacheSerializer(codec="orjson", compression="zstd")
+    if MSGPACK_AVAILABLE:
+        variants["msgpack"] = CacheSerializer(codec="msgpack", compression="none")
+        variants["msgpack+zlib"] = CacheSerializer(codec="msgpack", compression="zlib")
+    return variants
+
+
+def run(name: str, model: Any, response_model: Any, iterations: int) -> None:
+    adapter = TypeAdapter(response_model)
+    value = model.model_dump(mode="json")
+    rendered = adapter.dump_json(model, by_alias=True).decode()
+
+    rows: list[tuple[str, int, float, float]] = []
+
+    # Исходный вариант: json.dumps dict'а и повторная валидация схемой ответа при попадании
+    legacy = json.dumps(value)
+    rows.append((
+        "json (legacy) + validate",
+        len(legacy.encode()),
+        measure(lambda: json.dumps(model.model_dump(mode="json")), iterations),
+        measure(lambda: adapter.validate_python(json.loads(legacy)), iterations),
+    ))
+
+    for label, serializer in serializers().items():
+        data = serializer.dumps(value)
+        rows.append((
+            f"{label} (dict)",
+            len(data),
+            measure(lambda s=serializer: s.dumps(model.model_dump(mode="json")), iterations),
+            measure(lambda s=serializer, d=data: s.loads(d), iterations),
+        ))
+
+    # Вариант @cached(response_model=...): в кеше готовый JSON ответа, при попадании без валидации
+    for label in ("orjson", "orjson+zlib"):
+        serializer = serializers()[label]
+        data = serializer.dumps(rendered)
+        rows.append((
+            f"{label} (rendered)",
+            len(data),
+            measure(lambda s=serializer: s.dumps(adapter.dump_json(model, by_alias=True).decode()), iterations),
+            measure(lambda s=serializer, d=data: s.loads(d), iterations),
+        ))
+
+    print(f"\n{name} (JSON: {len(rendered.encode())} bytes, {iterations} iterations)")
+    print(f"{'variant':<28}{'size, B':>10}{'encode, µs':>14}{'decode, µs':>14}")
+    for label, size, encode_us, decode_us in rows:
+        print(f"{label:<28}{size:>10}{encode_us:>14.1f}{decode_us:>14.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cache serializers on real response schemas")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--lessons", type=int, default=40, help="Количество уроков в курсе")
+    parser.add_argument("--page-size", type=int, default=20, help="Размер страницы менторов")
+    args = parser.parse_args()
+
+    run("CourseWithLessonsResponse", make_course(args.lessons), CourseWithLessonsResponse, args.iterations)
+    run(
+        "PaginatedResponse[MentorResponse]",
+        make_mentors_page(args.page_size),
+        PaginatedResponse[MentorResponse],
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк входа под нагрузкой: bcrypt в event loop и в пуле потоков
+
+Параллельные логины (проверка пароля bcrypt) идут вместе с лёгкими
+запросами /ping - «остальным трафиком» воркера. Два варианта:
+
+- inline: verify_password прямо в async def (как было в /auth/login),
+  event loop стоит всё время хеширования
+- pool: verify_password_async, bcrypt в ограниченном пуле потоков
+  (PASSWORD_HASH_WORKERS), event loop свободен
+
+Для /ping выводятся число обслуженных запросов и p50/p95: во
+inline-варианте event loop занят bcrypt, и /ping почти не обслуживается.
+
+Использование:
+    python scripts/benchmark_password_hashing.py --logins 40 --concurrency 8 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем backend в PYTHONPATH
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import bcrypt  # noqa: E402
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.utils.security import verify_password, verify_password_async  # noqa: E402
+
+PASSWORD = "SecurePass123!"
+HASHED = ""
+
+app = FastAPI()
+
+
+@app.post("/inline")
+async def login_inline():
+    return {"valid": verify_password(PASSWORD, HASHED)}
+
+
+@app.post("/pool")
+async def login_pool():
+    return {"valid": await verify_password_async(PASSWORD, HASHED)}
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+def percentile(samples: list[float], share: float) -> float:
+    samples = sorted(samples)
+    return samples[max(int(len(samples) * share) - 1, 0)] * 1000
+
+
+async def run(path: str, logins: int, concurrency: int) -> tuple[float, int, float, float, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    pings: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post(path)
+                response.raise_for_status()
+
+        async def ping_loop(done: asyncio.Event) -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/ping")
+                pings.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        done = asyncio.Event()
+        pinger = asyncio.create_task(ping_loop(done))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await pinger
+
+    return logins / elapsed, len(pings), statistics.median(pings) * 1000, percentile(pings, 0.95), max(pings) * 1000
+
+
+async def main() -> None:
+    global HASHED
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt on the event loop vs in a bounded thread pool")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=12, help="Стоимость bcrypt")
+    args = parser.parse_args()
+
+    HASHED = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=args.rounds)).decode()
+    started = time.perf_counter()
+    verify_password(PASSWORD, HASHED)
+    one = (time.perf_counter() - started) * 1000
+
+    print(
+        f"{args.logins} logins, concurrency {args.concurrency}, bcrypt rounds {args.rounds} "
+        f"({one:.0f} ms per check), pool {settings.PASSWORD_HASH_WORKERS} threads"
+    )
+    print(f"{'variant':<10}{'logins/s':>10}{'pings':>8}{'ping p50':>10}{'ping p95':>10}{'ping max':>10}")
+    for path in ("/inline", "/pool"):
+        rate, served, p50, p95, worst = await run(path, args.logins, args.concurrency)
+        print(f"{path.lstrip('/'):<10}{rate:>10.1f}{served:>8}{p50:>10.1f}{p95:>10.1f}{worst:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк rate limiter: Redis на каждый запрос и гибридный режим
+
+Несколько «воркеров» (отдельные экземпляры limiter) делят один Redis и
+поочерёдно проверяют один и тот же ключ клиента:
+
+- redis: RateLimiter, один вызов Lua скрипта GCRA на каждую проверку
+- hybrid: HybridRateLimiter, локальная корзина и пакетная синхронизация
+  раз в --sync-interval или при исчерпании бюджета overshoot * limit
+
+Выводится время одной проверки и число пропущенных запросов: в
+гибридном режиме оно может превышать лимит не больше чем на
+workers * overshoot * limit.
+
+Требуется доступный Redis (REDIS_URL).
+
+Использование:
+    python scripts/benchmark_rate_limiter.py --requests 5000 --workers 4 --limit 1000 --overshoot 0.1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем backend в PYTHONPATH
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from redis.asyncio import Redis  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.middleware.rate_limiter_unified import create_rate_limiter  # noqa: E402
+
+KEY = "benchmark:client"
+
+
+async def run(redis: Redis, mode: str, args: argparse.Namespace) -> tuple[float, float, int]:
+    await redis.delete(f"rate_limit:{KEY}")
+    workers = [
+        create_rate_limiter(redis, mode, sync_interval=args.sync_interval, overshoot=args.overshoot)
+        for _ in range(args.workers)
+    ]
+    timings: list[float] = []
+    admitted = 0
+
+    for i in range(args.requests):
+        started = time.perf_counter()
+        result = await workers[i % args.workers].check(KEY, args.limit, 60)
+        timings.append(time.perf_counter() - started)
+        admitted += not result.limited
+
+    timings.sort()
+    return statistics.median(timings) * 1e6, timings[int(len(timings) * 0.99) - 1] * 1e6, admitted
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-request Redis vs hybrid rate limiting")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=1000, help="Запросов в минуту на клиента")
+    parser.add_argument("--sync-interval", type=float, default=settings.RATE_LIMIT_SYNC_INTERVAL)
+    parser.add_argument("--overshoot", type=float, default=settings.RATE_LIMIT_SYNC_OVERSHOOT)
+    args = parser.parse_args()
+
+    redis = Redis.from_url(settings.REDIS_URL)
+    try:
+        print(
+            f"{args.requests} checks, {args.workers} workers, limit {args.limit}/60s, "
+            f"overshoot {args.overshoot}, Redis {settings.REDIS_URL}"
+        )
+        print(f"{'mode':<8}{'p50 us':>10}{'p99 us':>10}{'admitted':>10}")
+        for mode in ("redis", "hybrid"):
+            p50, p99, admitted = await run(redis, mode, args)
+            print(f"{mode:<8}{p50:>10.1f}{p99:>10.1f}{admitted:>10}")
+    finally:
+        await redis.delete(f"rate_limit:{KEY}")
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк заранее собранных запросов (app/utils/statements.py)
+
+Поиск пользователя по id, как в get_current_user, выполняется четырьмя
+способами на SQLite в памяти, чтобы время выполнения самого запроса было
+минимальным и была видна накладная стоимость ORM:
+
+- query: db.query(User).filter(User.id == ...).first() (исходный вариант)
+- select: select(User).where(User.id == ...), собираемый на каждый вызов
+- prebuilt: USER_BY_ID с bindparam, собранный один раз при импорте
+- session.get: Session.get(User, id) для сравнения
+
+После каждого вызова identity map очищается, иначе повторная загрузка
+того же объекта обходится дешевле, чем в новой сессии запроса.
+
+Использование:
+    python scripts/benchmark_statements.py --iterations 5000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Добавляем backend в PYTHONPATH
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import User  # noqa: E402
+from app.utils.statements import USER_BY_ID, get_user_by_id  # noqa: E402
+
+WARMUP = 200
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> float:
+    """Медианное время одного вызова в микросекундах"""
+    for _ in range(WARMUP):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark prebuilt statements against per-call ORM queries")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = Session(engine)
+    user = User(email="bench@example.com", username="bench", hashed_password="x", full_name="Bench User")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    def lookup(fn: Callable[[], Any]) -> Callable[[], Any]:
+        def call() -> Any:
+            result = fn()
+            db.expunge_all()
+            return result
+        return call
+
+    variants: dict[str, tuple[Callable[[], Any], Callable[[], Any] | None]] = {
+        "query": (
+            lookup(lambda: db.query(User).filter(User.id == user_id).first()),
+            lambda: db.query(User).filter(User.id == user_id).statement._generate_cache_key(),
+        ),
+        "select": (
+            lookup(lambda: db.scalar(select(User).where(User.id == user_id))),
+            lambda: select(User).where(User.id == user_id)._generate_cache_key(),
+        ),
+        "prebuilt": (
+            lookup(lambda: get_user_by_id(db, user_id)),
+            lambda: USER_BY_ID._generate_cache_key(),
+        ),
+        "session.get": (lookup(lambda: db.get(User, user_id)), None),
+    }
+
+    print(f"User lookup by id ({args.iterations} iterations)")
+    print(f"{'variant':<14}{'call, µs':>12}{'build+key, µs':>16}")
+    baseline = None
+    for label, (call, build) in variants.items():
+        call_us = measure(call, args.iterations)
+        build_us = f"{measure(build, args.iterations):.1f}" if build else "-"
+        baseline = baseline or call_us
+        print(f"{label:<14}{call_us:>12.1f}{build_us:>16}   {call_us / baseline:.2f}x")
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ os.environ["RATE_LIMIT_REQUESTS"] = "10000"
 os.environ["RATE_LIMIT_PERIOD"] = "3600"
 os.environ["CORS_ORIGINS"] = '["http://localhost:3000"]'
 os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
+os.environ["BCRYPT_ROUNDS"] = "4"  # minimum bcrypt cost keeps password hashing fast in tests
 
 # Import and clear settings cache BEFORE importing app
 import importlib
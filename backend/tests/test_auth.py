@@ -3,11 +3,36 @@
 Тесты для эндпоинтов аутентификации
 """
 
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock
+
+import bcrypt
 import pytest
-from fastapi import status
+from fastapi import HTTPException, Request, status
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import event
 
+from app.config import settings
+from app.constants import LOCKOUT_DURATION_SECONDS, MAX_LOGIN_ATTEMPTS
 from app.models.user import User, UserRole
-from app.utils.security import get_password_hash
+from app.utils.auth_tokens import create_access_token
+from app.utils.cache import CacheManager
+from app.utils.client_ip import get_client_ip, parse_networks
+from app.utils.principal_cache import Principal, PrincipalCache, attach_user, principal_cache
+from app.utils.security import (
+    BruteForceProtection,
+    PasswordHasher,
+    brute_force_protection,
+    decode_access_token,
+    get_password_hash,
+    needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+from app.utils.token_cache import TokenCache, decode_verified, token_cache
 
 
 class TestRegistration:
@@ -215,3 +240,286 @@ class TestAuthIntegration:
             headers = {"Authorization": f"Bearer {token}"}
             response = client.get("/api/v1/users/me", headers=headers)
             assert response.status_code == status.HTTP_200_OK
+
+
+class TestPrincipalCache:
+    """Тесты кеша принципала в get_current_user"""
+
+    @pytest.fixture(autouse=True)
+    def enabled_cache(self, monkeypatch):
+        monkeypatch.setattr(principal_cache, "ttl", 30)
+        principal_cache.clear()
+        yield
+        principal_cache.clear()
+
+    def _hits(self) -> float:
+        return REGISTRY.get_sample_value("mentorhub_auth_principal_cache_total", {"result": "hit"}) or 0
+
+    def test_repeat_request_served_from_cache(self, sync_authenticated_client):
+        """Тест: второй запрос с тем же токеном берёт пользователя из кеша"""
+        client, headers = sync_authenticated_client
+        hits = self._hits()
+
+        for _ in range(2):
+            assert client.get("/api/v1/notifications/unread-count", headers=headers).status_code == status.HTTP_200_OK
+
+        assert self._hits() == hits + 1
+
+    def test_deactivation_invalidates(self, sync_authenticated_client, db_session):
+        """Тест: деактивация пользователя сразу сбрасывает закешированного принципала"""
+        client, headers = sync_authenticated_client
+        assert client.get("/api/v1/notifications/unread-count", headers=headers).status_code == status.HTTP_200_OK
+
+        user = db_session.query(User).order_by(User.id.desc()).first()
+        user.is_active = False
+        db_session.commit()
+
+        response = client.get("/api/v1/notifications/unread-count", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    async def test_invalidation_reaches_other_workers(self):
+        """Тест: сброс рассылается по каналу инвалидации кеша и сбрасывает запись в другом воркере"""
+        redis = AsyncMock()
+        worker_a, worker_b = CacheManager(redis_client=redis), CacheManager(redis_client=redis)
+        local, remote = PrincipalCache(ttl=30, max_bytes=1 << 20), PrincipalCache(ttl=30, max_bytes=1 << 20)
+        local.connect(worker_a)
+        remote.connect(worker_b)
+        user = User(id=7, email="remote@test.com", username="remote", hashed_password="x", role=UserRole.STUDENT)
+        remote.put(Principal.from_user(user, token_version=1))
+
+        local.invalidate(7)
+        await asyncio.sleep(0)
+
+        _, message = redis.publish.await_args.args
+        worker_a.apply_invalidation(message)
+        assert remote.get(7, 1) is not None
+        worker_b.apply_invalidation(message)
+        assert remote.get(7, 1) is None
+
+    async def test_commit_broadcasts_changed_user(self, db_session):
+        """Тест: изменение пользователя рассылается после commit, а не при flush"""
+        user = User(email="broadcast@test.com", username="broadcast", hashed_password="x", role=UserRole.STUDENT)
+        db_session.add(user)
+        db_session.commit()
+        redis = AsyncMock()
+        principal_cache.connect(CacheManager(redis_client=redis))
+        try:
+            user.is_active = False
+            db_session.flush()
+            await asyncio.sleep(0)
+            redis.publish.assert_not_awaited()
+
+            db_session.commit()
+            await asyncio.sleep(0)
+        finally:
+            principal_cache.disconnect()
+
+        _, message = redis.publish.await_args.args
+        assert '"kind": "principal"' in message and f'"target": {user.id}' in message
+
+    def test_cached_user_attached_without_query(self, db_session):
+        """Тест: пользователь из снимка присоединяется к сессии без SELECT"""
+        user = User(email="principal@test.com", username="principal", hashed_password="x", role=UserRole.MENTOR)
+        db_session.add(user)
+        db_session.commit()
+        principal = Principal.from_user(user, token_version=1)
+        db_session.expunge_all()
+
+        queries = []
+
+        def record(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        event.listen(db_session.bind, "before_cursor_execute", record)
+        try:
+            attached = attach_user(db_session, principal)
+            assert attached.email == "principal@test.com" and attached.role == UserRole.MENTOR
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", record)
+
+        assert queries == []
+        assert attached in db_session
+
+
+class TestTokenCache:
+    """Тесты кеша проверенных JWT"""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        token_cache.clear()
+        yield
+        token_cache.clear()
+
+    def _count(self, result: str) -> float:
+        return REGISTRY.get_sample_value("mentorhub_auth_token_cache_total", {"result": result}) or 0
+
+    def test_token_verified_once(self):
+        """Тест: повторная проверка токена берёт payload из кеша, HTTP и WebSocket пути общие"""
+        token = create_access_token({"sub": "1", "email": "cache@test.com", "role": "student"})
+        hits, misses = self._count("hit"), self._count("miss")
+
+        assert decode_access_token(token)["sub"] == "1"
+        assert decode_verified(token)["email"] == "cache@test.com"
+
+        assert (self._count("hit"), self._count("miss")) == (hits + 1, misses + 1)
+
+    def test_expired_and_evicted_entries_not_served(self):
+        """Тест: запись живёт до exp, при переполнении вытесняется самая старая"""
+        cache = TokenCache(max_entries=2)
+        cache.put("expired", {"sub": "1", "exp": time.time() - 1})
+        assert cache.get("expired") is None
+
+        for token in ("a", "b", "c"):
+            cache.put(token, {"sub": token, "exp": time.time() + 60})
+        assert cache.get("a") is None and len(cache) == 2
+        assert cache.get("b")["sub"] == "b" and cache.get("c")["sub"] == "c"
+
+
+class TestPasswordHashing:
+    """Тесты пула bcrypt и перехеширования при входе"""
+
+    async def test_verify_in_pool(self):
+        """Тест: проверка пароля в пуле даёт тот же результат, что и синхронная"""
+        hashed = get_password_hash("TestPass123!")
+        assert await verify_password_async("TestPass123!", hashed)
+        assert not await verify_password_async("WrongPass123!", hashed)
+
+    async def test_full_queue_rejected(self):
+        """Тест: при заполненной очереди пул сразу отвечает 503"""
+        hasher = PasswordHasher(workers=1, max_pending=1)
+        release = threading.Event()
+        try:
+            busy = asyncio.create_task(hasher.run("verify", release.wait, 5))
+            while hasher.pending == 0:
+                await asyncio.sleep(0.01)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.run("verify", verify_password, "x", "y")
+            assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert exc_info.value.headers["Retry-After"] == "1"
+
+            release.set()
+            assert await busy is True
+            assert hasher.pending == 0
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    def test_login_rehashes_outdated_cost(self, client, db_session, sample_user_data):
+        """Тест: хеш с другой стоимостью bcrypt заменяется при успешном входе"""
+        assert client.post("/api/v1/auth/register", json=sample_user_data).status_code == status.HTTP_201_CREATED
+        user = db_session.query(User).filter(User.email == sample_user_data["email"]).one()
+        old_rounds = 5 if settings.BCRYPT_ROUNDS != 5 else 6
+        user.hashed_password = bcrypt.hashpw(
+            sample_user_data["password"].encode("utf-8"), bcrypt.gensalt(rounds=old_rounds)
+        ).decode("utf-8")
+        db_session.commit()
+        assert needs_rehash(user.hashed_password)
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"email": sample_user_data["email"], "password": sample_user_data["password"]},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        db_session.refresh(user)
+        assert not needs_rehash(user.hashed_password)
+        assert verify_password(sample_user_data["password"], user.hashed_password)
+
+    @pytest.mark.parametrize("hashed_password", [None, "", "not-a-bcrypt-hash"])
+    def test_needs_rehash_ignores_missing_hash(self, hashed_password):
+        """Тест: пользователь без пароля (OAuth) или с чужим форматом хеша не перехешируется"""
+        assert needs_rehash(hashed_password) is False
+
+
+class TestBruteForceProtection:
+    """Тесты защиты от перебора паролей"""
+
+    async def test_account_lockout_and_ip_throttle(self):
+        """Тест: аккаунт блокируется, IP только замедляется; сброс только для аккаунта"""
+        protection = BruteForceProtection(
+            max_attempts=3, lockout_duration=60, max_attempts_per_ip=5, throttle_step=0.5, throttle_max_delay=1
+        )
+
+        assert await protection.record_failed_attempt("a@test.com", "10.0.0.1") is None
+        assert await protection.record_failed_attempt("a@test.com", "10.0.0.1") is None
+        assert await protection.record_failed_attempt("a@test.com", "10.0.0.1") == 60
+        assert await protection.check("a@test.com", "10.0.0.2") == (60, 0.0)
+        assert await protection.check("b@test.com", "10.0.0.1") == (None, 0.0)
+
+        await protection.record_failed_attempt("b@test.com", "10.0.0.1")
+        assert await protection.record_failed_attempt("c@test.com", "10.0.0.1") is None
+        assert await protection.check("d@test.com", "10.0.0.1") == (None, 0.5)
+        await protection.record_failed_attempt("c@test.com", "10.0.0.1")
+        await protection.record_failed_attempt("c@test.com", "10.0.0.1")
+        assert await protection.check("d@test.com", "10.0.0.1") == (None, 1)
+        assert await protection.check("d@test.com", "10.0.0.2") == (None, 0.0)
+
+        await protection.reset_attempts("a@test.com")
+        assert await protection.check("a@test.com", "10.0.0.2") == (None, 0.0)
+        assert await protection.check("a@test.com", "10.0.0.1") == (None, 1)
+
+    async def test_memory_counters_bounded(self):
+        """Тест: без Redis хранится не больше max_entries счётчиков"""
+        protection = BruteForceProtection(max_attempts=3, max_entries=10)
+        for i in range(50):
+            await protection.record_failed_attempt(f"user{i}@test.com")
+
+        assert len(protection._memory) == 10
+
+    def test_login_locked_after_failures(self, client, sample_user_data):
+        """Тест: после MAX_LOGIN_ATTEMPTS неудач вход блокируется с Retry-After"""
+        assert client.post("/api/v1/auth/register", json=sample_user_data).status_code == status.HTTP_201_CREATED
+        wrong = {"email": sample_user_data["email"], "password": "WrongPass123!"}
+
+        for _ in range(MAX_LOGIN_ATTEMPTS):
+            assert client.post("/api/v1/auth/login", json=wrong).status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"email": sample_user_data["email"], "password": sample_user_data["password"]},
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 0 < int(response.headers["Retry-After"]) <= LOCKOUT_DURATION_SECONDS
+
+    def test_login_through_proxy(self, client, sample_user_data, monkeypatch):
+        """Тест: за доверенным прокси счётчик IP ведётся по X-Forwarded-For, верный пароль проходит"""
+        monkeypatch.setattr(brute_force_protection, "max_attempts_per_ip", 2)
+        monkeypatch.setattr(brute_force_protection, "throttle_step", 0.01)
+        assert client.post("/api/v1/auth/register", json=sample_user_data).status_code == status.HTTP_201_CREATED
+        proxied = TestClient(client.app, client=("10.0.0.2", 50000))
+        attacker = {"X-Forwarded-For": "203.0.113.7, 10.0.0.3"}
+
+        for i in range(3):
+            response = proxied.post(
+                "/api/v1/auth/login",
+                json={"email": f"victim{i}_{sample_user_data['email']}", "password": "WrongPass123!"},
+                headers=attacker,
+            )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        assert brute_force_protection._memory_failures("ip:203.0.113.7", time.time()) == 3
+        assert brute_force_protection._memory_failures("ip:10.0.0.2", time.time()) == 0
+        assert brute_force_protection._memory_failures("ip:10.0.0.3", time.time()) == 0
+
+        credentials = {"email": sample_user_data["email"], "password": sample_user_data["password"]}
+        for headers in (attacker, {"X-Forwarded-For": "198.51.100.9"}):
+            response = proxied.post("/api/v1/auth/login", json=credentials, headers=headers)
+            assert response.status_code == status.HTTP_200_OK
+
+    def test_client_ip_trusts_only_proxies(self):
+        """Тест: X-Forwarded-For учитывается только от доверенного прокси, справа налево"""
+        networks = parse_networks(["10.0.0.0/8"])
+
+        def ip(peer: str, forwarded: str | None = None) -> str:
+            request = Request({
+                "type": "http",
+                "client": (peer, 1234),
+                "headers": [(b"x-forwarded-for", forwarded.encode())] if forwarded else [],
+            })
+            return get_client_ip(request, networks)
+
+        assert ip("203.0.113.7", "1.2.3.4") == "203.0.113.7"
+        assert ip("10.0.0.2", "1.2.3.4, 203.0.113.7") == "203.0.113.7"
+        assert ip("10.0.0.2", "203.0.113.7, 10.0.0.3") == "203.0.113.7"
+        assert ip("10.0.0.2") == "10.0.0.2"
@@ -3,9 +3,18 @@
 Тесты для системы кеширования
 """
 
+import asyncio
+from datetime import datetime, timezone
+
 import pytest
 
-from app.utils.cache import CACHE_TTL, CacheManager, cached, init_cache
+from app.utils import cache as cache_module
+from app.constants import CACHE_TAG_PREFIX
+from app.utils.cache import CACHE_TTL, CacheManager, cached, get_cache, init_cache
+from app.utils.cache_keys import CacheKeyBuilder, canonicalize
+from app.utils.cache_serializer import HEADER_MAGIC, CacheSerializer
+from app.utils.memory_cache import MISSING, MemoryCache
+from app.utils.stampede import SingleFlight, should_refresh_early
 
 
 class TestCacheManager:
@@ -16,7 +25,7 @@ class TestCacheManager:
         cache = CacheManager(redis_client=None)
 
         assert cache.use_redis is False
-        assert cache.memory_cache == {}
+        assert len(cache.memory_cache) == 0
         assert cache.stats["hits"] == 0
         assert cache.stats["misses"] == 0
 
@@ -97,6 +106,514 @@ class TestCacheManager:
 
         assert cache.stats["hits"] == 0
 
+    @pytest.mark.asyncio
+    async def test_get_cache_shares_initialized_manager(self):
+        """Тест что прямые вызовы и декораторы используют один менеджер"""
+        manager = init_cache(redis_client=None)
+
+        @cached(ttl=300, key_prefix="shared")
+        async def compute():
+            return {"value": 1}
+
+        await compute()
+        await get_cache().set("direct_key", "direct", ttl=60)
+
+        assert get_cache() is manager
+        assert await manager.get("direct_key") == "direct"
+        assert manager.stats["sets"] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_cache_falls_back_to_memory(self, monkeypatch):
+        """Тест что до init_cache создаётся менеджер только с памятью"""
+        monkeypatch.setattr(cache_module, "cache_manager", None)
+
+        cache = get_cache()
+
+        assert cache.use_redis is False
+        assert get_cache() is cache
+
+
+class TestMemoryCache:
+    """Тесты in-process LRU кеша"""
+
+    def test_lru_eviction_by_bytes(self):
+        """Тест вытеснения наименее используемых записей по бюджету байт"""
+        cache = MemoryCache(max_bytes=30)
+
+        cache.set("a", "A", ttl=300, size=10)
+        cache.set("b", "B", ttl=300, size=10)
+        cache.set("c", "C", ttl=300, size=10)
+        cache.get("a")  # "a" становится самым свежим
+        cache.set("d", "D", ttl=300, size=10)
+
+        assert "b" not in cache
+        assert cache.get("a") == "A"
+        assert cache.total_bytes == 30
+        assert cache.stats["evictions"] == 1
+
+    def test_oversized_value_not_stored(self):
+        """Тест что значение больше бюджета не сохраняется"""
+        cache = MemoryCache(max_bytes=10)
+
+        assert cache.set("big", "x", ttl=300, size=11) is False
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Тест истечения TTL записи"""
+        import app.utils.memory_cache as memory_cache_module
+
+        now = 1000.0
+        monkeypatch.setattr(memory_cache_module.time, "monotonic", lambda: now)
+        cache = MemoryCache(max_bytes=100)
+        cache.set("key", "value", ttl=10, size=5)
+
+        now = 1011.0
+        assert cache.get("key") is MISSING
+        assert cache.total_bytes == 0
+        assert cache.stats["expirations"] == 1
+
+    def test_purge_expired(self, monkeypatch):
+        """Тест фоновой очистки протухших записей"""
+        import app.utils.memory_cache as memory_cache_module
+
+        now = 1000.0
+        monkeypatch.setattr(memory_cache_module.time, "monotonic", lambda: now)
+        cache = MemoryCache(max_bytes=100)
+        cache.set("short", 1, ttl=5, size=5)
+        cache.set("long", 2, ttl=60, size=5)
+
+        now = 1010.0
+        assert cache.purge_expired() == 1
+        assert cache.keys() == ["long"]
+        assert cache.total_bytes == 5
+
+    def test_overwrite_updates_size(self):
+        """Тест что перезапись ключа не накапливает размер"""
+        cache = MemoryCache(max_bytes=100)
+
+        cache.set("key", "v1", ttl=300, size=10)
+        cache.set("key", "v2", ttl=300, size=20)
+
+        assert cache.total_bytes == 20
+        assert cache.get("key") == "v2"
+
+    def test_invalidate_tag(self):
+        """Тест инвалидации всех записей тега"""
+        cache = MemoryCache(max_bytes=100)
+
+        cache.set("course_detail:1", 1, ttl=300, size=5, tags=("course:1",))
+        cache.set("course_detail:1:lessons", 2, ttl=300, size=5, tags=("course:1",))
+        cache.set("course_detail:2", 3, ttl=300, size=5, tags=("course:2",))
+
+        assert cache.invalidate_tag("course:1") == 2
+        assert cache.keys() == ["course_detail:2"]
+        assert cache.total_bytes == 5
+
+    def test_tag_index_cleaned_on_delete(self):
+        """Тест что удаление и вытеснение записи убирают её из индекса тегов"""
+        cache = MemoryCache(max_bytes=10)
+
+        cache.set("a", 1, ttl=300, size=5, tags=("t",))
+        cache.delete("a")
+        cache.set("b", 2, ttl=300, size=10, tags=("t",))
+        cache.set("c", 3, ttl=300, size=10)  # вытесняет "b"
+
+        assert cache.get_stats()["tags"] == 0
+        assert cache.invalidate_tag("t") == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_manager_stats_include_memory(self):
+        """Тест что статистика менеджера включает счётчики in-process кеша"""
+        cache = CacheManager(redis_client=None)
+
+        await cache.set("key", {"data": 1}, ttl=300)
+        await cache.get("key")
+        await cache.get("missing")
+        stats = cache.get_stats()
+
+        assert stats["memory"]["hits"] == 1
+        assert stats["memory"]["misses"] == 1
+        assert stats["memory"]["items"] == 1
+        assert stats["cache_sizes"]["memory"] == stats["memory"]["bytes"] > 0
+
+
+class FakeAsyncRedis:
+    """Минимальная замена redis.asyncio.Redis для тестов near-cache"""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.published: list[tuple[str, str]] = []
+        self.tags: dict[str, set[str]] = {}
+        self.get_calls = 0
+
+    async def get(self, key):
+        self.get_calls += 1
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match="*", count=None):
+        prefix = match.replace("*", "")
+        for key in [k for k in self.data if k.startswith(prefix)]:
+            yield key
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def eval(self, script, numkeys, *args):
+        # Только INVALIDATE_TAGS_SCRIPT: удаление ключей из множеств тегов self.tags
+        removed = [key for tag_key in args[:numkeys] for key in self.tags.pop(tag_key, set())]
+        for key in removed:
+            self.data.pop(key, None)
+        return removed
+
+
+class TestNearCache:
+    """Тесты двухуровневого кеша (L1 в воркере + Redis)"""
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self):
+        """Тест что повторное чтение обслуживается из L1 без обращения к Redis"""
+        redis = FakeAsyncRedis()
+        cache = CacheManager(redis_client=redis, near_cache=True)
+
+        await cache.set("course_detail:1", {"id": 1}, ttl=300)
+        result = await cache.get("course_detail:1")
+
+        assert result == {"id": 1}
+        assert redis.get_calls == 0
+        assert cache.stats["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_l1_stores_deserialized_copy(self):
+        """Тест что L1 хранит значение в том виде, в каком его прочитал бы другой воркер из Redis"""
+        redis = FakeAsyncRedis()
+        cache = CacheManager(redis_client=redis, near_cache=True)
+        value = {"id": 1, "created_at": datetime(2026, 1, 2, tzinfo=timezone.utc), "tags": ["a"]}
+
+        await cache.set("course_detail:1", value, ttl=300)
+        value["tags"].append("b")
+        result = await cache.get("course_detail:1")
+
+        assert result == cache.serializer.loads(redis.data["course_detail:1"])
+        assert result["tags"] == ["a"]
+        assert redis.get_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_l1_populated_from_redis(self):
+        """Тест что промах L1 заполняет его значением из Redis"""
+        redis = FakeAsyncRedis()
+        redis.data["mentors_top_rated"] = '[{"id": 7}]'
+        cache = CacheManager(redis_client=redis, near_cache=True)
+
+        assert await cache.get("mentors_top_rated") == [{"id": 7}]
+        assert await cache.get("mentors_top_rated") == [{"id": 7}]
+        assert redis.get_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_publish_invalidation(self):
+        """Тест что изменения рассылаются другим воркерам"""
+        redis = FakeAsyncRedis()
+        cache = CacheManager(redis_client=redis, near_cache=True)
+
+        await cache.set("key", 1, ttl=300)
+        await cache.delete("key")
+        await cache.clear("courses_list:*")
+
+        assert len(redis.published) == 3
+        assert cache.stats["invalidations_sent"] == 3
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_evicts_l1(self):
+        """Тест что сообщение другого воркера сбрасывает L1, а собственное игнорируется"""
+        redis = FakeAsyncRedis()
+        worker_a = CacheManager(redis_client=redis, near_cache=True)
+        worker_b = CacheManager(redis_client=redis, near_cache=True)
+
+        await worker_b.set("course_detail:1", {"title": "old"}, ttl=300)
+        await worker_a.set("course_detail:1", {"title": "new"}, ttl=300)
+
+        _, message = redis.published[-1]
+        worker_a.apply_invalidation(message)
+        worker_b.apply_invalidation(message)
+
+        assert "course_detail:1" in worker_a.memory_cache
+        assert "course_detail:1" not in worker_b.memory_cache
+        assert await worker_b.get("course_detail:1") == {"title": "new"}
+
+    @pytest.mark.asyncio
+    async def test_clear_uses_scan(self):
+        """Тест очистки по паттерну через SCAN"""
+        redis = FakeAsyncRedis()
+        redis.data.update({"courses_list:a": "1", "courses_list:b": "2", "other": "3"})
+        cache = CacheManager(redis_client=redis)
+
+        await cache.clear("courses_list:*")
+
+        assert list(redis.data) == ["other"]
+
+    @pytest.mark.asyncio
+    async def test_remote_tag_invalidation_evicts_keys(self):
+        """Тест сообщения об инвалидации списка ключей (по тегу)"""
+        redis = FakeAsyncRedis()
+        worker = CacheManager(redis_client=redis, near_cache=True)
+        await worker.set("course_detail:1", 1, ttl=300)
+        await worker.set("course_detail:2", 2, ttl=300)
+
+        worker.apply_invalidation('{"origin": "other", "kind": "keys", "target": ["course_detail:1"]}')
+
+        assert "course_detail:1" not in worker.memory_cache
+        assert "course_detail:2" in worker.memory_cache
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_evicts_own_l1(self):
+        """Тест что инвалидация по тегу сбрасывает L1 своего воркера, заполненный из Redis без тегов"""
+        redis = FakeAsyncRedis()
+        redis.data["course_detail:5"] = '{"v": 1}'
+        redis.tags[f"{CACHE_TAG_PREFIX}course:5"] = {"course_detail:5"}
+        worker = CacheManager(redis_client=redis, near_cache=True)
+        assert await worker.get("course_detail:5") == {"v": 1}
+
+        assert await worker.invalidate_tags("course:5") == 1
+
+        assert "course_detail:5" not in worker.memory_cache
+        assert await worker.get("course_detail:5") is None
+
+    @pytest.mark.asyncio
+    async def test_near_cache_disabled_without_redis(self):
+        """Тест что near-cache не включается без Redis"""
+        cache = CacheManager(redis_client=None, near_cache=True)
+
+        assert cache.near_cache is False
+
+
+class TestCacheKeyBuilder:
+    """Тесты построения ключей кеша"""
+
+    @staticmethod
+    def _endpoint():
+        from fastapi import Depends, Query
+        from sqlalchemy.orm import Session
+
+        from app.dependencies import get_db, rate_limit_dependency
+        from app.models.user import User
+
+        def get_user():
+            return None
+
+        async def list_items(
+            item_id: int,
+            page: int = Query(1, ge=1),
+            tags: list[str] | None = Query(None),
+            db: Session = Depends(get_db),
+            rate_limit: bool = Depends(rate_limit_dependency),
+            current_user: User = Depends(get_user),
+        ):
+            return item_id
+
+        return list_items
+
+    def test_dependencies_excluded(self):
+        """Тест что сессия БД и rate limit не входят в ключ"""
+        from sqlalchemy.orm import Session
+
+        builder = CacheKeyBuilder(self._endpoint(), key_prefix="items")
+
+        key1 = builder.build((), {"item_id": 1, "page": 2, "tags": None, "db": Session(), "rate_limit": True})
+        key2 = builder.build((), {"item_id": 1, "page": 2, "tags": None, "db": Session(), "rate_limit": False})
+
+        assert builder.key_params == ["item_id", "page", "tags"]
+        assert key1 == key2
+        assert key1.startswith("items:list_items:")
+        assert len(key1) == len("items:list_items:") + 32
+
+    def test_positional_and_keyword_args_match(self):
+        """Тест что порядок и способ передачи аргументов не влияют на ключ"""
+        builder = CacheKeyBuilder(self._endpoint(), key_prefix="items")
+
+        assert builder.build((1, 2.0), {}) == builder.build((), {"page": 2, "item_id": 1})
+        assert builder.build((1,), {}) == builder.build((1, 1), {})
+        assert builder.build((1,), {}) != builder.build((2,), {})
+
+    def test_varies_on_user(self):
+        """Тест ключа по текущему пользователю и skip_auth"""
+        from app.models.user import User
+
+        builder = CacheKeyBuilder(self._endpoint(), key_prefix="items")
+        shared = CacheKeyBuilder(self._endpoint(), key_prefix="items", skip_auth=True)
+
+        assert builder.user_param == "current_user"
+        assert builder.build((1,), {"current_user": User(id=1)}) != builder.build((1,), {"current_user": User(id=2)})
+        assert shared.build((1,), {"current_user": User(id=1)}) == shared.build((1,), {"current_user": User(id=2)})
+
+    def test_key_from_raw_request_matches_call(self):
+        """Тест что ключ по строкам запроса совпадает с ключом вызова"""
+        from app.models.user import User
+
+        builder = CacheKeyBuilder(self._endpoint(), key_prefix="items")
+
+        from_call = builder.build((), {"item_id": 7, "page": 3, "tags": ["a", "b"], "current_user": User(id=5)})
+        key_data = builder.key_data_from_request({"item_id": "7"}, {"page": ["3"], "tags": ["a", "b"]}, user_id=5)
+
+        assert builder.key_for(key_data) == from_call
+
+    def test_key_from_raw_request_validates(self):
+        """Тест ошибки для невалидных и отсутствующих параметров"""
+        builder = CacheKeyBuilder(self._endpoint(), key_prefix="items")
+
+        with pytest.raises(ValueError):
+            builder.key_data_from_request({}, {})
+        with pytest.raises(ValueError):
+            builder.key_data_from_request({"item_id": "abc"}, {})
+
+    def test_canonicalize(self):
+        """Тест канонического представления значений"""
+        import enum
+        from datetime import date
+
+        class Color(enum.Enum):
+            RED = "red"
+
+        assert canonicalize(Color.RED) == "red"
+        assert canonicalize(4.0) == 4
+        assert canonicalize(date(2024, 1, 2)) == "2024-01-02"
+        assert canonicalize({"b", "a"}) == ["a", "b"]
+        assert canonicalize({"x": [1, {"y": 2.5}]}) == {"x": [1, {"y": 2.5}]}
+
+    @pytest.mark.asyncio
+    async def test_decorator_hits_across_sessions(self):
+        """Тест что кеш эндпоинта срабатывает для разных сессий БД"""
+        from fastapi import Depends
+        from sqlalchemy.orm import Session
+
+        from app.dependencies import get_db
+
+        init_cache(redis_client=None)
+        call_count = 0
+
+        @cached(ttl=300, key_prefix="sessions")
+        async def endpoint(course_id: int, db: Session = Depends(get_db)):
+            nonlocal call_count
+            call_count += 1
+            return {"id": course_id}
+
+        await endpoint(course_id=1, db=Session())
+        await endpoint(course_id=1, db=Session())
+
+        assert call_count == 1
+        assert endpoint.cache_key_builder.key_params == ["course_id"]
+
+
+class TestCacheSerializer:
+    """Тесты сериализации значений кеша"""
+
+    PAYLOAD = {"id": 1, "title": "Курс", "tags": ["python"], "price": 10.5, "nested": {"ok": True}}
+
+    @pytest.mark.parametrize("codec", ["orjson", "msgpack", "json"])
+    def test_roundtrip(self, codec):
+        """Тест сериализации и чтения для каждого кодека"""
+        serializer = CacheSerializer(codec=codec)
+
+        data = serializer.dumps(self.PAYLOAD)
+
+        assert data[0] == HEADER_MAGIC
+        assert serializer.loads(data) == self.PAYLOAD
+
+    def test_pydantic_and_datetime(self):
+        """Тест сериализации Pydantic-моделей и дат"""
+        from datetime import datetime, timezone
+
+        from pydantic import BaseModel
+
+        class Item(BaseModel):
+            id: int
+            created_at: datetime
+
+        created = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        for codec in ("orjson", "msgpack", "json"):
+            serializer = CacheSerializer(codec=codec)
+            result = serializer.loads(serializer.dumps({"item": Item(id=1, created_at=created), "at": created}))
+
+            assert result["item"]["id"] == 1
+            assert datetime.fromisoformat(result["item"]["created_at"]) == created
+            assert datetime.fromisoformat(result["at"]) == created
+
+    def test_compression_above_threshold(self):
+        """Тест что сжимаются только значения больше порога"""
+        serializer = CacheSerializer(compression="zlib", compress_threshold=100)
+
+        small = serializer.dumps("x" * 10)
+        large = serializer.dumps("x" * 10_000)
+
+        assert small[2] == 0
+        assert large[2] != 0
+        assert len(large) < 10_000
+        assert serializer.loads(large) == "x" * 10_000
+
+    def test_reads_values_written_with_other_settings(self):
+        """Тест чтения значений, записанных другим кодеком, и JSON старого формата"""
+        writer = CacheSerializer(codec="msgpack", compression="zlib", compress_threshold=0)
+        reader = CacheSerializer(codec="orjson", compression="none")
+
+        assert reader.loads(writer.dumps(self.PAYLOAD)) == self.PAYLOAD
+        assert reader.loads(b'{"legacy": 1}') == {"legacy": 1}
+
+    def test_unserializable_value_raises(self):
+        """Тест ошибки для объектов без сериализации (например, ORM)"""
+        with pytest.raises(TypeError):
+            CacheSerializer().dumps({"obj": object()})
+
+    @pytest.mark.asyncio
+    async def test_redis_stores_serialized_bytes(self):
+        """Тест что CacheManager пишет в Redis заголовок сериализатора"""
+        redis = FakeAsyncRedis()
+        cache = CacheManager(redis_client=redis, serializer=CacheSerializer(codec="msgpack"))
+
+        await cache.set("key", self.PAYLOAD, ttl=60)
+
+        assert redis.data["key"][0] == HEADER_MAGIC
+        assert await cache.get("key") == self.PAYLOAD
+
+    @pytest.mark.asyncio
+    async def test_decorator_renders_response_model(self):
+        """Тест кеширования готового JSON по схеме ответа"""
+        from fastapi import Response
+        from pydantic import BaseModel, ConfigDict
+
+        class ItemResponse(BaseModel):
+            model_config = ConfigDict(from_attributes=True)
+
+            id: int
+            title: str
+
+        class OrmItem:
+            def __init__(self, item_id):
+                self.id = item_id
+                self.title = f"item {item_id}"
+                self.hashed_secret = "hidden"
+
+        init_cache(redis_client=None)
+        call_count = 0
+
+        @cached(ttl=300, key_prefix="rendered", response_model=list[ItemResponse])
+        async def list_items(limit: int):
+            nonlocal call_count
+            call_count += 1
+            return [OrmItem(i) for i in range(limit)]
+
+        first = await list_items(2)
+        second = await list_items(2)
+
+        assert isinstance(first, Response)
+        assert first.body == second.body == b'[{"id":0,"title":"item 0"},{"id":1,"title":"item 1"}]'
+        assert call_count == 1
+
 
 class TestCachedDecorator:
     """Тесты декоратора кеширования"""
@@ -142,6 +659,284 @@ class TestCachedDecorator:
         assert call_count == 2  # Функция вызвана дважды для разных аргументов
 
 
+class TestStampedeProtection:
+    """Тесты защиты от cache stampede"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_coalesced(self):
+        """Тест что одновременные промахи вычисляются один раз"""
+        init_cache(redis_client=None)
+
+        call_count = 0
+
+        @cached(ttl=300, key_prefix="stampede")
+        async def heavy_query(value):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.05)
+            return value * 2
+
+        results = await asyncio.gather(*(heavy_query(21) for _ in range(10)))
+
+        assert results == [42] * 10
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight_propagates_errors(self):
+        """Тест что ошибку лидера получают все ожидающие, а ключ освобождается"""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_cached_none_with_cache_none(self):
+        """Тест что None кешируется при cache_none=True"""
+        init_cache(redis_client=None)
+
+        call_count = 0
+
+        @cached(ttl=300, key_prefix="none", cache_none=True)
+        async def maybe_missing(value):
+            nonlocal call_count
+            call_count += 1
+            return None
+
+        assert await maybe_missing(1) is None
+        assert await maybe_missing(1) is None
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, monkeypatch):
+        """Тест что после мягкого истечения отдаётся устаревшее значение и обновляется в фоне"""
+        import app.utils.stampede as stampede_module
+
+        now = 1000.0
+        monkeypatch.setattr(stampede_module.time, "time", lambda: now)
+        manager = init_cache(redis_client=None)
+
+        version = 0
+
+        @cached(ttl=10, key_prefix="swr", stale_ttl=60)
+        async def load():
+            nonlocal version
+            version += 1
+            return version
+
+        assert await load() == 1
+
+        now = 1011.0
+        assert await load() == 1  # устаревшее значение без ожидания пересчёта
+        assert await load() == 1  # повторный запрос не запускает второе обновление
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert await load() == 2
+        assert version == 2
+        assert manager.stats["stale_served"] == 2
+        assert manager.stats["background_refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_call_with_fresh_sessions(self):
+        """Тест что фоновое обновление получает собственную сессию БД"""
+        from sqlalchemy.orm import Session
+
+        from app.utils.cache import call_with_fresh_sessions
+
+        request_session = Session()
+        received = []
+
+        async def endpoint(limit, db):
+            received.append(db)
+            return limit
+
+        assert await call_with_fresh_sessions(endpoint, (5,), {"db": request_session}) == 5
+        assert isinstance(received[0], Session)
+        assert received[0] is not request_session
+
+    def test_should_refresh_early(self):
+        """Тест вероятностного досрочного обновления"""
+        now = 1000.0
+
+        assert should_refresh_early(delta=1.0, expires_at=now + 10, beta=0.0, now=now) is False
+        assert should_refresh_early(delta=0.001, expires_at=now + 3600, beta=1.0, now=now) is False
+        assert should_refresh_early(delta=1.0, expires_at=now - 1, beta=1.0, now=now) is True
+
+
+class TestTagInvalidation:
+    """Тесты инвалидации по тегам"""
+
+    @pytest.mark.asyncio
+    async def test_decorator_tags_from_arguments(self):
+        """Тест что шаблоны тегов заполняются аргументами и инвалидируются"""
+        from app.utils.cache import invalidate_tags
+
+        init_cache(redis_client=None)
+
+        call_count = 0
+
+        @cached(ttl=300, key_prefix="course_detail", tags=("course:{course_id}", "courses_list"))
+        async def get_course(course_id, lang="ru"):
+            nonlocal call_count
+            call_count += 1
+            return {"id": course_id}
+
+        await get_course(1)
+        await get_course(2)
+        await invalidate_tags("course:1")
+        await get_course(1)
+        await get_course(2)
+
+        assert call_count == 3
+
+
+class TestCacheWarmup:
+    """Тесты прогрева кеша"""
+
+    @pytest.fixture
+    def warmup_module(self, monkeypatch):
+        from sqlalchemy.orm import Session
+
+        from app.utils import cache_warmup
+
+        monkeypatch.setattr(cache_warmup, "SessionLocal", Session)
+        return cache_warmup
+
+    @pytest.mark.asyncio
+    async def test_warm_overwrites_cached_value(self):
+        """Тест что warm пересчитывает значение, даже если оно уже в кеше"""
+        init_cache(redis_client=None)
+
+        version = 0
+
+        @cached(ttl=300, key_prefix="warm")
+        async def load(limit: int = 10):
+            nonlocal version
+            version += 1
+            return {"limit": limit, "version": version}
+
+        assert await load(limit=10) == {"limit": 10, "version": 1}
+        await load.warm(limit=10)
+
+        assert await load(limit=10) == {"limit": 10, "version": 2}
+        assert version == 2
+
+    @pytest.mark.asyncio
+    async def test_run_warmup_bounded_concurrency(self, warmup_module, monkeypatch):
+        """Тест что ключи прогреваются параллельно не больше concurrency, ошибки считаются"""
+        from fastapi import Depends, Query
+
+        from app.dependencies import get_db
+
+        init_cache(redis_client=None)
+        running = peak = 0
+
+        @cached(ttl=300, key_prefix="warm_detail")
+        async def detail(item_id: int, lang: str = Query("ru"), db=Depends(get_db)):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if item_id == 13:
+                raise ValueError("broken item")
+            return {"id": item_id, "lang": lang}
+
+        targets = [warmup_module.WarmupTarget(detail, {"item_id": i}) for i in (1, 2, 3, 13, 5, 6)]
+        monkeypatch.setattr(warmup_module, "WARMUP_JOBS", {"detail": lambda db, top: targets})
+
+        result = await warmup_module.run_cache_warmup(["detail", "unknown"], concurrency=2, timeout=5)
+
+        assert result["keys"] == 6
+        assert result["warmed"] == 5
+        assert result["failed"] == 1
+        assert peak == 2
+        # Query-параметры по умолчанию подставлены так же, как в запросе
+        assert await detail(item_id=1, lang="ru") == {"id": 1, "lang": "ru"}
+        assert cache_module.cache_manager.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_not_ready_until_warmup_done(self, warmup_module, monkeypatch):
+        """Тест что воркер не готов, пока идёт прогрев при старте"""
+        release = asyncio.Event()
+
+        async def slow_warmup():
+            await release.wait()
+            return {"keys": 1, "warmed": 1, "failed": 0}
+
+        monkeypatch.setattr(warmup_module, "run_cache_warmup", slow_warmup)
+
+        task = warmup_module.start_cache_warmup()
+        await asyncio.sleep(0)
+        assert warmup_module.is_cache_warm() is False
+        assert warmup_module.get_warmup_status()["state"] == "running"
+
+        release.set()
+        await task
+
+        assert warmup_module.is_cache_warm() is True
+        assert warmup_module.get_warmup_status()["warmed"] == 1
+        await warmup_module.stop_cache_warmup()
+
+
+class TestHttpCache:
+    """Тесты ETag и условных ответов"""
+
+    def test_etag_matches(self):
+        """Тест сравнения If-None-Match (список, W/, *)"""
+        from app.utils.http_cache import etag_matches, make_etag
+
+        etag = make_etag(b'{"id":1}')
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_cached_endpoint_not_modified(self):
+        """Тест что эндпоинт с response_model отдаёт ETag и отвечает 304 из кеша"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from pydantic import BaseModel
+
+        class ItemResponse(BaseModel):
+            id: int
+
+        init_cache(redis_client=None)
+        call_count = 0
+        app = FastAPI()
+
+        @app.get("/items/{item_id}", response_model=ItemResponse)
+        @cached(ttl=300, key_prefix="http_item", response_model=ItemResponse, http_max_age=60)
+        async def get_item(item_id: int):
+            nonlocal call_count
+            call_count += 1
+            return {"id": item_id}
+
+        client = TestClient(app)
+        first = client.get("/items/1")
+        etag = first.headers["ETag"]
+
+        assert first.json() == {"id": 1}
+        assert first.headers["Cache-Control"] == "public, max-age=60"
+
+        second = client.get("/items/1", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == etag
+
+        assert client.get("/items/2", headers={"If-None-Match": etag}).status_code == 200
+        assert call_count == 2
+
+
 class TestCacheTTL:
     """Тесты конфигурации TTL"""
 
@@ -0,0 +1,132 @@
+"""
+Tests for the unified GCRA rate limiter
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from app.middleware.rate_limiter_unified import (
+    GCRA_SYNC_SCRIPT,
+    HybridRateLimiter,
+    RateLimiter,
+    UnifiedRateLimitMiddleware,
+)
+
+
+class TestGCRARateLimiter:
+    """Тесты GCRA rate limiter (memory fallback)"""
+
+    def test_burst_then_steady_rate(self):
+        """Тест: лимит доступен сразу, затем один запрос на window / limit"""
+        limiter = RateLimiter()
+        results = [limiter._check_memory("client", 5, 60, now=100.0) for _ in range(6)]
+
+        assert [r.limited for r in results] == [False] * 5 + [True]
+        assert [r.remaining for r in results] == [4, 3, 2, 1, 0, 0]
+        assert results[-1].retry_after == 12.0
+
+        assert not limiter._check_memory("client", 5, 60, now=112.0).limited
+        assert limiter._check_memory("client", 5, 60, now=112.0).limited
+
+    def test_memory_store_bounded(self):
+        """Тест: восстановившиеся ключи вытесняются, число ключей ограничено max_keys"""
+        limiter = RateLimiter(max_keys=3)
+        for i in range(10):
+            limiter._check_memory(f"client{i}", 5, 60, now=100.0)
+        assert list(limiter.memory_store) == ["client7", "client8", "client9"]
+
+        limiter._check_memory("fresh", 5, 60, now=200.0)
+        assert list(limiter.memory_store) == ["fresh"]
+
+
+class TestHybridRateLimiter:
+    """Тесты гибридного режима: локальные корзины и пакетная синхронизация с Redis"""
+
+    async def test_sync_after_overshoot_budget(self):
+        """Тест: Redis вызывается один раз на overshoot * limit запросов, пакетом"""
+        redis = AsyncMock()
+        redis.eval.return_value = [6000]
+        limiter = HybridRateLimiter(redis, sync_interval=60, overshoot=0.1)
+
+        for _ in range(4):
+            assert not (await limiter.check("client", 50, 60)).limited
+        redis.eval.assert_not_called()
+
+        await limiter.check("client", 50, 60)
+        redis.eval.assert_awaited_once_with(GCRA_SYNC_SCRIPT, 1, "rate_limit:client", 1200, 5)
+
+    async def test_adopts_global_consumption(self):
+        """Тест: после синхронизации учитываются запросы других воркеров"""
+        redis = AsyncMock()
+        limiter = HybridRateLimiter(redis, sync_interval=60, overshoot=0.1)
+        await limiter.check("client", 50, 60)
+
+        # Остальные воркеры исчерпали лимит: TAT на всё окно впереди
+        redis.eval.return_value = [60000]
+        await limiter.sync()
+
+        result = await limiter.check("client", 50, 60)
+        assert result.limited
+        assert 0 < result.retry_after <= 1.2
+
+    async def test_failed_sync_keeps_batch(self):
+        """Тест: при ошибке Redis пакет сохраняется и отправляется при следующей синхронизации"""
+        redis = AsyncMock()
+        redis.eval.side_effect = [ConnectionError("redis down"), [1200]]
+        limiter = HybridRateLimiter(redis, sync_interval=60, overshoot=0.1)
+
+        for _ in range(6):
+            await limiter.check("client", 50, 60)
+        assert redis.eval.await_count == 1
+        assert limiter.redis is redis
+
+        await limiter.sync()
+        redis.eval.assert_awaited_with(GCRA_SYNC_SCRIPT, 1, "rate_limit:client", 1200, 6)
+        assert limiter._pending == {}
+
+    def test_sync_rescheduled_on_new_loop(self):
+        """Тест: таймер синхронизации из закрытого event loop заменяется таймером текущего"""
+        limiter = HybridRateLimiter(AsyncMock(), sync_interval=60, overshoot=0.1)
+        for _ in range(2):
+            asyncio.run(limiter.check("client", 50, 60))
+            assert limiter._sync_handle is not None
+
+        async def scheduled_on_current_loop():
+            await limiter.check("client", 50, 60)
+            return limiter._sync_loop is asyncio.get_running_loop()
+
+        assert asyncio.run(scheduled_on_current_loop())
+
+    async def test_local_only_without_redis(self):
+        """Тест: без Redis гибридный режим ограничивает по локальной корзине"""
+        limiter = HybridRateLimiter(None, overshoot=0.1)
+        results = [await limiter.check("client", 3, 60) for _ in range(4)]
+        assert [r.limited for r in results] == [False, False, False, True]
+
+
+class TestRateLimitMiddleware:
+    """Тесты заголовков UnifiedRateLimitMiddleware"""
+
+    def test_headers(self):
+        """Тест: X-RateLimit-* в ответах, точный Retry-After при 429"""
+        app = FastAPI()
+        app.add_middleware(UnifiedRateLimitMiddleware)
+
+        @app.post("/api/auth/login")
+        async def login():
+            return {"ok": True}
+
+        client = TestClient(app)
+        responses = [client.post("/api/auth/login") for _ in range(6)]
+
+        assert [r.status_code for r in responses[:5]] == [status.HTTP_200_OK] * 5
+        assert responses[0].headers["X-RateLimit-Limit"] == "5"
+        assert [r.headers["X-RateLimit-Remaining"] for r in responses[:5]] == ["4", "3", "2", "1", "0"]
+
+        limited = responses[5]
+        assert limited.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 11 <= int(limited.headers["Retry-After"]) <= 12
+        assert limited.json()["retry_after"] == int(limited.headers["Retry-After"])
@@ -147,6 +147,20 @@ class TestReviewRead:
         data = res.json()
         assert data["total"] == 0
 
+    def test_get_reviews_not_modified(self, client):
+        """Тест что повторный запрос с If-None-Match получает 304 без тела"""
+        first = client.get("/api/v1/courses/998/reviews")
+        assert first.status_code == status.HTTP_200_OK
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"].startswith("public")
+
+        second = client.get("/api/v1/courses/998/reviews", headers={"If-None-Match": etag})
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+        assert second.content == b""
+
+        other_page = client.get("/api/v1/courses/998/reviews?page=2", headers={"If-None-Match": etag})
+        assert other_page.status_code == status.HTTP_200_OK
+
 
 class TestReviewAggregate:
     """Тесты агрегации отзывов"""
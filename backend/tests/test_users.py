@@ -62,6 +62,19 @@ class TestUserUpdate:
         data = response.json()
         assert data["full_name"] == update_data["full_name"]
 
+    def test_update_invalidates_cached_profile(self, sync_authenticated_client):
+        """Тест: закешированный GET /users/{id} видит обновление профиля"""
+        client, headers = sync_authenticated_client
+        user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+        assert client.get(f"/api/v1/users/{user_id}", headers=headers).json()["full_name"] == "Test User"
+
+        response = client.put("/api/v1/users/me", json={"full_name": "Renamed User"}, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        response = client.get(f"/api/v1/users/{user_id}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["full_name"] == "Renamed User"
+
     def test_update_user_email(self, sync_authenticated_client):
         """Тест обновления email пользователя"""
         import uuid